@@ -0,0 +1,140 @@
+"""
+报名接口的准入控制（虚拟等候室）
+
+报名开放的一瞬间，整个年级同时提交报名，每个请求要执行多条查询，数据库很快被压垮。
+这里在业务逻辑之前加两道闸：
+
+- TokenBucketLimiter：按学生限流，防止同一个人连续狂点
+- WaitingRoom：限制同时执行报名逻辑的请求数；超出的请求领取排队号立即返回 429，
+  客户端按 Retry-After 携带排队号重试，按领号顺序 (FIFO) 放行，不会被后来者插队。
+  排队号是随机串并绑定领号的客户端，无法猜出或冒用别人的排队号；
+  同一排队号间隔不足 min_retry_interval 的重试保留位置但不放行
+
+两者都只在内存中做简单判断、从不等待，不会阻塞线程，Flask 与 asgi.py 的异步路径均可直接调用。
+状态为进程内：总并发上限 = SIGNUP_MAX_CONCURRENCY × worker 数；
+重试落到另一个 worker 时排队号在那里无效，按新请求处理（计入限流并重新领号）。
+"""
+import math
+import secrets
+import threading
+import time
+from collections import OrderedDict
+
+
+class TokenBucketLimiter:
+    """令牌桶：每个 key 以 rate 个/秒的速度补充令牌，最多积累 burst 个"""
+
+    def __init__(self, rate, burst, max_keys=100000):
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()  # {key: (tokens, updated_at)}
+        self._lock = threading.Lock()
+
+    def consume(self, key):
+        """成功返回 0，否则返回需要等待的秒数"""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.pop(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated_at) * self.rate)
+            if tokens >= 1:
+                tokens -= 1
+                wait = 0
+            else:
+                wait = (1 - tokens) / self.rate
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)  # 最久未访问的桶早已回满，直接丢弃
+        return wait
+
+
+class Admission:
+    """try_enter() 的结果：admitted 为真时必须在处理结束后调用 release()"""
+
+    def __init__(self, room, admitted, ticket=None, position=0, retry_after=0):
+        self.room = room
+        self.admitted = admitted
+        self.ticket = ticket
+        self.position = position
+        self.retry_after = retry_after
+        self._started = time.monotonic()
+
+    def release(self):
+        if self.admitted:
+            self.room._leave(time.monotonic() - self._started)
+            self.admitted = False
+
+
+class WaitingRoom:
+    """
+    有界 FIFO 等候室
+    - max_active：同时执行报名逻辑的请求上限（按数据库可持续的并发设定）
+    - max_waiting：排队人数上限，超过后直接拒绝且不发号
+    - ticket_ttl：排队号多久没有重试就作废，避免离开的客户端一直占位
+    - min_retry_interval：同一排队号两次重试的最小间隔（秒），更快的重试不会被放行
+    """
+
+    def __init__(self, max_active=8, max_waiting=500, ticket_ttl=15, min_retry_interval=0.5):
+        self.max_active = max_active
+        self.max_waiting = max_waiting
+        self.ticket_ttl = ticket_ttl
+        self.min_retry_interval = min_retry_interval
+        self.active = 0
+        self._waiting = OrderedDict()  # {ticket: [client_key, last_seen]}，按领号顺序排列
+        self._service_time = 0.05  # 单个报名请求耗时的滑动平均（秒），用于估算等待时间
+        self._lock = threading.Lock()
+
+    def try_enter(self, client_key, ticket=None):
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            free = self.max_active - self.active
+
+            if self._owns(ticket, client_key):
+                entry = self._waiting[ticket]
+                too_soon = now - entry[1] < self.min_retry_interval
+                entry[1] = now
+                position = list(self._waiting).index(ticket)
+                if position < free and not too_soon:
+                    del self._waiting[ticket]
+                    return self._admit()
+                return self._queued(ticket, position + 1)
+
+            # 新请求：没人排队且有空位时直接放行，否则领号排到队尾
+            if not self._waiting and free > 0:
+                return self._admit()
+            if len(self._waiting) >= self.max_waiting:
+                return Admission(self, False, position=len(self._waiting) + 1,
+                                 retry_after=self._estimate(len(self._waiting)))
+            ticket = secrets.token_urlsafe(16)
+            self._waiting[ticket] = [client_key, now]
+            return self._queued(ticket, len(self._waiting))
+
+    def holds(self, ticket, client_key):
+        """排队号是否仍然有效且属于该客户端（有效的排队号重试时不再计入限流）"""
+        with self._lock:
+            return self._owns(ticket, client_key)
+
+    def _owns(self, ticket, client_key):
+        entry = self._waiting.get(ticket) if ticket else None
+        return entry is not None and entry[0] == client_key
+
+    def _admit(self):
+        self.active += 1
+        return Admission(self, True)
+
+    def _queued(self, ticket, position):
+        return Admission(self, False, ticket, position, self._estimate(position))
+
+    def _estimate(self, position):
+        return max(1, math.ceil(position * self._service_time / self.max_active))
+
+    def _expire(self, now):
+        for ticket, (_, last_seen) in list(self._waiting.items()):
+            if now - last_seen > self.ticket_ttl:
+                del self._waiting[ticket]
+
+    def _leave(self, elapsed):
+        with self._lock:
+            self.active -= 1
+            self._service_time = 0.9 * self._service_time + 0.1 * elapsed
@@ -0,0 +1,11 @@
+"""
+HTTP 接口：每个模块一个蓝图，由 app.create_app() 注册
+
+    students  学生注册、登录与个人信息   /api/students
+    events    活动列表、检索与报名       /api/events
+    shifts    周常岗位与报名             /api/shifts
+    admin     管理员接口                 /api/admin
+    realtime  容量变化推送 (SSE)         /api/stream
+    ranking   志愿时长排行榜             /api/leaderboard
+    sync      增量同步（变更游标）       /api/sync
+"""
@@ -0,0 +1,610 @@
+"""
+管理员接口：轮值安排、学生统计、发布活动、岗位管理与排班、后台任务、剖析结果
+"""
+from datetime import datetime, date, timedelta
+
+from flask import Blueprint, current_app, jsonify, request
+from sqlalchemy import func
+
+from extensions import db, cache, event_index
+from models import (
+    Student, Event, EventSignup, RecurringShift, WeeklyRotation, ShiftSignup, Job, HourRollup, enqueue_job,
+)
+from profiling import collapsed_to_speedscope
+from rules import (
+    add_to_hour_rollup, hours_by_student, index_event, publish_shift_capacity, set_event_grades,
+    upcoming_shift_students,
+)
+from tenancy import current_tenant
+from web import admin_required, idempotent
+
+bp = Blueprint('admin', __name__, url_prefix='/api/admin')
+
+# 注意：没有单独的 /api/admin/login，统一使用 /api/students/login
+
+# ==========================================
+# 轮值安排、学生统计、发布活动
+# ==========================================
+
+@bp.route('/rotations', methods=['GET', 'POST'])
+@admin_required
+@idempotent
+def manage_rotations():
+    """管理周常任务的班级轮换"""
+    if request.method == 'GET':
+        rotations = WeeklyRotation.query.order_by(WeeklyRotation.week_start_date.desc()).all()
+        return jsonify([r.to_dict() for r in rotations])
+        
+    if request.method == 'POST':
+        data = request.get_json()
+        try:
+            date_obj = datetime.strptime(data['weekStartDate'], "%Y-%m-%d").date()
+            # 确保是周一
+            if date_obj.weekday() != 0:
+                return jsonify({"message": "必须选择周一作为开始日期"}), 400
+                
+            # 检查是否存在
+            existing = WeeklyRotation.query.filter_by(week_start_date=date_obj).first()
+            if existing:
+                existing.assigned_class_str = data['assignedClass']
+                msg = "轮换已更新"
+            else:
+                new_rotation = WeeklyRotation(
+                    week_start_date=date_obj,
+                    assigned_class_str=data['assignedClass']
+                )
+                db.session.add(new_rotation)
+                msg = "轮换已创建"
+                
+            db.session.commit()
+            cache.invalidate(f"rotation:{date_obj.isoformat()}")
+            return jsonify({"message": msg}), 201
+        except Exception as e:
+            return jsonify({"message": str(e)}), 500
+
+@bp.route('/students', methods=['GET'])
+@admin_required
+def get_all_students_stats():
+    """获取所有学生的统计数据"""
+    students = Student.query.all()
+    # 按照总时长倒序排序
+    student_list = [s.to_dict() for s in students]
+    student_list.sort(key=lambda x: x['totalHours'], reverse=True)
+    return jsonify(student_list)
+
+@bp.route('/events', methods=['POST'])
+@admin_required
+@idempotent
+def admin_create_event():
+    data = request.get_json()
+    event_index.ensure(db.session)
+    try:
+        new_event = Event(
+            title=data['title'],
+            description=data.get('description', ''),
+            start_time=datetime.fromisoformat(data['startTime']),
+            end_time=datetime.fromisoformat(data['endTime']),
+            registration_deadline=datetime.fromisoformat(data['registrationDeadline']),
+            location=data['location'],
+            required_volunteers=int(data['requiredVolunteers']),
+            hours_value=float(data.get('hoursValue', 1.0)),
+            grade_limit=data.get('gradeLimit', 'ALL'), # 默认为 ALL
+            leader_name=data.get('leaderName'),
+            leader_contact=data.get('leaderContact')
+        )
+        set_event_grades(new_event)
+        db.session.add(new_event)
+        db.session.flush()
+        index_event(db.session, new_event)
+        db.session.commit()
+        cache.invalidate("events")
+        return jsonify(new_event.to_dict()), 201
+    except Exception as e:
+        return jsonify({"message": str(e)}), 500
+
+# ==========================================
+# 周常岗位管理与排班
+# ==========================================
+
+@bp.route('/shifts', methods=['GET', 'POST', 'PUT', 'DELETE'])
+@admin_required
+@idempotent
+def admin_manage_shifts():
+    """
+    管理员管理周常岗位
+    GET: 获取所有岗位
+    POST: 创建新岗位
+    PUT: 更新岗位
+    DELETE: 删除岗位
+    """
+    if request.method == 'GET':
+        shifts = RecurringShift.query.order_by(
+            RecurringShift.day_of_week,
+            RecurringShift.start_time
+        ).all()
+        return jsonify([s.to_dict() for s in shifts])
+    
+    elif request.method == 'POST':
+        # 创建新岗位
+        data = request.get_json()
+        try:
+            start_time = datetime.strptime(data['startTime'], "%H:%M").time()
+            end_time = datetime.strptime(data['endTime'], "%H:%M").time()
+            
+            shift = RecurringShift(
+                name=data['name'],
+                day_of_week=int(data['dayOfWeek']),
+                start_time=start_time,
+                end_time=end_time,
+                capacity=int(data.get('capacity', 2)),
+                hours_value=float(data.get('hoursValue', 0.5)),
+                description=data.get('description', '')
+            )
+            
+            db.session.add(shift)
+            db.session.commit()
+            cache.invalidate("shifts")
+            
+            return jsonify({"message": "岗位创建成功", "shift": shift.to_dict()}), 201
+        except Exception as e:
+            return jsonify({"message": f"创建失败: {str(e)}"}), 500
+    
+    elif request.method == 'PUT':
+        # 更新岗位
+        data = request.get_json()
+        shift_id = data.get('id')
+        if not shift_id:
+            return jsonify({"message": "缺少岗位ID"}), 400
+        
+        shift = RecurringShift.query.get(shift_id)
+        if not shift:
+            return jsonify({"message": "岗位不存在"}), 404
+        
+        try:
+            if 'name' in data:
+                shift.name = data['name']
+            if 'dayOfWeek' in data:
+                shift.day_of_week = int(data['dayOfWeek'])
+            if 'startTime' in data:
+                shift.start_time = datetime.strptime(data['startTime'], "%H:%M").time()
+            if 'endTime' in data:
+                shift.end_time = datetime.strptime(data['endTime'], "%H:%M").time()
+            if 'capacity' in data:
+                shift.capacity = int(data['capacity'])
+            if 'hoursValue' in data:
+                shift.hours_value = float(data['hoursValue'])
+                # 已有报名的时长随之改变，班级汇总需要重算
+                enqueue_job(db.session, "rebuild_hour_rollups")
+            if 'description' in data:
+                shift.description = data['description']
+            
+            db.session.commit()
+            # 已报名学生的个人缓存（日程订阅等）只带 student:<id> 标签
+            students = upcoming_shift_students(db.session, shift.id)
+            cache.invalidate("shifts", "leaderboard", *(f"student:{sid}" for sid in students))
+            return jsonify({"message": "岗位更新成功", "shift": shift.to_dict()})
+        except Exception as e:
+            return jsonify({"message": f"更新失败: {str(e)}"}), 500
+    
+    elif request.method == 'DELETE':
+        # 删除岗位
+        shift_id = request.args.get('id')
+        if not shift_id:
+            return jsonify({"message": "缺少岗位ID"}), 400
+        
+        shift = RecurringShift.query.get(shift_id)
+        if not shift:
+            return jsonify({"message": "岗位不存在"}), 404
+        
+        students = upcoming_shift_students(db.session, shift.id)
+        db.session.delete(shift)
+        enqueue_job(db.session, "rebuild_hour_rollups")  # 该岗位的报名随之删除
+        db.session.commit()
+        cache.invalidate("shifts", "leaderboard", *(f"student:{sid}" for sid in students))
+        
+        return jsonify({"message": "岗位删除成功"})
+
+@bp.route('/shifts/signups', methods=['GET'])
+@admin_required
+def admin_get_shift_signups():
+    """
+    管理员查看报名情况 - 返回二维矩阵数据
+    参数: 
+      - week_start: 周一日期（必填，YYYY-MM-DD）
+      - class_name: 班级名称（可选筛选）
+    返回: { columns: [...岗位], rows: [...学生及其报名状态] }
+    """
+    week_start_str = request.args.get('week_start')
+    class_filter = request.args.get('class_name', '')
+    
+    if not week_start_str:
+        return jsonify({"message": "请提供week_start参数（周一日期）"}), 400
+    
+    try:
+        week_start = datetime.strptime(week_start_str, "%Y-%m-%d").date()
+    except ValueError:
+        return jsonify({"message": "日期格式错误"}), 400
+    
+    week_end = week_start + timedelta(days=4)  # 周五
+    
+    # 获取该周所有岗位（按星期和时间排序）
+    shifts = RecurringShift.query.order_by(
+        RecurringShift.day_of_week, RecurringShift.start_time
+    ).all()
+    
+    day_names = {1: "周一", 2: "周二", 3: "周三", 4: "周四", 5: "周五"}
+    
+    # 构建列：每个岗位一列
+    columns = []
+    for s in shifts:
+        columns.append({
+            "id": s.id,
+            "label": f"{s.name} {s.start_time.strftime('%H:%M')}({day_names[s.day_of_week]})"
+        })
+    
+    # 获取该周所有报名记录
+    signups = ShiftSignup.query.filter(
+        ShiftSignup.date >= week_start,
+        ShiftSignup.date <= week_end,
+        ShiftSignup.status != 'cancelled'
+    ).all()
+    
+    # 按学生聚合
+    student_signup_map = {}  # {student_id: {shift_id: status}}
+    for signup in signups:
+        if signup.student_id not in student_signup_map:
+            student_signup_map[signup.student_id] = {}
+        student_signup_map[signup.student_id][signup.shift_id] = signup.status
+    
+    # 获取所有相关学生信息
+    student_ids = list(student_signup_map.keys())
+    
+    # 如果指定了班级筛选，加载该班级所有学生（含未报名的）
+    if class_filter:
+        parts = class_filter.split('-')
+        if len(parts) == 2:
+            try:
+                year = int(parts[0])
+                cls = int(parts[1])
+                all_students_in_class = Student.query.filter_by(
+                    enrollment_year=year, class_number=cls, is_admin=False
+                ).all()
+                # 合并：已报名 + 未报名的该班级学生
+                for stu in all_students_in_class:
+                    if stu.id not in student_signup_map:
+                        student_signup_map[stu.id] = {}
+                student_ids = list(student_signup_map.keys())
+            except ValueError:
+                pass
+    
+    students = Student.query.filter(Student.id.in_(student_ids)).all() if student_ids else []
+    student_info = {s.id: s for s in students}
+    
+    # 如果有班级筛选，只保留该班级的学生
+    if class_filter:
+        filtered_ids = [
+            sid for sid in student_ids 
+            if sid in student_info and student_info[sid].full_class_name == class_filter
+        ]
+    else:
+        filtered_ids = student_ids
+    
+    # 构建行
+    rows = []
+    for sid in filtered_ids:
+        stu = student_info.get(sid)
+        if not stu:
+            continue
+        signup_data = student_signup_map.get(sid, {})
+        rows.append({
+            "studentId": sid,
+            "name": stu.name,
+            "class": stu.full_class_name,
+            # 只输出已报名的岗位，未报名的格子前端按空处理，避免每行重复整张岗位表
+            "signups": {str(shift_id): status for shift_id, status in signup_data.items()}
+        })
+    
+    # 按名字排序
+    rows.sort(key=lambda r: r['name'])
+    
+    # 获取所有班级列表（供前端下拉框用）
+    all_classes = db.session.query(
+        Student.enrollment_year, Student.class_number
+    ).filter(Student.is_admin == False).distinct().all()
+    class_list = sorted([f"{y}-{c}" for y, c in all_classes])
+    
+    return jsonify({
+        "columns": columns,
+        "rows": rows,
+        "classList": class_list,
+        "weekStart": week_start_str
+    })
+
+@bp.route('/shifts/autofill', methods=['POST'])
+@admin_required
+@idempotent
+def admin_autofill_week():
+    """
+    为轮值班级自动排满一周的岗位空位
+    请求体: { weekStart: "2026-02-16"（周一）, preview: true/false }
+    - preview 为 true 时只返回排班方案，不写入
+    - 遵守每人每周最多2个的限制，优先安排累计时长少的学生；已过去的日期不排
+    返回: { assignments: [...], unfilled: [...], created: 写入条数 }
+    """
+    from autofill import Candidate, Slot, assign_week  # 只有排班接口用到
+
+    data = request.get_json() or {}
+    try:
+        week_start = datetime.strptime(data.get('weekStart', ''), "%Y-%m-%d").date()
+    except ValueError:
+        return jsonify({"message": "日期格式错误，应为YYYY-MM-DD"}), 400
+    if week_start.weekday() != 0:
+        return jsonify({"message": "必须选择周一作为开始日期"}), 400
+    preview = bool(data.get('preview', False))
+    week_end = week_start + timedelta(days=4)
+
+    rotation = WeeklyRotation.query.filter_by(week_start_date=week_start).first()
+    if not rotation:
+        return jsonify({"message": "该周尚未设置轮值班级"}), 400
+    try:
+        year, cls = (int(x) for x in rotation.assigned_class_str.split('-'))
+    except ValueError:
+        return jsonify({"message": f"轮值班级格式错误：{rotation.assigned_class_str}"}), 400
+
+    roster = Student.query.filter_by(enrollment_year=year, class_number=cls, is_admin=False).all()
+    if not roster:
+        return jsonify({"message": f"班级 {rotation.assigned_class_str} 没有学生"}), 400
+    hours = hours_by_student(db.session, [s.id for s in roster])
+    candidates = {s.id: Candidate(student_id=s.id, hours=hours.get(s.id, 0.0)) for s in roster}
+
+    shifts = {s.id: s for s in RecurringShift.query.order_by(
+        RecurringShift.day_of_week, RecurringShift.start_time
+    )}
+
+    # 本周已有报名：统计各岗位占用人数，并把本班学生已报的岗位计入其每周限额
+    taken_counts = {}
+    week_signups = ShiftSignup.query.filter(
+        ShiftSignup.date >= week_start,
+        ShiftSignup.date <= week_end,
+        ShiftSignup.status != 'cancelled'
+    ).all()
+    for signup in week_signups:
+        taken_counts[(signup.shift_id, signup.date)] = taken_counts.get((signup.shift_id, signup.date), 0) + 1
+        candidate = candidates.get(signup.student_id)
+        shift = shifts.get(signup.shift_id)
+        if candidate and shift:
+            candidate.week_count += 1
+            candidate.busy.append((signup.date, shift.start_time, shift.end_time))
+            candidate.taken.add((signup.shift_id, signup.date))
+
+    # 本班学生本周已报名的活动同样占用时间，排班时避开
+    week_begin = datetime.combine(week_start, datetime.min.time())
+    week_finish = week_begin + timedelta(days=5)
+    week_events = db.session.query(EventSignup.student_id, Event.start_time, Event.end_time)\
+        .join(Event, Event.id == EventSignup.event_id)\
+        .filter(EventSignup.student_id.in_(list(candidates)),
+                Event.end_time > week_begin, Event.start_time < week_finish).all()
+    for student_id, start, end in week_events:
+        # 跨天的活动按天拆开，busy 中每项只表示某一天内的时间段
+        current = max(start, week_begin)
+        while current < min(end, week_finish):
+            next_day = datetime.combine(current.date() + timedelta(days=1), datetime.min.time())
+            until = min(end, next_day)
+            day_end = until.time() if until < next_day else datetime.max.time()
+            candidates[student_id].busy.append((current.date(), current.time(), day_end))
+            current = until
+
+    today = date.today()
+    slots = []
+    for shift in shifts.values():
+        slot_date = week_start + timedelta(days=shift.day_of_week - 1)
+        open_seats = (shift.capacity or 0) - taken_counts.get((shift.id, slot_date), 0)
+        if slot_date >= today and open_seats > 0:
+            slots.append(Slot(shift.id, slot_date, shift.start_time, shift.end_time,
+                              shift.hours_value or 0.0, open_seats))
+    slots.sort(key=lambda s: (s.date, s.start))
+
+    assignments, unfilled = assign_week(slots, list(candidates.values()))
+
+    created = 0
+    if not preview and assignments:
+        try:
+            db.session.add_all([
+                ShiftSignup(student_id=student_id, shift_id=slot.shift_id, date=slot.date, status='pending')
+                for student_id, slot in assignments
+            ])
+            for student_id, slot in assignments:
+                add_to_hour_rollup(db.session, year, cls, slot.date, shift_hours=slot.hours, shift_signups=1)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            return jsonify({"message": f"排班写入失败: {str(e)}"}), 500
+        created = len(assignments)
+        cache.invalidate(*{f"student:{student_id}" for student_id, _ in assignments})
+        # 排班后各岗位人数 = 容量 - 仍空缺的人数
+        missing = {(slot.shift_id, slot.date): n for slot, n in unfilled}
+        for key, slot in {(slot.shift_id, slot.date): slot for _, slot in assignments}.items():
+            shift = shifts[slot.shift_id]
+            publish_shift_capacity(shift, slot.date, shift.capacity - missing.get(key, 0))
+
+    names = {s.id: s.name for s in roster}
+    return jsonify({
+        "weekStart": week_start.isoformat(),
+        "assignedClass": rotation.assigned_class_str,
+        "preview": preview,
+        "assignments": [{
+            "studentId": student_id,
+            "name": names[student_id],
+            "shiftId": slot.shift_id,
+            "shiftName": shifts[slot.shift_id].name,
+            "date": slot.date.isoformat()
+        } for student_id, slot in assignments],
+        "unfilled": [{
+            "shiftId": slot.shift_id,
+            "shiftName": shifts[slot.shift_id].name,
+            "date": slot.date.isoformat(),
+            "missing": missing
+        } for slot, missing in unfilled],
+        "created": created
+    }), 201 if created else 200
+
+# ==========================================
+# 班级 / 年级时长统计（读取 hour_rollups 汇总表）
+# ==========================================
+
+@bp.route('/analytics/hours', methods=['GET'])
+@admin_required
+def admin_hours_analytics():
+    """
+    各班级 / 年级的总时长、人均时长与每周趋势
+    参数: groupBy=class|grade（默认 class）, weeks=趋势周数（默认12，最多52）, enrollmentYear=只看某个年级
+    返回: { groupBy, weeks: [周一日期], groups: [ { enrollmentYear, classNumber, name, students,
+           totalHours, eventHours, shiftHours, averageHours, series: [每周时长] } ] }
+    时长按活动开始日期 / 岗位日期计入所在周，统计截至本周（含本周已安排的部分）
+    """
+    group_by = request.args.get('groupBy', 'class')
+    if group_by not in ('class', 'grade'):
+        return jsonify({"message": "groupBy 只能是 class 或 grade"}), 400
+    week_count = min(max(request.args.get('weeks', 12, type=int), 1), 52)
+    enrollment_year = request.args.get('enrollmentYear', type=int)
+
+    this_week = date.today() - timedelta(days=date.today().weekday())
+    weeks = [this_week - timedelta(weeks=i) for i in range(week_count - 1, -1, -1)]
+
+    rollup_keys = [HourRollup.enrollment_year]
+    student_keys = [Student.enrollment_year]
+    if group_by == 'class':
+        rollup_keys.append(HourRollup.class_number)
+        student_keys.append(Student.class_number)
+
+    rollups = db.session.query(HourRollup).filter(HourRollup.week_start <= this_week)
+    students = db.session.query(*student_keys, func.count(Student.id)).filter(Student.is_admin.isnot(True))
+    if enrollment_year:
+        rollups = rollups.filter(HourRollup.enrollment_year == enrollment_year)
+        students = students.filter(Student.enrollment_year == enrollment_year)
+
+    totals = rollups.with_entities(
+        *rollup_keys, func.sum(HourRollup.event_hours), func.sum(HourRollup.shift_hours)
+    ).group_by(*rollup_keys).all()
+    series = rollups.filter(HourRollup.week_start >= weeks[0]).with_entities(
+        *rollup_keys, HourRollup.week_start, func.sum(HourRollup.event_hours + HourRollup.shift_hours)
+    ).group_by(*rollup_keys, HourRollup.week_start).all()
+    counts = {tuple(row[:-1]): row[-1] for row in students.group_by(*student_keys)}
+
+    groups = {}
+    def group(key):
+        if key not in groups:
+            groups[key] = {
+                "enrollmentYear": key[0],
+                "classNumber": key[1] if group_by == 'class' else None,
+                "name": f"{key[0]}级{key[1]}班" if group_by == 'class' else f"{key[0]}级",
+                "students": counts.get(key, 0),
+                "eventHours": 0.0,
+                "shiftHours": 0.0,
+                "series": [0.0] * week_count
+            }
+        return groups[key]
+
+    for key in counts:
+        group(key)
+    for *key, event_hours, shift_hours in totals:
+        item = group(tuple(key))
+        item["eventHours"] = round(float(event_hours or 0.0), 1)
+        item["shiftHours"] = round(float(shift_hours or 0.0), 1)
+    week_index = {week: i for i, week in enumerate(weeks)}
+    for *key, week_start, hours in series:
+        group(tuple(key))["series"][week_index[week_start]] = round(float(hours or 0.0), 1)
+
+    result = []
+    for key in sorted(groups):
+        item = groups[key]
+        item["totalHours"] = round(item["eventHours"] + item["shiftHours"], 1)
+        item["averageHours"] = round(item["totalHours"] / item["students"], 2) if item["students"] else 0.0
+        result.append(item)
+    return jsonify({
+        "groupBy": group_by,
+        "weeks": [week.isoformat() for week in weeks],
+        "groups": result
+    })
+
+# ==========================================
+# 后台任务 (见 worker.py)
+# ==========================================
+
+@bp.route('/jobs', methods=['GET'])
+@admin_required
+def admin_list_jobs():
+    """
+    后台任务状态
+    参数: status, name（可选过滤）, limit（默认50，最多200）
+    返回各状态数量、最早一个到期未执行任务的等待秒数（worker 停止时会持续增长）及最近的任务
+    """
+    counts = dict(db.session.query(Job.status, func.count(Job.id)).group_by(Job.status).all())
+    oldest_due = db.session.query(func.min(Job.run_at))\
+        .filter(Job.status == 'queued', Job.run_at <= datetime.now()).scalar()
+
+    query = Job.query
+    if request.args.get('status'):
+        query = query.filter(Job.status == request.args['status'])
+    if request.args.get('name'):
+        query = query.filter(Job.name == request.args['name'])
+    limit = min(max(request.args.get('limit', 50, type=int), 1), 200)
+    jobs = query.order_by(Job.id.desc()).limit(limit).all()
+
+    return jsonify({
+        "counts": counts,
+        "lagSeconds": round((datetime.now() - oldest_due).total_seconds(), 1) if oldest_due else 0,
+        "jobs": [j.to_dict() for j in jobs]
+    })
+
+@bp.route('/jobs/<int:job_id>', methods=['GET'])
+@admin_required
+def admin_get_job(job_id):
+    """单个任务的状态与结果"""
+    job = db.session.get(Job, job_id)
+    if not job:
+        return jsonify({"message": "任务不存在"}), 404
+    return jsonify(job.to_dict(with_result=True))
+
+@bp.route('/reports/students', methods=['POST'])
+@admin_required
+@idempotent
+def admin_request_students_report():
+    """异步生成学生统计报表：立即返回任务ID，结果通过 /api/admin/jobs/<id> 获取"""
+    job = enqueue_job(db.session, "students_report")
+    db.session.commit()
+    return jsonify({"jobId": job.id, "status": job.status}), 202
+
+# ==========================================
+# 按需剖析结果 (见 profiling.py)
+# ==========================================
+
+@bp.route('/profiles', methods=['GET'])
+@admin_required
+def admin_list_profiles():
+    """最近的剖析结果（最新的在前）：请求路径、状态码、耗时、触发方式"""
+    tenant = current_tenant()
+    profiles = [p for p in current_app.extensions["profiling"].list() if p.get("tenant") == tenant]
+    return jsonify({"profiles": profiles})
+
+@bp.route('/profiles/<profile_id>', methods=['GET'])
+@admin_required
+def admin_download_profile(profile_id):
+    """
+    下载剖析结果
+    参数: format=folded（默认，折叠栈文本）/ speedscope（JSON）
+    """
+    found = current_app.extensions["profiling"].read(profile_id)
+    if found is None or found[0].get("tenant") != current_tenant():
+        return jsonify({"message": "剖析结果不存在"}), 404
+    meta, folded = found
+
+    if request.args.get('format') == 'speedscope':
+        name = f"{meta['method']} {meta['path']}"
+        response = jsonify(collapsed_to_speedscope(name, folded))
+        filename = f"{profile_id}.speedscope.json"
+    else:
+        response = current_app.response_class(folded, mimetype="text/plain")
+        filename = f"{profile_id}.folded"
+    response.headers["Content-Disposition"] = f"attachment; filename={filename}"
+    return response
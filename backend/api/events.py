@@ -0,0 +1,80 @@
+"""
+普通活动接口：列表、检索、详情、报名
+"""
+from flask import Blueprint, jsonify, request
+
+from extensions import db, event_index
+from models import Event, Student
+from rules import SignupError, list_events, list_eligible_events, create_event_signup, after_event_signup
+from web import cached_response, admission_controlled, idempotent
+
+bp = Blueprint('events', __name__, url_prefix='/api/events')
+
+@bp.route('', methods=['GET'])
+@cached_response(tags=("events",), ttl=30)
+def get_events():
+    """获取活动列表（排序规则见 list_events）"""
+    return jsonify(list_events(db.session))
+
+@bp.route('/search', methods=['GET'])
+@cached_response(tags=("events",), ttl=30)
+def search_events():
+    """
+    活动全文检索（标题、描述、地点、负责人），按相关度排序
+    参数: q, page（默认1）, pageSize（默认20，最多50）
+    """
+    q = request.args.get('q', '').strip()
+    page = max(request.args.get('page', 1, type=int), 1)
+    page_size = min(max(request.args.get('pageSize', 20, type=int), 1), 50)
+
+    event_index.ensure(db.session)
+    ids, total = event_index.search(db.session, q, page_size, (page - 1) * page_size)
+    events = {e.id: e for e in Event.query.filter(Event.id.in_(ids))} if ids else {}
+    return jsonify({
+        "items": [events[i].to_dict() for i in ids if i in events],
+        "total": total,
+        "page": page,
+        "pageSize": page_size
+    })
+
+@bp.route('/eligible', methods=['GET'])
+@cached_response(tags=("events",), ttl=30)
+def get_eligible_events():
+    """
+    当前学生可以报名的活动（年级符合、招募中、未满员、本人未报名）
+    用法: /api/events/eligible?studentId=123
+    """
+    student = db.session.get(Student, request.args.get('studentId', type=int) or 0)
+    if not student:
+        return jsonify({"message": "学生不存在"}), 404
+    return jsonify(list_eligible_events(db.session, student))
+
+@bp.route('/<int:event_id>', methods=['GET'])
+@cached_response(tags=("events",), ttl=30)
+def get_event_detail(event_id):
+    """获取单个活动详情"""
+    event = Event.query.get_or_404(event_id)
+    return jsonify(event.to_dict())
+
+@bp.route('/<int:event_id>/signup', methods=['POST'])
+@idempotent
+@admission_controlled
+def signup_event(event_id):
+    """
+    报名普通活动
+    需要 JSON: { "studentId": 123 }
+    """
+    data = request.get_json()
+    
+    try:
+        signup, event = create_event_signup(db.session, event_id, data.get('studentId'))
+        db.session.commit()
+    except SignupError as e:
+        db.session.rollback()
+        return jsonify({"message": e.message}), e.status
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"message": "报名失败，请稍后重试"}), 500
+
+    after_event_signup(db.session, event, signup.student_id)
+    return jsonify({"message": "报名成功！"}), 201
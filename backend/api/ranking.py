@@ -0,0 +1,126 @@
+"""
+时长排行榜接口
+"""
+import time
+from datetime import datetime
+
+from flask import Blueprint, jsonify, request
+
+from extensions import db, cache
+from leaderboard import Leaderboard
+from models import Student, Event, EventSignup, ShiftSignup
+from rules import hours_by_student
+from tenancy import current_tenant
+
+bp = Blueprint('ranking', __name__, url_prefix='/api/leaderboard')
+
+# 进程内排行索引（多校区部署时每所学校一份）；任何 worker 调用 cache.invalidate("leaderboard") 后，
+# 各 worker 在下次查询时全量重建
+_leaderboards = {}
+LEADERBOARD_CHECK_SECONDS = 30
+
+def current_leaderboard():
+    """当前学校的 (排行索引, 刷新状态)"""
+    tenant = current_tenant()
+    entry = _leaderboards.get(tenant)
+    if entry is None:
+        entry = _leaderboards.setdefault(tenant, (Leaderboard(), {"token": None, "as_of": None, "checked_at": 0.0}))
+    return entry
+
+def refresh_leaderboard(session):
+    """
+    保证排行索引是最新的：
+    - 共享标签 leaderboard 变化（新学生注册、岗位时长修改等）时全量重建
+    - 否则每 LEADERBOARD_CHECK_SECONDS 秒增量检查一次：自上次刷新以来结束的活动、
+      跨过的日期会让部分学生的时长增加，只重新计算这些学生
+    """
+    leaderboard, state = current_leaderboard()
+    token = cache.tag_versions(["leaderboard"])["leaderboard"]
+    now = datetime.now()
+    with leaderboard.lock:
+        if token != state["token"]:
+            leaderboard.clear()
+            hours = hours_by_student(session)
+            students = session.query(
+                Student.id, Student.name, Student.enrollment_year, Student.class_number
+            ).filter(Student.is_admin == False)
+            for s in students:
+                leaderboard.add(s.id, s.name, s.enrollment_year, s.class_number, hours.get(s.id, 0.0))
+            state.update(token=token, as_of=now, checked_at=time.monotonic())
+            return
+
+        if time.monotonic() - state["checked_at"] < LEADERBOARD_CHECK_SECONDS:
+            return
+        as_of = state["as_of"]
+        changed = {sid for (sid,) in session.query(EventSignup.student_id)
+                   .join(Event, Event.id == EventSignup.event_id)
+                   .filter(Event.end_time > as_of, Event.end_time <= now)}
+        if now.date() > as_of.date():
+            changed |= {sid for (sid,) in session.query(ShiftSignup.student_id)
+                        .filter(ShiftSignup.date >= as_of.date(), ShiftSignup.date < now.date())}
+        if changed:
+            hours = hours_by_student(session, list(changed))
+            for sid in changed:
+                leaderboard.update(sid, hours.get(sid, 0.0))
+        state.update(as_of=now, checked_at=time.monotonic())
+
+def _leaderboard_scope():
+    """解析 scope/year/classNumber 参数，返回 (索引键, 错误信息)"""
+    scope = request.args.get('scope', 'all')
+    year = request.args.get('year', type=int)
+    cls = request.args.get('classNumber', type=int)
+    if scope == 'all':
+        return ("all",), None
+    if scope == 'grade' and year is not None:
+        return ("grade", year), None
+    if scope == 'class' and year is not None and cls is not None:
+        return ("class", year, cls), None
+    return None, "scope 应为 all / grade（需 year）/ class（需 year 与 classNumber）"
+
+@bp.route('', methods=['GET'])
+def get_leaderboard():
+    """
+    时长排行榜
+    参数: scope=all|grade|class, year, classNumber, limit（默认50，最多200）
+    """
+    scope, error = _leaderboard_scope()
+    if error:
+        return jsonify({"message": error}), 400
+    limit = min(max(request.args.get('limit', 50, type=int), 1), 200)
+
+    refresh_leaderboard(db.session)
+    leaderboard, _ = current_leaderboard()
+    with leaderboard.lock:
+        entries = []
+        for rank, student_id, hours in leaderboard.top(scope, limit):
+            name, year, cls = leaderboard.students[student_id]
+            entries.append({
+                "rank": rank,
+                "studentId": student_id,
+                "name": name,
+                "fullClassName": f"{year}级{cls}班",
+                "totalHours": hours
+            })
+        total = leaderboard.size(scope)
+    return jsonify({"scope": list(scope), "total": total, "entries": entries})
+
+@bp.route('/me', methods=['GET'])
+def get_my_rank():
+    """
+    我的名次（全校 / 年级 / 班级）
+    参数: studentId
+    """
+    student_id = request.args.get('studentId', type=int)
+    if student_id is None:
+        return jsonify({"message": "请提供studentId"}), 400
+
+    refresh_leaderboard(db.session)
+    leaderboard, _ = current_leaderboard()
+    with leaderboard.lock:
+        if student_id not in leaderboard.students:
+            return jsonify({"message": "学生不存在"}), 404
+        ranks = {}
+        for scope in leaderboard.scopes(student_id):
+            ranks[scope[0]] = {"rank": leaderboard.rank(scope, student_id), "total": leaderboard.size(scope)}
+        hours = leaderboard.hours(student_id)
+    return jsonify({"studentId": student_id, "totalHours": hours, "ranks": ranks})
@@ -0,0 +1,62 @@
+"""
+实时推送接口 (SSE)
+"""
+from datetime import datetime
+
+from flask import Blueprint, Response, jsonify, request
+from sqlalchemy import func
+
+from extensions import db, broker
+from models import EventSignup, ShiftSignup
+from stream import event_stream
+
+bp = Blueprint('realtime', __name__, url_prefix='/api/stream')
+
+@bp.route('/capacity', methods=['GET'])
+def stream_capacity():
+    """
+    报名人数实时推送（text/event-stream）
+    参数（可组合）:
+      - date: 订阅该日期所有岗位的人数变化（YYYY-MM-DD）
+      - event: 订阅某个活动的人数变化（活动ID，可重复传入多个）
+    连接建立后先推送一条 snapshot 快照，之后每次报名推送一条 capacity 变化
+    """
+    date_str = request.args.get('date')
+    event_ids = request.args.getlist('event', type=int)
+
+    watch_date = None
+    if date_str:
+        try:
+            watch_date = datetime.strptime(date_str, "%Y-%m-%d").date()
+        except ValueError:
+            return jsonify({"message": "日期格式错误，应为YYYY-MM-DD"}), 400
+    if watch_date is None and not event_ids:
+        return jsonify({"message": "请提供date或event参数"}), 400
+
+    # 快照在建立流之前查询完毕，流本身不再占用数据库连接
+    watch_date_str = watch_date.isoformat() if watch_date else None
+    snapshot = {"date": watch_date_str, "shifts": {}, "events": {}}
+    if watch_date:
+        counts = db.session.query(ShiftSignup.shift_id, func.count(ShiftSignup.id))\
+            .filter(ShiftSignup.date == watch_date, ShiftSignup.status != 'cancelled')\
+            .group_by(ShiftSignup.shift_id).all()
+        snapshot["shifts"] = {str(shift_id): count for shift_id, count in counts}
+    if event_ids:
+        counts = db.session.query(EventSignup.event_id, func.count(EventSignup.id))\
+            .filter(EventSignup.event_id.in_(event_ids))\
+            .group_by(EventSignup.event_id).all()
+        snapshot["events"] = {str(eid): 0 for eid in event_ids}
+        snapshot["events"].update({str(eid): count for eid, count in counts})
+    db.session.remove()
+
+    def accept(message):
+        if message["type"] == "shift":
+            return message["date"] == watch_date_str
+        return message["eventId"] in event_ids
+
+    # 流在请求结束后才开始迭代，此时已离开当前学校的上下文，这里先取出本校的广播对象
+    stream = event_stream(broker._get_current_object(), snapshot, accept)
+    response = Response(stream, mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'  # 关闭 nginx 缓冲，保证消息立即送达
+    return response
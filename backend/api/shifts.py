@@ -0,0 +1,131 @@
+"""
+周常岗位接口：轮值班级、岗位列表、报名、我的报名
+"""
+from datetime import datetime
+
+from flask import Blueprint, jsonify, request
+
+from extensions import db
+from models import Student, RecurringShift, ShiftSignup
+from rules import (
+    SignupError, list_shifts, week_start_of, week_rotation, create_shift_signup, after_shift_signup,
+    parse_shift_slots, create_shift_signups, after_shift_signups,
+)
+from web import cached_response, admission_controlled, idempotent
+
+bp = Blueprint('shifts', __name__, url_prefix='/api/shifts')
+
+def _requested_week_start():
+    """解析 ?date= 参数（缺省或格式错误时取今天），返回该周周一"""
+    return week_start_of(request.args.get('date'))
+
+@bp.route('/rotation', methods=['GET'])
+@cached_response(tags=lambda: (f"rotation:{_requested_week_start().isoformat()}",), ttl=300)
+def get_current_rotation():
+    """公开接口：获取当前/指定周的轮值班级信息"""
+    return jsonify(week_rotation(db.session, _requested_week_start()))
+
+@bp.route('', methods=['GET'])
+@cached_response(tags=("shifts",))
+def get_shifts():
+    """
+    获取所有周常岗位（按星期和时间排序）
+    返回格式：按周一到周五分组的岗位列表
+    """
+    return jsonify(list_shifts(db.session))
+
+@bp.route('/<int:shift_id>', methods=['GET'])
+@cached_response(tags=("shifts",))
+def get_shift_detail(shift_id):
+    """获取单个岗位详情"""
+    shift = RecurringShift.query.get_or_404(shift_id)
+    return jsonify(shift.to_dict())
+
+@bp.route('/<int:shift_id>/signup', methods=['POST'])
+@idempotent
+@admission_controlled
+def signup_shift(shift_id):
+    """
+    学生报名周常任务
+    请求体: { studentId: int, date: "2026-02-17" }
+    """
+    data = request.get_json()
+    
+    # 验证必填字段
+    if 'studentId' not in data or 'date' not in data:
+        return jsonify({"message": "缺少必填信息"}), 400
+    
+    # 解析日期
+    try:
+        signup_date = datetime.strptime(data['date'], "%Y-%m-%d").date()
+    except ValueError:
+        return jsonify({"message": "日期格式错误，应为YYYY-MM-DD"}), 400
+    
+    try:
+        signup, shift = create_shift_signup(db.session, shift_id, data['studentId'], signup_date)
+        db.session.commit()
+    except SignupError as e:
+        db.session.rollback()
+        return jsonify({"message": e.message}), e.status
+
+    after_shift_signup(db.session, shift, signup_date, signup.student_id)
+    
+    return jsonify({
+        "message": "报名成功！",
+        "signup": signup.to_dict()
+    }), 201
+
+@bp.route('/signup-batch', methods=['POST'])
+@idempotent
+@admission_controlled
+def signup_shifts():
+    """
+    一次报名多个周常任务，全部通过校验才提交，否则一个也不报名
+    请求体: { studentId: int, slots: [{ shiftId: int, date: "2026-02-17" }, ...] }
+    """
+    data = request.get_json()
+
+    if 'studentId' not in data or 'slots' not in data:
+        return jsonify({"message": "缺少必填信息"}), 400
+
+    try:
+        created = create_shift_signups(db.session, data['studentId'], parse_shift_slots(data['slots']))
+        db.session.commit()
+    except SignupError as e:
+        db.session.rollback()
+        return jsonify({"message": e.message}), e.status
+
+    after_shift_signups(db.session, created, data['studentId'])
+
+    return jsonify({
+        "message": f"报名成功！共{len(created)}个岗位",
+        "signups": [signup.to_dict() for signup, _ in created]
+    }), 201
+
+@bp.route('/my-signups', methods=['GET'])
+def get_my_shift_signups():
+    """
+    获取我的周常任务报名记录
+    参数: phone (query parameter)
+    """
+    phone = request.args.get('phone')
+    if not phone:
+        return jsonify({"message": "缺少手机号参数"}), 400
+    
+    student = Student.query.filter_by(phone=phone).first()
+    if not student:
+        return jsonify({"message": "学生不存在"}), 404
+    
+    # 获取该学生的所有报名记录
+    signups = ShiftSignup.query.filter_by(student_id=student.id).order_by(ShiftSignup.date.desc()).all()
+    
+    result = []
+    for signup in signups:
+        shift = RecurringShift.query.get(signup.shift_id)
+        result.append({
+            **signup.to_dict(),
+            "shiftName": shift.name if shift else "",
+            "shiftTime": shift.to_dict()['timeRange'] if shift else ""
+        })
+    
+    return jsonify(result)
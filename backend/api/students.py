@@ -0,0 +1,167 @@
+"""
+学生接口：注册、登录、个人档案、时间冲突、日程订阅
+"""
+from datetime import datetime
+
+from flask import Blueprint, jsonify, request
+
+import ical
+from extensions import db, cache
+from models import Student
+from rules import student_commitments, find_conflicts
+from web import cached_response
+
+bp = Blueprint('students', __name__, url_prefix='/api/students')
+
+@bp.route('/register', methods=['POST'])
+def register_student():
+    """
+    学生注册接口
+    必填字段：name, phone, password, enrollmentYear, classNumber
+    """
+    data = request.get_json()
+    
+    # 必填字段检查
+    required_fields = ['name', 'phone', 'password', 'enrollmentYear', 'classNumber']
+    if not all(field in data for field in required_fields):
+        return jsonify({"message": "缺少必填信息"}), 400
+    
+    phone = data['phone']
+    
+    # 检查手机号是否已存在
+    existing = Student.query.filter_by(phone=phone).first()
+    if existing:
+        return jsonify({"message": "该手机号已被注册"}), 409
+    
+    try:
+        # 创建新学生账号
+        student = Student(
+            name=data['name'],
+            phone=phone,
+            password=data['password'],  # 直接存储密码
+            enrollment_year=int(data['enrollmentYear']),
+            class_number=int(data['classNumber']),
+            qq=data.get('qq'),
+            wechat=data.get('wechat'),
+            is_admin=False  # 普通学生默认非管理员
+        )
+        db.session.add(student)
+        db.session.commit()
+        cache.invalidate("leaderboard")
+        
+        return jsonify({
+            "message": "注册成功！",
+            "student": student.to_dict()
+        }), 201
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"message": f"注册失败: {str(e)}"}), 500
+
+@bp.route('/login', methods=['POST'])
+def login_or_register():
+    """
+    学生登录接口（密码验证）
+    必填字段：phone, password
+    """
+    data = request.get_json()
+    
+    phone = data.get('phone')
+    password = data.get('password')
+    
+    if not phone or not password:
+        return jsonify({"message": "请输入手机号和密码"}), 400
+    
+    # 查找学生
+    student = Student.query.filter_by(phone=phone).first()
+    
+    if not student:
+        return jsonify({"message": "手机号未注册"}), 404
+    
+    # 验证密码
+    if student.password != password:
+        return jsonify({"message": "密码错误，如忘记密码请联系管理员"}), 401
+    
+    return jsonify({
+        "message": "登录成功",
+        # calendarToken 只在验证密码后返回，用于拼接日程订阅地址
+        "student": dict(student.to_dict(), calendarToken=ical.feed_token(student))
+    }), 200
+
+@bp.route('/profile', methods=['GET', 'PUT'])
+def get_student_profile():
+    """
+    GET: 获取学生档案 (包含总时长和历史记录)
+    PUT: 更新学生信息（包括密码）
+    用法: /api/students/profile?phone=13800000000
+    """
+    phone = request.args.get('phone')
+    if not phone:
+        return jsonify({"message": "请提供手机号"}), 400
+    
+    student = Student.query.filter_by(phone=phone).first()
+    if not student:
+        return jsonify({"message": "未找到该学生"}), 404
+    
+    if request.method == 'GET':
+        return jsonify(student.to_dict())
+    
+    elif request.method == 'PUT':
+        # 更新学生信息（主要用于修改密码）
+        data = request.get_json()
+        
+        # 如果要修改密码，需要验证旧密码
+        if 'oldPassword' in data and 'newPassword' in data:
+            if student.password != data['oldPassword']:
+                return jsonify({"message": "旧密码错误"}), 401
+            
+            student.password = data['newPassword']
+            db.session.commit()
+            cache.invalidate(f"student:{student.id}")
+            # 旧的日程订阅地址随密码失效，返回新的令牌
+            return jsonify({"message": "密码修改成功", "calendarToken": ical.feed_token(student)}), 200
+        
+        # 其他信息更新（如需要）
+        if 'qq' in data:
+            student.qq = data['qq']
+        if 'wechat' in data:
+            student.wechat = data['wechat']
+            
+        db.session.commit()
+        cache.invalidate(f"student:{student.id}")
+        return jsonify({"message": "信息更新成功", "student": student.to_dict()}), 200
+
+def _commitment_dict(item):
+    return {**item, "start": item["start"].isoformat(), "end": item["end"].isoformat()}
+
+@bp.route('/<int:student_id>/conflicts', methods=['GET'])
+@cached_response(tags=lambda student_id: (f"student:{student_id}", "events"), ttl=300)
+def get_student_conflicts(student_id):
+    """
+    学生尚未结束的安排中相互重叠的活动 / 周常岗位
+    （报名时已做冲突检查，这里用于发现管理员排班等途径产生的冲突）
+    返回: { studentId, conflicts: [ { first, second } ] }
+    """
+    student = db.session.get(Student, student_id)
+    if not student:
+        return jsonify({"message": "未找到该学生"}), 404
+    commitments = student_commitments(db.session, student_id, datetime.now())
+    return jsonify({
+        "studentId": student_id,
+        "conflicts": [
+            {"first": _commitment_dict(a), "second": _commitment_dict(b)}
+            for a, b in find_conflicts(commitments)
+        ]
+    })
+
+@bp.route('/<int:student_id>/calendar.ics', methods=['GET'])
+@cached_response(tags=lambda student_id: (f"student:{student_id}",), ttl=3600, private=True)
+def get_student_calendar(student_id):
+    """
+    日程订阅 (iCalendar，见 ical.py)：尚未结束的已报名活动和周常岗位
+    用法: /api/students/<id>/calendar.ics?token=<登录时返回的 calendarToken>
+    """
+    student = db.session.get(Student, student_id)
+    if not student or not ical.check_token(student, request.args.get('token')):
+        return jsonify({"message": "订阅地址无效"}), 404
+    return ical.student_feed(db.session, student), 200, {"Content-Type": "text/calendar; charset=utf-8"}
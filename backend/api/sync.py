@@ -0,0 +1,26 @@
+"""
+增量同步接口：客户端保存游标，只下载游标之后变化的活动、岗位、轮值和本人报名（见 changelog.py）
+"""
+from flask import Blueprint, jsonify, request
+
+from changelog import changes_since, snapshot
+from extensions import db
+
+bp = Blueprint('sync', __name__, url_prefix='/api/sync')
+
+@bp.route('', methods=['GET'])
+def sync_changes():
+    """
+    参数: since（上次返回的 cursor，缺省时返回全量快照）, studentId（可选，同步本人报名）
+    返回: { cursor, reset, hasMore, events: {upserted, deleted}, shifts, rotations, eventSignups, shiftSignups }
+    """
+    since = request.args.get('since', type=int)
+    student_id = request.args.get('studentId', type=int)
+    if since is not None and since < 0:
+        return jsonify({"message": "since 参数错误"}), 400
+
+    # 游标按日志写入时间推进，必须读主库：副本的复制延迟可能让游标越过尚未同步过来的日志
+    db.session.info["pinned"] = True
+    if since is None:
+        return jsonify(snapshot(db.session, student_id))
+    return jsonify(changes_since(db.session, since, student_id))
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+冷数据归档
+
+    python archive.py                      # 归档本学年开始（9月1日）之前的记录
+    python archive.py --before 2024-09-01  # 指定归档线
+    python archive.py --dry-run            # 只统计，不修改
+    python archive.py --tenant school-a    # 多校区部署：归档某所学校（归档表在该校的库中）
+
+把结束时间早于归档线的活动（连同报名）、日期早于归档线的岗位报名从热表移入
+archive 库（见 config.py 中的 ARCHIVE_DATABASE_URL），并把这些记录的时长按学生累加到
+archived_hours。总时长、个人历史、排行榜和管理员统计都会合并两部分数据，结果与归档前一致。
+
+每批先写入归档库并提交，再在主库中删除热数据、累加时长并提交。
+中途失败时直接重新执行：归档行按 (原 ID, 归档线) 去重，已写入的不会再写一遍；
+时长只在删除热数据的同一事务中累加，不会重复计入。
+"""
+import argparse
+from datetime import date, datetime
+
+import changelog
+from app import create_app
+from tenancy import create_all, using_tenant
+from extensions import db, cache, event_index
+from models import (
+    Event, EventGrade, EventSignup, RecurringShift, ShiftSignup,
+    ArchivedHours, ArchivedEvent, ArchivedEventSignup, ArchivedShiftSignup,
+)
+
+
+def school_year_start(today=None):
+    """当前学年的开始日期（9月1日）"""
+    today = today or date.today()
+    return date(today.year if today.month >= 9 else today.year - 1, 9, 1)
+
+
+def _add(totals, student_id, hours, events=0, shifts=0):
+    h, e, s = totals.get(student_id, (0.0, 0, 0))
+    totals[student_id] = (h + hours, e + events, s + shifts)
+
+
+def _apply_totals(session, totals, cutoff):
+    for student_id, (hours, events, shifts) in totals.items():
+        row = session.get(ArchivedHours, student_id)
+        if row is None:
+            row = ArchivedHours(student_id=student_id, hours=0.0, event_count=0, shift_count=0)
+            session.add(row)
+        row.hours = round(row.hours + hours, 2)
+        row.event_count += events
+        row.shift_count += shifts
+        if row.archived_through is None or row.archived_through < cutoff:
+            row.archived_through = cutoff
+
+
+def _archived_ids(session, model, source_ids, cutoff):
+    """本归档线下已写入归档库的行：{原 id: 归档表主键}"""
+    rows = session.query(model.source_id, model.id)\
+        .filter(model.source_id.in_(source_ids), model.archived_through == cutoff)
+    return dict(rows.all())
+
+
+def archive_events(session, cutoff, batch_size=200):
+    """归档结束时间早于 cutoff 的活动及其报名，返回 (活动数, 报名数)"""
+    boundary = datetime.combine(cutoff, datetime.min.time())
+    moved_events = moved_signups = 0
+    while True:
+        events = session.query(Event).filter(Event.end_time < boundary)\
+            .order_by(Event.id).limit(batch_size).all()
+        if not events:
+            return moved_events, moved_signups
+        event_ids = [e.id for e in events]
+        hours = {e.id: e.hours_value for e in events}
+        signups = session.query(EventSignup).filter(EventSignup.event_id.in_(event_ids)).all()
+        signup_ids = [s.id for s in signups]
+        signup_owners = [(s.id, s.student_id) for s in signups]
+
+        totals = {}
+        archived_events = _archived_ids(session, ArchivedEvent, event_ids, cutoff)
+        new_events = {e.id: ArchivedEvent(
+            source_id=e.id, archived_through=cutoff, title=e.title, description=e.description,
+            start_time=e.start_time, end_time=e.end_time, location=e.location,
+            leader_name=e.leader_name, required_volunteers=e.required_volunteers,
+            grade_limit=e.grade_limit, hours_value=e.hours_value
+        ) for e in events if e.id not in archived_events}
+        session.add_all(new_events.values())
+        session.flush()  # 取得归档活动的主键，报名行引用它
+        archived_events.update({source_id: row.id for source_id, row in new_events.items()})
+        archived_signups = _archived_ids(session, ArchivedEventSignup, signup_ids, cutoff)
+        for s in signups:
+            if s.id not in archived_signups:
+                session.add(ArchivedEventSignup(
+                    source_id=s.id, archived_through=cutoff, student_id=s.student_id,
+                    event_id=archived_events[s.event_id], signup_time=s.signup_time
+                ))
+            _add(totals, s.student_id, hours[s.event_id], events=1)
+        session.commit()
+
+        changelog.record(session, EventSignup, signup_owners, "delete")
+        changelog.record(session, Event, [(event_id, None) for event_id in event_ids], "delete")
+        session.query(EventSignup).filter(EventSignup.id.in_(signup_ids)).delete(synchronize_session=False)
+        session.query(EventGrade).filter(EventGrade.event_id.in_(event_ids)).delete(synchronize_session=False)
+        session.query(Event).filter(Event.id.in_(event_ids)).delete(synchronize_session=False)
+        event_index.delete(session, event_ids)
+        _apply_totals(session, totals, cutoff)
+        session.commit()
+        moved_events += len(event_ids)
+        moved_signups += len(signup_ids)
+
+
+def archive_shift_signups(session, cutoff, batch_size=1000):
+    """归档日期早于 cutoff 的岗位报名，返回报名数"""
+    moved = 0
+    while True:
+        rows = session.query(ShiftSignup, RecurringShift)\
+            .join(RecurringShift, RecurringShift.id == ShiftSignup.shift_id)\
+            .filter(ShiftSignup.date < cutoff)\
+            .order_by(ShiftSignup.id).limit(batch_size).all()
+        if not rows:
+            return moved
+        signup_ids = [signup.id for signup, _ in rows]
+        signup_owners = [(signup.id, signup.student_id) for signup, _ in rows]
+
+        totals = {}
+        archived = _archived_ids(session, ArchivedShiftSignup, signup_ids, cutoff)
+        for signup, shift in rows:
+            if signup.id not in archived:
+                session.add(ArchivedShiftSignup(
+                    source_id=signup.id, archived_through=cutoff, student_id=signup.student_id,
+                    shift_id=shift.id, shift_name=shift.name, day_of_week=shift.day_of_week,
+                    hours_value=shift.hours_value, date=signup.date, status=signup.status,
+                    created_at=signup.created_at
+                ))
+            if signup.status != 'cancelled':  # 已取消的报名只保留记录，不计时长
+                _add(totals, signup.student_id, shift.hours_value, shifts=1)
+        session.commit()
+
+        changelog.record(session, ShiftSignup, signup_owners, "delete")
+        session.query(ShiftSignup).filter(ShiftSignup.id.in_(signup_ids)).delete(synchronize_session=False)
+        _apply_totals(session, totals, cutoff)
+        session.commit()
+        moved += len(signup_ids)
+
+
+def archive_before(cutoff):
+    """归档 cutoff 之前的所有冷数据，返回统计信息"""
+    if cutoff > date.today():
+        raise ValueError("归档线不能晚于今天")
+    create_all()  # 首次归档时创建归档库的表
+    event_index.ensure(db.session)
+    events, event_signups = archive_events(db.session, cutoff)
+    shift_signups = archive_shift_signups(db.session, cutoff)
+    # 总时长不变，但活动列表和历史记录的来源变了
+    cache.invalidate("events", "shifts", "leaderboard")
+    return {"events": events, "eventSignups": event_signups, "shiftSignups": shift_signups}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--before", help="归档线 YYYY-MM-DD，默认本学年开始日期")
+    parser.add_argument("--dry-run", action="store_true", help="只统计待归档的记录数")
+    parser.add_argument("--tenant", help="多校区部署时要归档的学校")
+    args = parser.parse_args()
+
+    cutoff = datetime.strptime(args.before, "%Y-%m-%d").date() if args.before else school_year_start()
+    with create_app(blueprints=False).app_context(), using_tenant(args.tenant):
+        if args.dry_run:
+            boundary = datetime.combine(cutoff, datetime.min.time())
+            events = Event.query.filter(Event.end_time < boundary).count()
+            event_signups = EventSignup.query.join(Event).filter(Event.end_time < boundary).count()
+            shift_signups = ShiftSignup.query.filter(ShiftSignup.date < cutoff).count()
+            print(f"归档线 {cutoff}：待归档活动 {events} 个，活动报名 {event_signups} 条，岗位报名 {shift_signups} 条")
+            return
+        result = archive_before(cutoff)
+        print(f"归档线 {cutoff}：已归档活动 {result['events']} 个，"
+              f"活动报名 {result['eventSignups']} 条，岗位报名 {result['shiftSignups']} 条")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,332 @@
+"""
+异步 (ASGI) 服务入口
+
+报名高峰期的热点接口改由 SQLAlchemy asyncio 引擎处理，等待数据库时不占用工作线程：
+  - GET  /api/events
+  - GET  /api/shifts
+  - GET  /api/shifts/rotation
+  - POST /api/events/<id>/signup
+  - POST /api/shifts/<id>/signup
+  - POST /api/shifts/signup-batch
+其余所有路由原样转交给 app.create_app() 创建的 Flask 应用（在线程池中运行）。
+
+模型与校验规则全部来自 models.py / rules.py：业务函数接收同步 Session，这里通过 AsyncSession.run_sync()
+调用，查询本身仍经由异步驱动执行（SQLite 使用 aiosqlite，Postgres 需安装 asyncpg）。
+缓存读写、失效与人数广播（配置 CACHE_URL 时是 Redis 往返）是同步调用，一律放到线程池中执行，不阻塞事件循环。
+配置了 DATABASE_READ_URL 时，上面三个 GET 接口读只读副本，报名后的 N 秒内仍读主库（见 replica.py）。
+配置了 TENANTS（多校区部署，见 tenancy.py）时不注册上述路由，所有请求由 Flask 按学校路由。
+
+启动：
+    uvicorn asgi:application --host 0.0.0.0 --port 5000 --workers 4
+"""
+import asyncio
+import contextlib
+import functools
+from datetime import datetime
+
+from a2wsgi import WSGIMiddleware
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from starlette.applications import Starlette
+from starlette.responses import Response
+from starlette.routing import Mount, Route
+from werkzeug.http import http_date, parse_accept_header, parse_etags
+
+import idempotency
+from app import create_app
+from extensions import cache
+from payload import compress_body, negotiate_encoding
+from replica import REPLICA_BIND, STICKY_COOKIE, STICKY_HEADER, wants_primary
+from rules import (
+    SignupError, list_events, list_shifts, week_rotation, week_start_of, send_notice,
+    create_event_signup, create_shift_signup, event_signup_notice, shift_signup_notice,
+    parse_shift_slots, create_shift_signups, shift_signups_notice,
+)
+from web import admit_signup, response_cache_key, response_etag
+
+ASYNC_DRIVERS = {
+    "sqlite://": "sqlite+aiosqlite://",
+    "postgresql://": "postgresql+asyncpg://",
+}
+
+
+def async_database_url(url):
+    """把同步连接串换成对应的异步驱动"""
+    for prefix, async_prefix in ASYNC_DRIVERS.items():
+        if url.startswith(prefix):
+            return async_prefix + url[len(prefix):]
+    return url
+
+
+flask_app = create_app()
+engine = create_async_engine(async_database_url(flask_app.config['SQLALCHEMY_DATABASE_URI']))
+Session = async_sessionmaker(engine, expire_on_commit=False)
+
+# 只读副本（规则同 replica.py）：未配置时读写都用主库
+_read_url = flask_app.config['SQLALCHEMY_BINDS'].get(REPLICA_BIND)
+read_engine = create_async_engine(async_database_url(_read_url)) if _read_url else engine
+ReadSession = async_sessionmaker(read_engine, expire_on_commit=False)
+STICKY_SECONDS = flask_app.config['DATABASE_READ_STICKY_SECONDS']
+
+
+def sticky_to_primary(request):
+    """写请求之后的 N 秒内（带 X-Read-Primary 请求头或粘滞 Cookie）只读主库，也不读响应缓存"""
+    return read_engine is not engine and wants_primary(request.cookies, request.headers)
+
+
+def read_session_factory(request):
+    if read_engine is engine or sticky_to_primary(request):
+        return Session
+    return ReadSession
+
+
+# ==========================================
+# 响应工具：与 Flask 端保持相同的 JSON 序列化、压缩与跨域头
+# ==========================================
+
+def encoded_response(request, body, status=200, headers=None):
+    headers = dict(headers or {})
+    headers["Access-Control-Allow-Origin"] = "*"  # 与 app.py 中的 Flask-CORS 配置一致
+    headers["Access-Control-Expose-Headers"] = f"Retry-After, {STICKY_HEADER}"
+    headers["Vary"] = "Accept-Encoding"
+    if len(body) >= flask_app.config["COMPRESS_MIN_SIZE"]:
+        encoding = negotiate_encoding(parse_accept_header(request.headers.get("accept-encoding")))
+        if encoding:
+            body = compress_body(body, encoding, flask_app.config)
+            headers["Content-Encoding"] = encoding
+            if headers.get("ETag", "").startswith('"'):
+                headers["ETag"] = "W/" + headers["ETag"]
+    return Response(body, status_code=status, headers=headers, media_type="application/json")
+
+
+def json_response(request, obj, status=200):
+    return encoded_response(request, flask_app.json.dumps(obj).encode(), status)
+
+
+def lookup_cached(path, args, tags, ttl, sticky=False):
+    # 计算缓存键要读取各标签的令牌，与读取缓存条目一起在线程池中完成
+    key = response_cache_key(path, args, tags, ttl)
+    return key, None if sticky else cache.get(key)
+
+
+async def cached_json(request, tags, ttl, fn, *args):
+    """
+    与 web.cached_response 共用缓存条目和 ETag，命中 If-None-Match 时返回 304。
+    缓存读写在线程池中执行：配置 CACHE_URL 时每次都是一次 Redis 往返，不能阻塞事件循环
+    """
+    query_items = request.query_params.multi_items()
+    key, cached = await asyncio.to_thread(lookup_cached, request.url.path, query_items, tags, ttl,
+                                          sticky_to_primary(request))
+    if cached is None:
+        session_factory = read_session_factory(request)
+        body = flask_app.json.dumps(await run(fn, *args, session_factory=session_factory)).encode()
+        cached = (body, "application/json", datetime.now().replace(microsecond=0))
+        if session_factory is ReadSession:
+            # 副本可能落后于主库：缓存时间不超过写后读主库的时长
+            ttl = min(ttl, STICKY_SECONDS) if ttl else STICKY_SECONDS
+        await asyncio.to_thread(cache.set, key, cached, ttl)
+
+    body, _, generated_at = cached
+    etag = response_etag(key)
+    headers = {
+        "ETag": f'"{etag}"',
+        "Last-Modified": http_date(generated_at),
+        "Cache-Control": "public, no-cache",
+    }
+    if parse_etags(request.headers.get("if-none-match")).contains_weak(etag):
+        headers["Access-Control-Allow-Origin"] = "*"
+        return Response(status_code=304, headers=headers)
+    return encoded_response(request, body, headers=headers)
+
+
+async def run(fn, *args, session_factory=Session):
+    """在新的异步会话中执行共享的同步业务函数"""
+    async with session_factory() as session:
+        return await session.run_sync(fn, *args)
+
+
+# ==========================================
+# 热点接口
+# ==========================================
+
+async def get_events(request):
+    return await cached_json(request, ("events",), 30, list_events)
+
+
+async def get_shifts(request):
+    return await cached_json(request, ("shifts",), None, list_shifts)
+
+
+async def get_current_rotation(request):
+    week_start = week_start_of(request.query_params.get("date"))
+    return await cached_json(request, (f"rotation:{week_start.isoformat()}",), 300, week_rotation, week_start)
+
+
+def admission_controlled(handler):
+    """与 Flask 端相同的准入控制：判断只涉及内存操作，不会阻塞事件循环"""
+    @functools.wraps(handler)
+    async def wrapper(request):
+        try:
+            data = await request.json()
+        except ValueError:  # 空请求体或不是合法 JSON
+            data = None
+        if not isinstance(data, dict):
+            return json_response(request, {"message": "缺少必填信息"}, 400)
+        ticket = request.headers.get("x-queue-ticket")
+        client_key = data.get("studentId") or (request.client.host if request.client else None)
+        admission, rejection = admit_signup(client_key, ticket)
+        if rejection:
+            body, headers = rejection
+            response = json_response(request, body, 429)
+            response.headers.update(headers)
+            return response
+        try:
+            response = await handler(request, data)
+        finally:
+            admission.release()
+        if read_engine is not engine:
+            response.headers[STICKY_HEADER] = str(STICKY_SECONDS)
+            response.set_cookie(STICKY_COOKIE, "1", max_age=STICKY_SECONDS, httponly=True, samesite="lax")
+        return response
+    return wrapper
+
+
+def idempotent(handler):
+    """与 web.idempotent 相同的幂等键处理：每次重复请求只做一次按主键的查询，第一次请求仍在执行时返回 409"""
+    @functools.wraps(handler)
+    async def wrapper(request):
+        key = request.headers.get(idempotency.HEADER)
+        if not key:
+            return await handler(request)
+        if len(key) > idempotency.MAX_KEY_LENGTH:
+            return json_response(request, {"message": "Idempotency-Key 过长"}, 400)
+
+        request_fingerprint = idempotency.fingerprint(request.method, request.url.path, await request.body())
+        ttl = flask_app.config["IDEMPOTENCY_TTL_SECONDS"]
+        state, record = await run(idempotency.claim, key, request_fingerprint, ttl)
+
+        if state == "mismatch":
+            return json_response(request, {"message": "该 Idempotency-Key 已用于其他请求"}, 422)
+        if state == "processing":
+            response = json_response(request, {"message": "相同的请求正在处理中，请稍后重试"}, 409)
+            response.headers["Retry-After"] = "1"
+            return response
+        if state == "done":
+            response = encoded_response(request, record.response_body, record.response_status)
+            response.headers["Idempotent-Replayed"] = "true"
+            return response
+
+        try:
+            response = await handler(request)
+        except Exception:
+            await run(idempotency.release, key)
+            raise
+        # 只保存未压缩的响应体（报名响应很小，不会被压缩），与 Flask 端保存的格式一致
+        if idempotency.should_store(response.status_code) and "content-encoding" not in response.headers:
+            await run(idempotency.complete, key, response.status_code, response.body, "application/json")
+        else:
+            await run(idempotency.release, key)
+        return response
+    return wrapper
+
+
+@idempotent
+@admission_controlled
+async def signup_event(request, data):
+    async with Session() as session:
+        try:
+            signup, event = await session.run_sync(
+                create_event_signup, request.path_params["event_id"], data.get("studentId")
+            )
+            await session.commit()
+        except SignupError as e:
+            await session.rollback()
+            return json_response(request, {"message": e.message}, e.status)
+        except Exception:
+            await session.rollback()
+            return json_response(request, {"message": "报名失败，请稍后重试"}, 500)
+
+        notice = await session.run_sync(event_signup_notice, event, signup.student_id)
+    await asyncio.to_thread(send_notice, *notice)
+    return json_response(request, {"message": "报名成功！"}, 201)
+
+
+@idempotent
+@admission_controlled
+async def signup_shift(request, data):
+    if "studentId" not in data or "date" not in data:
+        return json_response(request, {"message": "缺少必填信息"}, 400)
+    try:
+        signup_date = datetime.strptime(data["date"], "%Y-%m-%d").date()
+    except ValueError:
+        return json_response(request, {"message": "日期格式错误，应为YYYY-MM-DD"}, 400)
+
+    async with Session() as session:
+        try:
+            signup, shift = await session.run_sync(
+                create_shift_signup, request.path_params["shift_id"], data["studentId"], signup_date
+            )
+            await session.commit()
+        except SignupError as e:
+            await session.rollback()
+            return json_response(request, {"message": e.message}, e.status)
+        except Exception:
+            await session.rollback()
+            return json_response(request, {"message": "报名失败，请稍后重试"}, 500)
+
+        notice = await session.run_sync(shift_signup_notice, shift, signup_date, signup.student_id)
+        result = {"message": "报名成功！", "signup": signup.to_dict()}
+    await asyncio.to_thread(send_notice, *notice)
+    return json_response(request, result, 201)
+
+
+@idempotent
+@admission_controlled
+async def signup_shifts(request, data):
+    if "studentId" not in data or "slots" not in data:
+        return json_response(request, {"message": "缺少必填信息"}, 400)
+
+    async with Session() as session:
+        try:
+            slots = parse_shift_slots(data["slots"])
+            created = await session.run_sync(create_shift_signups, data["studentId"], slots)
+            await session.commit()
+        except SignupError as e:
+            await session.rollback()
+            return json_response(request, {"message": e.message}, e.status)
+        except Exception:
+            await session.rollback()
+            return json_response(request, {"message": "报名失败，请稍后重试"}, 500)
+
+        notice = await session.run_sync(shift_signups_notice, created, data["studentId"])
+        result = {
+            "message": f"报名成功！共{len(created)}个岗位",
+            "signups": [signup.to_dict() for signup, _ in created],
+        }
+    await asyncio.to_thread(send_notice, *notice)
+    return json_response(request, result, 201)
+
+
+@contextlib.asynccontextmanager
+async def lifespan(_app):
+    yield
+    await engine.dispose()
+    if read_engine is not engine:
+        await read_engine.dispose()
+
+
+# 只匹配路径、不匹配方法的请求（如 CORS 预检 OPTIONS）会继续落到下面的 Flask 挂载点
+fast_routes = [
+    Route("/api/events", get_events, methods=["GET"]),
+    Route("/api/shifts", get_shifts, methods=["GET"]),
+    Route("/api/shifts/rotation", get_current_rotation, methods=["GET"]),
+    Route("/api/events/{event_id:int}/signup", signup_event, methods=["POST"]),
+    Route("/api/shifts/{shift_id:int}/signup", signup_shift, methods=["POST"]),
+    Route("/api/shifts/signup-batch", signup_shifts, methods=["POST"]),
+]
+# 多校区部署（见 tenancy.py）：异步引擎只连接单库，所有请求交给 Flask 按学校路由
+if flask_app.config['TENANTS']:
+    fast_routes = []
+
+application = Starlette(routes=fast_routes + [
+    Mount("/", app=WSGIMiddleware(flask_app)),
+], lifespan=lifespan)
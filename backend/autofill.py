@@ -0,0 +1,81 @@
+"""
+周常岗位自动排班
+
+给定一周的岗位空位、轮值班级的学生（含累计时长）和已有报名，计算一份公平的分配：
+  - 每人每周最多 weekly_limit 个岗位（含已自行报名的）
+  - 同一人不会被排进同一岗位两次，也不会被排进时间重叠的两个岗位
+  - 优先安排累计时长（含本周已排时长）最少的学生，让全班时长逐步拉平
+
+按时间顺序逐个填空位，候选人用最小堆按 (预计时长, 本周已排数, 学生ID) 排序，
+总复杂度 O(空位数 × log 学生数)，与数据库无关，便于单独做基准测试。
+"""
+import heapq
+from dataclasses import dataclass, field
+
+
+@dataclass
+class Slot:
+    shift_id: int
+    date: object  # datetime.date
+    start: object  # datetime.time
+    end: object
+    hours: float
+    open_seats: int
+
+
+@dataclass
+class Candidate:
+    student_id: int
+    hours: float
+    week_count: int = 0
+    # 本周已占用的时间段 [(date, start, end)]
+    busy: list = field(default_factory=list)
+    taken: set = field(default_factory=set)  # {(shift_id, date)}
+
+    def can_take(self, slot):
+        if (slot.shift_id, slot.date) in self.taken:
+            return False
+        return not any(
+            day == slot.date and start < slot.end and slot.start < end
+            for day, start, end in self.busy
+        )
+
+    def take(self, slot):
+        self.week_count += 1
+        self.hours += slot.hours
+        self.busy.append((slot.date, slot.start, slot.end))
+        self.taken.add((slot.shift_id, slot.date))
+
+
+def assign_week(slots, candidates, weekly_limit=2):
+    """
+    slots: [Slot]，已按日期和开始时间排序
+    candidates: [Candidate]，week_count / busy / taken 需预先填入本周已有报名
+    返回 (assignments, unfilled)
+      assignments: [(student_id, Slot)]
+      unfilled: [(Slot, 缺少人数)]
+    """
+    heap = [(c.hours, c.week_count, c.student_id, c) for c in candidates if c.week_count < weekly_limit]
+    heapq.heapify(heap)
+
+    assignments = []
+    unfilled = []
+    for slot in slots:
+        seats = slot.open_seats
+        skipped = []
+        while seats > 0 and heap:
+            entry = heapq.heappop(heap)
+            candidate = entry[3]
+            if not candidate.can_take(slot):
+                skipped.append(entry)
+                continue
+            candidate.take(slot)
+            assignments.append((candidate.student_id, slot))
+            seats -= 1
+            if candidate.week_count < weekly_limit:
+                heapq.heappush(heap, (candidate.hours, candidate.week_count, candidate.student_id, candidate))
+        for entry in skipped:
+            heapq.heappush(heap, entry)
+        if seats > 0:
+            unfilled.append((slot, seats))
+    return assignments, unfilled
@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""
+在线备份与恢复
+
+    python backup.py backup [--gzip] [--out 路径] [--bind archive]
+    python backup.py restore 备份文件 [--bind archive]
+
+SQLite：使用 SQLite 在线备份 API 分页复制，每复制 --pages 页就释放读锁、让出 --sleep 秒，
+服务在备份期间照常读写。复制期间若有其他连接写入，SQLite 会从头重新复制；连续重来
+--max-restarts 次后改为一次性复制（只在复制期间短暂阻塞写入）。
+恢复同样通过备份 API 写回在线数据库文件，已打开的连接无需重建。
+
+Postgres：在 REPEATABLE READ 只读事务中对每张表执行 COPY ... TO STDOUT，流式写出
+（与 pg_dump 纯文本格式相同，也可以直接用 psql 导入）；恢复时在单个事务中清空各表、
+COPY ... FROM STDIN 写回并重置自增序列，失败则整体回滚。
+
+每个备份文件旁写一个 sha256sum 格式的 .sha256 校验文件，恢复前先校验。
+--bind archive 备份 / 恢复归档库（仅在归档库与主库不在同一个数据库时需要）。
+--tenant school-a 备份 / 恢复多校区部署中某所学校的数据库（见 tenancy.py）。
+"""
+import argparse
+import gzip
+import hashlib
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+from datetime import datetime
+
+from sqlalchemy import MetaData
+
+from app import create_app
+from config import basedir
+from extensions import cache
+from tenancy import engine_for, using_tenant
+
+CHUNK_SIZE = 1 << 20
+BACKUP_DIR = os.path.join(basedir, 'backups')
+
+
+class _Restarted(Exception):
+    pass
+
+
+class _HashingWriter:
+    """写入时顺带计算 sha256 与字节数"""
+
+    def __init__(self, f):
+        self.f = f
+        self.sha256 = hashlib.sha256()
+        self.size = 0
+
+    def write(self, data):
+        self.sha256.update(data)
+        self.size += len(data)
+        return self.f.write(data)
+
+    def flush(self):
+        self.f.flush()
+
+
+class _CopySection:
+    """把备份流中的一段 COPY 数据（到 \\. 为止）包装成文件对象，供 copy_expert 读取"""
+
+    def __init__(self, stream):
+        self._stream = stream
+        self._done = False
+
+    def readline(self, size=-1):
+        if self._done:
+            return b""
+        line = self._stream.readline()
+        if line in (b"\\.\n", b""):
+            self._done = True
+            return b""
+        return line
+
+    def read(self, size=-1):
+        chunks, n = [], 0
+        while size < 0 or n < size:
+            line = self.readline()
+            if not line:
+                break
+            chunks.append(line)
+            n += len(line)
+        return b"".join(chunks)
+
+
+# ==========================================
+# 校验
+# ==========================================
+
+def sha256_file(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def write_checksum(path, hexdigest):
+    with open(path + '.sha256', 'w') as f:
+        f.write(f"{hexdigest}  {os.path.basename(path)}\n")
+
+
+def verify_checksum(path):
+    """校验文件不存在时返回 False；校验不一致时抛出 ValueError"""
+    checksum_path = path + '.sha256'
+    if not os.path.exists(checksum_path):
+        return False
+    with open(checksum_path) as f:
+        expected = f.read().split()[0]
+    if sha256_file(path) != expected:
+        raise ValueError(f"校验失败：{path} 与 {checksum_path} 不一致")
+    return True
+
+
+def _open_backup(path):
+    return gzip.open(path, 'rb') if path.endswith('.gz') else open(path, 'rb')
+
+
+# ==========================================
+# SQLite
+# ==========================================
+
+def _paged_copy(source, target, pages, sleep, max_restarts):
+    """分页复制；被其他连接的写入打断超过 max_restarts 次后改为一次性复制"""
+    state = {"remaining": None, "restarts": 0}
+
+    def progress(status, remaining, total):
+        if state["remaining"] is not None and remaining > state["remaining"]:
+            state["restarts"] += 1
+            if state["restarts"] > max_restarts:
+                raise _Restarted()
+        state["remaining"] = remaining
+
+    try:
+        source.backup(target, pages=pages, progress=progress, sleep=sleep)
+    except _Restarted:
+        source.backup(target)
+    return state["restarts"]
+
+
+def backup_sqlite(db_path, out_path, compress=False, pages=1024, sleep=0.005, max_restarts=5):
+    fd, tmp_path = tempfile.mkstemp(suffix='.db', dir=os.path.dirname(out_path))
+    os.close(fd)
+    try:
+        source = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+        target = sqlite3.connect(tmp_path)
+        try:
+            restarts = _paged_copy(source, target, pages, sleep, max_restarts)
+        finally:
+            target.close()
+            source.close()
+
+        if compress:
+            with open(tmp_path, 'rb') as src, open(out_path, 'wb') as raw:
+                writer = _HashingWriter(raw)
+                with gzip.GzipFile(fileobj=writer, mode='wb', compresslevel=6) as sink:
+                    shutil.copyfileobj(src, sink, CHUNK_SIZE)
+            hexdigest = writer.sha256.hexdigest()
+        else:
+            os.replace(tmp_path, out_path)
+            hexdigest = sha256_file(out_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    write_checksum(out_path, hexdigest)
+    return {"restarts": restarts}
+
+
+def restore_sqlite(db_path, backup_path, pages=1024):
+    fd, tmp_path = tempfile.mkstemp(suffix='.db', dir=os.path.dirname(db_path) or '.')
+    os.close(fd)
+    try:
+        with _open_backup(backup_path) as src, open(tmp_path, 'wb') as dst:
+            shutil.copyfileobj(src, dst, CHUNK_SIZE)
+
+        source = sqlite3.connect(tmp_path)
+        try:
+            result = source.execute("PRAGMA integrity_check").fetchone()[0]
+            if result != 'ok':
+                raise ValueError(f"备份文件已损坏：{result}")
+            target = sqlite3.connect(db_path, timeout=30)
+            try:
+                source.backup(target, pages=pages)
+            finally:
+                target.close()
+        finally:
+            source.close()
+    finally:
+        os.remove(tmp_path)
+    return {}
+
+
+# ==========================================
+# Postgres
+# ==========================================
+
+def _quote(engine, name):
+    return engine.dialect.identifier_preparer.quote(name)
+
+
+def backup_postgres(engine, out_path, compress=False):
+    metadata = MetaData()
+    metadata.reflect(bind=engine)
+    raw = engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        # 同一快照下导出所有表，不阻塞其他事务的写入
+        cursor.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ, READ ONLY")
+        with open(out_path, 'wb') as f:
+            writer = _HashingWriter(f)
+            sink = gzip.GzipFile(fileobj=writer, mode='wb', compresslevel=6) if compress else writer
+            sink.write(f"-- volunteer backup {datetime.now().isoformat()}\n".encode())
+            rows = {}
+            for table in metadata.sorted_tables:
+                columns = ", ".join(_quote(engine, c.name) for c in table.columns)
+                target = f"{_quote(engine, table.name)} ({columns})"
+                sink.write(f"COPY {target} FROM stdin;\n".encode())
+                cursor.copy_expert(f"COPY {target} TO STDOUT", sink)
+                sink.write(b"\\.\n")
+                rows[table.name] = cursor.rowcount
+            if compress:
+                sink.close()
+        raw.rollback()
+    finally:
+        raw.close()
+    write_checksum(out_path, writer.sha256.hexdigest())
+    return {"rows": rows}
+
+
+def restore_postgres(engine, backup_path):
+    metadata = MetaData()
+    metadata.reflect(bind=engine)
+    raw = engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        tables = ", ".join(_quote(engine, t.name) for t in metadata.sorted_tables)
+        if tables:
+            cursor.execute(f"TRUNCATE {tables} RESTART IDENTITY CASCADE")
+        restored = []
+        with _open_backup(backup_path) as stream:
+            for line in iter(stream.readline, b""):
+                if not line.startswith(b"COPY "):
+                    continue
+                statement = line.decode().rstrip().rstrip(';')
+                cursor.copy_expert(statement, _CopySection(stream))
+                restored.append(statement.split()[1].strip('"'))
+        # COPY 不会推进自增序列，按各表当前最大 ID 重置
+        for table in metadata.sorted_tables:
+            if table.name in restored and 'id' in table.columns:
+                name = _quote(engine, table.name)
+                cursor.execute(
+                    f"SELECT setval(pg_get_serial_sequence(%s, 'id'), COALESCE(MAX(id), 1), MAX(id) IS NOT NULL) "
+                    f"FROM {name}",
+                    (name,)
+                )
+        raw.commit()
+    except Exception:
+        raw.rollback()
+        raise
+    finally:
+        raw.close()
+    return {"tables": len(restored)}
+
+
+# ==========================================
+# 入口
+# ==========================================
+
+def default_backup_path(engine, compress):
+    os.makedirs(BACKUP_DIR, exist_ok=True)
+    name = engine.url.database and os.path.splitext(os.path.basename(engine.url.database))[0]
+    suffix = '.db' if engine.dialect.name == 'sqlite' else '.sql'
+    return os.path.join(
+        BACKUP_DIR, f"{name or 'volunteer'}-{datetime.now():%Y%m%d-%H%M%S}{suffix}" + ('.gz' if compress else '')
+    )
+
+
+def backup(out_path=None, bind=None, compress=False, pages=1024, sleep=0.005):
+    engine = engine_for(bind)
+    out_path = out_path or default_backup_path(engine, compress)
+    if engine.dialect.name == 'sqlite':
+        stats = backup_sqlite(engine.url.database, out_path, compress, pages, sleep)
+    elif engine.dialect.name == 'postgresql':
+        stats = backup_postgres(engine, out_path, compress)
+    else:
+        raise ValueError(f"不支持的数据库：{engine.dialect.name}")
+    return out_path, stats
+
+
+def restore(backup_path, bind=None, verify=True, pages=1024):
+    if verify and not verify_checksum(backup_path):
+        raise ValueError(f"缺少校验文件 {backup_path}.sha256（确认无误可加 --no-verify）")
+    engine = engine_for(bind)
+    engine.dispose()  # 归还连接池中的连接，恢复后重新连接
+    if engine.dialect.name == 'sqlite':
+        stats = restore_sqlite(engine.url.database, backup_path, pages)
+    elif engine.dialect.name == 'postgresql':
+        stats = restore_postgres(engine, backup_path)
+    else:
+        raise ValueError(f"不支持的数据库：{engine.dialect.name}")
+    # 本进程及共享缓存中的数据均已过期；未配置 CACHE_URL 时其他 worker 需重启
+    cache.invalidate("events", "shifts", "leaderboard")
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_backup = sub.add_parser("backup", help="在线备份")
+    p_backup.add_argument("--out", help="输出文件，默认 backups/<库名>-<时间>.db[.gz]")
+    p_backup.add_argument("--gzip", action="store_true", help="gzip 压缩")
+    p_backup.add_argument("--pages", type=int, default=1024, help="SQLite 每步复制的页数")
+    p_backup.add_argument("--sleep", type=float, default=0.005, help="SQLite 每步之间让出的秒数")
+    p_restore = sub.add_parser("restore", help="从备份恢复（覆盖当前数据）")
+    p_restore.add_argument("path")
+    p_restore.add_argument("--no-verify", action="store_true", help="跳过 sha256 校验")
+    for p in (p_backup, p_restore):
+        p.add_argument("--bind", help="数据库绑定名，如 archive；默认主库")
+        p.add_argument("--tenant", help="多校区部署时要备份 / 恢复的学校（归档表在该校的库中）")
+    args = parser.parse_args()
+
+    with create_app(blueprints=False).app_context(), using_tenant(args.tenant):
+        t0 = time.perf_counter()
+        if args.command == "backup":
+            path, stats = backup(args.out, args.bind, args.gzip, args.pages, args.sleep)
+            elapsed = time.perf_counter() - t0
+            size = os.path.getsize(path)
+            print(f"备份完成：{path}，{size / 1e6:.1f} MB，用时 {elapsed:.2f}s "
+                  f"({size / 1e6 / max(elapsed, 1e-6):.1f} MB/s) {stats}")
+        else:
+            stats = restore(args.path, args.bind, verify=not args.no_verify)
+            print(f"恢复完成：{args.path}，用时 {time.perf_counter() - t0:.2f}s {stats}")
+
+
+if __name__ == "__main__":
+    main()
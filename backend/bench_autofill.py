@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+自动排班基准：50 名学生 × 20 个岗位
+
+    python bench_autofill.py --students 50 --slots 20
+
+分别统计纯算法 (autofill.assign_week) 的耗时，以及通过
+POST /api/admin/shifts/autofill 预览 / 写入的端到端耗时（临时 SQLite 数据库）。
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+import timeit
+from datetime import date, datetime, timedelta
+
+_tmpdir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(_tmpdir, "bench.db")
+os.environ.pop("CACHE_URL", None)
+
+from app import create_app  # noqa: E402
+from extensions import db  # noqa: E402
+from models import RecurringShift, Student, WeeklyRotation  # noqa: E402
+from autofill import Candidate, Slot, assign_week  # noqa: E402
+
+app = create_app()
+
+
+def synthetic_problem(n_students, n_slots, monday):
+    rnd = random.Random(7)
+    slots = []
+    for i in range(n_slots):
+        start = datetime.combine(monday, datetime.min.time()).replace(hour=7 + (i // 5) * 3)
+        slots.append(Slot(i + 1, monday + timedelta(days=i % 5), start.time(),
+                          (start + timedelta(minutes=20)).time(), 0.5, 2))
+    slots.sort(key=lambda s: (s.date, s.start))
+    candidates = [Candidate(student_id=i + 1, hours=round(rnd.uniform(0, 40), 1)) for i in range(n_students)]
+    return slots, candidates
+
+
+def seed(n_students, n_slots, monday):
+    db.create_all()
+    db.session.add(Student(name="管理员", phone="admin", password="admin123",
+                           enrollment_year=2020, class_number=0, is_admin=True))
+    db.session.add_all([
+        Student(name=f"学生{i:03d}", phone=f"139{i:08d}", password="123456",
+                enrollment_year=2024, class_number=3)
+        for i in range(n_students)
+    ])
+    for i in range(n_slots):
+        start = datetime.combine(monday, datetime.min.time()).replace(hour=7 + (i // 5) * 3)
+        db.session.add(RecurringShift(name=f"岗位{i}", day_of_week=1 + i % 5, start_time=start.time(),
+                                      end_time=(start + timedelta(minutes=20)).time(),
+                                      capacity=2, hours_value=0.5))
+    db.session.add(WeeklyRotation(week_start_date=monday, assigned_class_str="2024-3"))
+    db.session.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=50)
+    parser.add_argument("--slots", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    # 下周一，保证所有岗位日期都在未来
+    monday = date.today() - timedelta(days=date.today().weekday()) + timedelta(weeks=1)
+
+    def solve():
+        slots, candidates = synthetic_problem(args.students, args.slots, monday)
+        return assign_week(slots, candidates)
+
+    assignments, unfilled = solve()
+    t_solver = min(timeit.repeat(solve, number=1, repeat=args.repeat))
+    print(f"算法: {len(assignments)} 个分配, {len(unfilled)} 个空缺岗位, 最快 {t_solver * 1000:.2f} ms")
+
+    with app.app_context():
+        seed(args.students, args.slots, monday)
+    client = app.test_client()
+    headers = {"X-Admin-Token": "admin"}
+    body = {"weekStart": monday.isoformat(), "preview": True}
+
+    t0 = time.perf_counter()
+    resp = client.post("/api/admin/shifts/autofill", json=body, headers=headers)
+    t_preview = time.perf_counter() - t0
+    print(f"预览接口: {resp.status_code}, {len(resp.get_json()['assignments'])} 个分配, {t_preview * 1000:.2f} ms")
+
+    t0 = time.perf_counter()
+    resp = client.post("/api/admin/shifts/autofill", json={**body, "preview": False}, headers=headers)
+    t_commit = time.perf_counter() - t0
+    print(f"写入接口: {resp.status_code}, 写入 {resp.get_json()['created']} 条, {t_commit * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+备份 / 恢复基准：在临时 SQLite 数据库中生成大量报名记录后计时
+
+    python bench_backup.py --students 5000 --signups 300000
+
+依次统计：普通备份、gzip 备份、备份期间另一连接持续写入时的写入延迟，以及恢复耗时。
+"""
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+from datetime import date, time as dt_time, timedelta
+
+_tmpdir = tempfile.mkdtemp()
+_db_path = os.path.join(_tmpdir, "bench.db")
+os.environ["DATABASE_URL"] = "sqlite:///" + _db_path
+os.environ.pop("CACHE_URL", None)
+
+from sqlalchemy import insert  # noqa: E402
+
+from app import create_app  # noqa: E402
+from extensions import db  # noqa: E402
+from models import RecurringShift, ShiftSignup, Student  # noqa: E402
+import backup  # noqa: E402
+
+
+def seed(n_students, n_signups):
+    db.create_all()
+    db.session.execute(insert(Student), [
+        {"name": f"学生{i:05d}", "phone": f"139{i:08d}", "password": "123456",
+         "enrollment_year": 2020 + i % 5, "class_number": 1 + i % 12}
+        for i in range(n_students)
+    ])
+    db.session.execute(insert(RecurringShift), [
+        {"name": f"岗位{i}", "day_of_week": 1 + i % 5, "start_time": dt_time(7 + i % 10),
+         "end_time": dt_time(8 + i % 10), "capacity": 2, "hours_value": 0.5}
+        for i in range(20)
+    ])
+    rnd = random.Random(7)
+    start = date(2020, 9, 1)
+    seen = set()
+    rows = []
+    while len(rows) < n_signups:
+        key = (rnd.randint(1, 20), start + timedelta(days=rnd.randint(0, 2000)), rnd.randint(1, n_students))
+        if key in seen:
+            continue
+        seen.add(key)
+        rows.append({"shift_id": key[0], "date": key[1], "student_id": key[2], "status": "pending"})
+    for i in range(0, len(rows), 50000):
+        db.session.execute(insert(ShiftSignup), rows[i:i + 50000])
+    db.session.commit()
+
+
+def concurrent_writes(stop, latencies):
+    """备份期间模拟报名写入：每 20ms 一次短事务"""
+    conn = sqlite3.connect(_db_path, timeout=30)
+    i = 0
+    while not stop.is_set():
+        t0 = time.perf_counter()
+        conn.execute("INSERT INTO weekly_rotations (week_start_date, assigned_class_str) VALUES (?, ?)",
+                     ((date(3000, 1, 1) + timedelta(days=i)).isoformat(), "bench"))
+        conn.commit()
+        latencies.append(time.perf_counter() - t0)
+        i += 1
+        time.sleep(0.02)
+    conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=5000)
+    parser.add_argument("--signups", type=int, default=300000)
+    parser.add_argument("--pages", type=int, default=1024)
+    args = parser.parse_args()
+
+    with create_app(blueprints=False).app_context():
+        t0 = time.perf_counter()
+        seed(args.students, args.signups)
+        size = os.path.getsize(_db_path)
+        print(f"生成数据: {args.students} 名学生, {args.signups} 条报名, {size / 1e6:.1f} MB, "
+              f"{time.perf_counter() - t0:.1f}s")
+
+        for compress in (False, True):
+            out = os.path.join(_tmpdir, "plain.db" if not compress else "backup.db.gz")
+            t0 = time.perf_counter()
+            backup.backup(out, compress=compress, pages=args.pages)
+            elapsed = time.perf_counter() - t0
+            print(f"{'gzip' if compress else '普通'}备份: {os.path.getsize(out) / 1e6:.1f} MB, {elapsed * 1000:.0f} ms")
+
+        stop = threading.Event()
+        latencies = []
+        writer = threading.Thread(target=concurrent_writes, args=(stop, latencies))
+        writer.start()
+        time.sleep(0.1)
+        t0 = time.perf_counter()
+        _, stats = backup.backup(os.path.join(_tmpdir, "busy.db"), pages=args.pages)
+        elapsed = time.perf_counter() - t0
+        stop.set()
+        writer.join()
+        latencies.sort()
+        print(f"写入期间备份: {elapsed * 1000:.0f} ms, 重新复制 {stats['restarts']} 次; "
+              f"同时完成 {len(latencies)} 次写入, 写入延迟 p50 {latencies[len(latencies) // 2] * 1000:.1f} ms, "
+              f"最大 {latencies[-1] * 1000:.1f} ms")
+
+        t0 = time.perf_counter()
+        backup.restore(os.path.join(_tmpdir, "backup.db.gz"))
+        elapsed = time.perf_counter() - t0
+        print(f"恢复 (gzip): {elapsed * 1000:.0f} ms, 恢复后报名数 {ShiftSignup.query.count()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+大响应体基准：比较 JSON 序列化耗时与传输字节数
+
+    python bench_payloads.py --students 1500 --events 200
+
+在临时 SQLite 数据库中生成数据，对 /api/admin/students 与 /api/admin/shifts/signups
+分别统计：Flask 默认 JSON provider 与 orjson 的序列化耗时，以及 原始 / gzip / br 的字节数。
+"""
+import argparse
+import gzip
+import os
+import random
+import sys
+import tempfile
+import timeit
+from datetime import date, datetime, time, timedelta
+
+_tmpdir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(_tmpdir, "bench.db")
+os.environ.pop("CACHE_URL", None)
+
+from flask.json.provider import DefaultJSONProvider  # noqa: E402
+
+from app import create_app  # noqa: E402
+from extensions import db  # noqa: E402
+from models import Event, EventSignup, RecurringShift, ShiftSignup, Student  # noqa: E402
+from payload import ORJSONProvider, brotli, orjson  # noqa: E402
+
+app = create_app()
+
+
+def seed(n_students, n_events):
+    rnd = random.Random(42)
+    db.create_all()
+    db.session.add(Student(name="管理员", phone="admin", password="admin123",
+                           enrollment_year=2020, class_number=0, is_admin=True))
+    db.session.execute(db.insert(Student), [{
+        "name": f"学生{i:05d}", "phone": f"138{i:08d}", "password": "123456",
+        "enrollment_year": 2022 + i % 4, "class_number": 1 + i % 12,
+        "qq": str(10000 + i), "wechat": f"wx_{i}", "is_admin": False,
+    } for i in range(n_students)])
+
+    shifts = [RecurringShift(name="食堂志愿" if i % 2 else "文明礼仪站岗", day_of_week=1 + i % 5,
+                             start_time=time(7 + i % 10, 30), end_time=time(8 + i % 10, 0),
+                             capacity=2, hours_value=0.5, description="基准测试岗位")
+              for i in range(18)]
+    db.session.add_all(shifts)
+
+    now = datetime.now()
+    db.session.execute(db.insert(Event), [{
+        "title": f"社区志愿活动 {i}", "description": "协助社区开展环境整治与宣传工作" * 3,
+        "start_time": now - timedelta(days=i), "end_time": now - timedelta(days=i) + timedelta(hours=2),
+        "registration_deadline": now - timedelta(days=i + 1), "location": "学校南门",
+        "required_volunteers": 40, "grade_limit": "ALL", "hours_value": 2.0,
+        "leader_name": "王老师", "leader_contact": "13900000000",
+    } for i in range(n_events)])
+    db.session.commit()
+
+    student_ids = [sid for (sid,) in db.session.query(Student.id).filter(Student.is_admin == False)]
+    event_ids = [eid for (eid,) in db.session.query(Event.id)]
+    db.session.execute(db.insert(EventSignup), [
+        {"student_id": sid, "event_id": eid}
+        for eid in event_ids for sid in rnd.sample(student_ids, 30)
+    ])
+
+    monday = date.today() - timedelta(days=date.today().weekday())
+    shift_rows = []
+    for week in range(20):
+        week_start = monday - timedelta(weeks=week)
+        for s in shifts:
+            day = week_start + timedelta(days=s.day_of_week - 1)
+            for sid in rnd.sample(student_ids, 2):
+                shift_rows.append({"student_id": sid, "shift_id": s.id, "date": day, "status": "pending"})
+    db.session.execute(db.insert(ShiftSignup), shift_rows)
+    db.session.commit()
+    return monday
+
+
+def measure(name, payload, repeat):
+    default_provider = DefaultJSONProvider(app)
+    baseline = default_provider.dumps(payload).encode()
+    t_default = min(timeit.repeat(lambda: default_provider.dumps(payload), number=1, repeat=repeat))
+
+    print(f"\n== {name}")
+    print(f"  默认 JSON:  {len(baseline):>10,} B  {t_default * 1000:8.2f} ms")
+    if orjson is None:
+        print("  (未安装 orjson，跳过)")
+        body = baseline
+    else:
+        fast_provider = ORJSONProvider(app)
+        body = fast_provider.response(payload).get_data()
+        t_fast = min(timeit.repeat(lambda: fast_provider.response(payload), number=1, repeat=repeat))
+        print(f"  orjson:     {len(body):>10,} B  {t_fast * 1000:8.2f} ms  ({t_default / t_fast:.1f}x)")
+
+    gz = gzip.compress(body, compresslevel=app.config["COMPRESS_LEVEL"])
+    print(f"  + gzip:     {len(gz):>10,} B  ({len(baseline) / len(gz):.1f}x smaller)")
+    if brotli is not None:
+        br = brotli.compress(body, quality=app.config["COMPRESS_BR_QUALITY"])
+        print(f"  + br:       {len(br):>10,} B  ({len(baseline) / len(br):.1f}x smaller)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=1500)
+    parser.add_argument("--events", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with app.app_context():
+        monday = seed(args.students, args.events)
+
+    client = app.test_client()
+    headers = {"X-Admin-Token": "admin", "Accept-Encoding": "identity"}
+    targets = [
+        ("/api/admin/students", "/api/admin/students"),
+        ("/api/admin/shifts/signups", f"/api/admin/shifts/signups?week_start={monday.isoformat()}"),
+    ]
+    for name, url in targets:
+        resp = client.get(url, headers=headers)
+        if resp.status_code != 200:
+            sys.exit(f"{url} 返回 {resp.status_code}")
+        measure(name, resp.get_json(), args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+启动耗时基准：用 python -X importtime 统计各场景的导入耗时
+
+    python bench_startup.py                 # 各场景取中位数，并列出最耗时的模块
+    python bench_startup.py --max-ms 900    # 任一场景超过预算时以非零状态退出（可用于 CI）
+
+场景：
+  models   只导入模型（后台脚本的最小依赖）
+  app      create_app()，注册全部蓝图
+  request  create_app() 并处理第一个请求 GET /api/events
+
+每次在新的子进程中运行，并指向临时 SQLite 数据库，不受已有 .pyc 以外的缓存影响。
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+SCENARIOS = {
+    "models": "import models",
+    "app": "from app import create_app; create_app()",
+    "request": (
+        "from app import create_app; from extensions import db\n"
+        "app = create_app()\n"
+        "with app.app_context(): db.create_all()\n"
+        "assert app.test_client().get('/api/events').status_code == 200"
+    ),
+}
+
+# import time: self [us] | cumulative | imported package
+_LINE_RE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def run_once(code, env):
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        env=env, capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__))
+    )
+    wall_ms = (time.perf_counter() - started) * 1000
+    if proc.returncode != 0:
+        sys.exit(proc.stderr)
+
+    # 顶层导入（缩进最少）的累计耗时之和即为导入总耗时
+    top_level, modules = 0, {}
+    for match in _LINE_RE.finditer(proc.stderr):
+        self_us, cumulative_us, indent, name = match.groups()
+        modules[name] = int(cumulative_us)
+        if len(indent) == 1:
+            top_level += int(cumulative_us)
+    return wall_ms, top_level / 1000, modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="列出累计耗时最多的模块数")
+    parser.add_argument("--max-ms", type=float, help="任一场景的进程耗时（中位数）超过该值时失败")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    env["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "bench.db")
+    env.pop("CACHE_URL", None)
+
+    over_budget = []
+    for name, code in SCENARIOS.items():
+        runs = [run_once(code, env) for _ in range(args.repeat)]
+        wall = statistics.median(r[0] for r in runs)
+        imports = statistics.median(r[1] for r in runs)
+        print(f"{name:8s} 进程 {wall:7.1f} ms   导入 {imports:7.1f} ms")
+
+        _, _, modules = runs[-1]
+        for module, cumulative_us in sorted(modules.items(), key=lambda kv: -kv[1])[:args.top]:
+            print(f"         {cumulative_us / 1000:7.1f} ms  {module}")
+        if args.max_ms is not None and wall > args.max_ms:
+            over_budget.append(name)
+
+    if over_budget:
+        sys.exit(f"超出启动预算 {args.max_ms} ms：{', '.join(over_budget)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""
+共享缓存层
+
+- MemoryCache：进程内 LRU + TTL 缓存，单进程部署 / 开发环境使用
+- RedisCache：网络缓存，所有 gunicorn worker 共享同一份数据和失效状态，
+  可连接 Redis 或本地替身服务器（见 cache_server.py）
+
+失效按标签进行（如 events、shifts、rotation:<周一日期>、student:<id>）：
+每个标签对应一个版本令牌，缓存条目的键里带上其所有标签的当前令牌。
+写操作调用 invalidate() 为标签换一个新令牌，旧条目自然再也不会被命中，
+因为令牌保存在共享后端中，其他 worker 下一次读取时立即生效。
+"""
+import os
+import pickle
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+
+def _new_token():
+    # 令牌只需全局唯一，不要求递增，因此无需跨进程加锁
+    return uuid.uuid4().hex[:16]
+
+
+class BaseCache(ABC):
+    """缓存后端的公共接口，子类实现 get/set/delete 与标签令牌的读写（缺少任一方法时无法实例化）"""
+
+    def __init__(self, default_ttl=300):
+        self.default_ttl = default_ttl
+
+    @abstractmethod
+    def get(self, key):
+        """未命中或已过期时返回 None"""
+
+    @abstractmethod
+    def set(self, key, value, ttl=None):
+        """ttl 为 None 时使用 default_ttl"""
+
+    @abstractmethod
+    def delete(self, key):
+        """删除单个条目"""
+
+    @abstractmethod
+    def tag_versions(self, tags):
+        """返回 {tag: 当前令牌}，不存在的标签会被初始化"""
+
+    @abstractmethod
+    def invalidate(self, *tags):
+        """使带有任一标签的缓存条目失效"""
+
+    def tagged_key(self, key, tags):
+        """把标签令牌拼进缓存键，返回 (完整键, 令牌串)"""
+        versions = self.tag_versions(tags)
+        stamp = ",".join(f"{t}={versions[t]}" for t in sorted(versions))
+        return f"{key}|{stamp}", stamp
+
+    def get_or_set(self, key, compute, tags=(), ttl=None):
+        """读取带标签的缓存条目，未命中时调用 compute() 计算并写入"""
+        full_key, _ = self.tagged_key(key, tags)
+        value = self.get(full_key)
+        if value is None:
+            value = compute()
+            self.set(full_key, value, ttl)
+        return value
+
+
+class MemoryCache(BaseCache):
+    """进程内缓存：条目数量有上限（LRU 淘汰），并支持按条目设置过期时间"""
+
+    def __init__(self, max_entries=2048, default_ttl=300):
+        super().__init__(default_ttl)
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # {key: (expires_at, value)}
+        # 标签令牌单独存放且不参与 LRU 淘汰，避免令牌丢失后误命中旧条目
+        self._tags = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.monotonic() + (ttl or self.default_ttl)
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def tag_versions(self, tags):
+        with self._lock:
+            return {t: self._tags.setdefault(t, _new_token()) for t in tags}
+
+    def invalidate(self, *tags):
+        with self._lock:
+            for t in tags:
+                self._tags[t] = _new_token()
+
+
+class RedisCache(BaseCache):
+    """
+    基于 Redis 协议的共享缓存。
+    需要安装 redis 包；服务端可以是 Redis / Valkey，或本地运行的 cache_server.py。
+    """
+
+    def __init__(self, url, prefix="volunteer:", default_ttl=300):
+        super().__init__(default_ttl)
+        import redis  # 可选依赖，仅在配置了 CACHE_URL 时需要
+
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def _k(self, key):
+        return f"{self.prefix}{key}"
+
+    def get(self, key):
+        raw = self.client.get(self._k(key))
+        return pickle.loads(raw) if raw is not None else None
+
+    def set(self, key, value, ttl=None):
+        self.client.set(self._k(key), pickle.dumps(value), ex=int(ttl or self.default_ttl))
+
+    def delete(self, key):
+        self.client.delete(self._k(key))
+
+    def tag_versions(self, tags):
+        tags = list(tags)
+        if not tags:
+            return {}
+        keys = [self._k(f"tag:{t}") for t in tags]
+        values = self.client.mget(keys)
+        versions = {}
+        for tag, key, raw in zip(tags, keys, values):
+            if raw is None:
+                # 并发初始化时只有一个 worker 写入成功，其余重新读取
+                self.client.set(key, _new_token(), nx=True)
+                raw = self.client.get(key)
+            versions[tag] = raw.decode() if isinstance(raw, bytes) else raw
+        return versions
+
+    def invalidate(self, *tags):
+        if not tags:
+            return
+        pipe = self.client.pipeline(transaction=False)
+        for t in tags:
+            pipe.set(self._k(f"tag:{t}"), _new_token())
+        pipe.execute()
+
+
+def create_cache(url=None, **kwargs):
+    """根据 CACHE_URL 选择后端：redis:// 开头使用共享缓存，否则使用进程内缓存"""
+    url = url if url is not None else os.environ.get("CACHE_URL")
+    if url:
+        return RedisCache(url, **kwargs)
+    return MemoryCache(**kwargs)
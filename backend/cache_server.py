@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+本地缓存替身服务器（Redis 协议子集）
+
+开发或测试多 worker 部署时，没有安装 Redis 也可以运行：
+    python cache_server.py --port 6390
+    CACHE_URL=redis://127.0.0.1:6390/0 gunicorn -w 4 app:app
+
+只实现了 cache.py / stream.py 用到的命令：
+PING HELLO GET SET(EX/PX/NX) MGET DEL INCR(BY) EXPIRE SELECT SUBSCRIBE UNSUBSCRIBE PUBLISH
+"""
+import argparse
+import socketserver
+import threading
+import time
+
+_store = {}  # {key(bytes): (value(bytes), expires_at or None)}
+_lock = threading.Lock()
+_channels = {}  # {channel(bytes): set(RESPHandler)}
+
+
+class CommandError(Exception):
+    pass
+
+
+def _encode(value, proto=2):
+    if isinstance(value, CommandError):
+        return b"-ERR " + str(value).encode() + b"\r\n"
+    if value is None:
+        return b"_\r\n" if proto == 3 else b"$-1\r\n"
+    if isinstance(value, int):
+        return b":%d\r\n" % value
+    if isinstance(value, dict):
+        return b"%%%d\r\n" % len(value) + b"".join(_encode(k, proto) + _encode(v, proto) for k, v in value.items())
+    if isinstance(value, list):
+        return b"*%d\r\n" % len(value) + b"".join(_encode(v, proto) for v in value)
+    if isinstance(value, str):
+        return b"+" + value.encode() + b"\r\n"
+    return b"$%d\r\n%s\r\n" % (len(value), value)
+
+
+def _get(key):
+    item = _store.get(key)
+    if item is None:
+        return None
+    value, expires_at = item
+    if expires_at is not None and expires_at < time.monotonic():
+        del _store[key]
+        return None
+    return value
+
+
+def execute(args):
+    cmd = args[0].upper()
+    with _lock:
+        if cmd == b"PING":
+            return "PONG"
+        if cmd in (b"SELECT", b"CLIENT"):
+            return "OK"
+        if cmd == b"HELLO":
+            # redis-py 新版本握手时会发送 HELLO 3；除空值外其余类型与 RESP2 编码相同
+            proto = int(args[1]) if len(args) > 1 else 2
+            info = {b"server": b"cache_server", b"version": b"7.0.0", b"proto": proto}
+            return info if proto == 3 else [x for kv in info.items() for x in kv]
+        if cmd == b"GET":
+            return _get(args[1])
+        if cmd == b"MGET":
+            return [_get(k) for k in args[1:]]
+        if cmd == b"SET":
+            key, value, expires_at = args[1], args[2], None
+            opts = [a.upper() for a in args[3:]]
+            i = 0
+            while i < len(opts):
+                if opts[i] == b"EX":
+                    expires_at = time.monotonic() + int(args[3 + i + 1])
+                    i += 2
+                elif opts[i] == b"PX":
+                    expires_at = time.monotonic() + int(args[3 + i + 1]) / 1000
+                    i += 2
+                elif opts[i] == b"NX":
+                    if _get(key) is not None:
+                        return None
+                    i += 1
+                else:
+                    return CommandError("syntax error")
+            _store[key] = (value, expires_at)
+            return "OK"
+        if cmd == b"DEL":
+            return sum(1 for k in args[1:] if _store.pop(k, None) is not None)
+        if cmd in (b"INCR", b"INCRBY"):
+            value = int(_get(args[1]) or 0) + (int(args[2]) if cmd == b"INCRBY" else 1)
+            expires_at = _store.get(args[1], (None, None))[1]
+            _store[args[1]] = (str(value).encode(), expires_at)
+            return value
+        if cmd == b"EXPIRE":
+            value = _get(args[1])
+            if value is None:
+                return 0
+            _store[args[1]] = (value, time.monotonic() + int(args[2]))
+            return 1
+    return CommandError(f"unknown command '{cmd.decode()}'")
+
+
+class Push(list):
+    """发布/订阅消息：RESP3 下用 push 类型（>）发送"""
+
+
+def _encode_push(value, proto):
+    if proto == 3:
+        return b">%d\r\n" % len(value) + b"".join(_encode(v, proto) for v in value)
+    return _encode(list(value), proto)
+
+
+def publish(channel, message):
+    with _lock:
+        handlers = list(_channels.get(channel, ()))
+    for handler in handlers:
+        handler.send(Push([b"message", channel, message]))
+    return len(handlers)
+
+
+class RESPHandler(socketserver.StreamRequestHandler):
+    def setup(self):
+        super().setup()
+        self.proto = 2
+        self.subscriptions = set()
+        self.write_lock = threading.Lock()
+
+    def send(self, value):
+        data = _encode_push(value, self.proto) if isinstance(value, Push) else _encode(value, self.proto)
+        with self.write_lock:
+            self.wfile.write(data)
+
+    def pubsub(self, cmd, channels):
+        if cmd == b"SUBSCRIBE":
+            for channel in channels:
+                with _lock:
+                    _channels.setdefault(channel, set()).add(self)
+                self.subscriptions.add(channel)
+                self.send(Push([b"subscribe", channel, len(self.subscriptions)]))
+        else:
+            for channel in channels or list(self.subscriptions):
+                with _lock:
+                    _channels.get(channel, set()).discard(self)
+                self.subscriptions.discard(channel)
+                self.send(Push([b"unsubscribe", channel, len(self.subscriptions)]))
+
+    def finish(self):
+        with _lock:
+            for channel in self.subscriptions:
+                _channels.get(channel, set()).discard(self)
+        super().finish()
+
+    def read_command(self):
+        line = self.rfile.readline()
+        if not line:
+            return None
+        if not line.startswith(b"*"):
+            return line.split()  # inline 命令，方便用 telnet 调试
+        args = []
+        for _ in range(int(line[1:])):
+            size = int(self.rfile.readline()[1:])
+            args.append(self.rfile.read(size + 2)[:-2])
+        return args
+
+    def handle(self):
+        while True:
+            args = self.read_command()
+            if args is None:
+                return
+            if not args:
+                continue
+            cmd = args[0].upper()
+            if cmd == b"HELLO" and len(args) > 1:
+                self.proto = int(args[1])
+            if cmd in (b"SUBSCRIBE", b"UNSUBSCRIBE"):
+                self.pubsub(cmd, args[1:])
+            elif cmd == b"PUBLISH":
+                self.send(publish(args[1], args[2]))
+            else:
+                self.send(execute(args))
+
+
+class Server(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="本地缓存替身服务器（Redis 协议子集）")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6390)
+    args = parser.parse_args()
+    with Server((args.host, args.port), RESPHandler) as server:
+        print(f"缓存替身服务器已启动: redis://{args.host}:{args.port}/0")
+        server.serve_forever()
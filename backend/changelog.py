@@ -0,0 +1,187 @@
+"""
+变更日志与增量同步 (GET /api/sync)
+
+活动、岗位、轮值和报名的每次新增 / 修改 / 删除都会在同一事务中写入 change_log 一行：
+  - 通过 ORM 的改动（session.add / 修改属性 / session.delete）在 flush 时由监听器自动记录
+  - 绕过 ORM 的批量 UPDATE / DELETE（归档、worker 的状态更新）需要调用方用 record() 显式记录
+活动报名的增删同时记一次活动的 upsert（报名人数变了）。事务回滚时日志一并回滚。
+
+同步协议：
+    GET /api/sync                      # 没有游标：返回全量快照，reset = true
+    GET /api/sync?since=<cursor>       # 只返回游标之后新增 / 修改 / 删除的记录
+    GET /api/sync?since=...&studentId= # 同时同步该学生本人的活动报名和岗位报名
+每类记录返回 {"upserted": [当前完整记录], "deleted": [id]}，客户端按 id 合并到本地副本后保存新的 cursor；
+hasMore 为 true 时立即用新游标再请求一次。游标过旧（对应的日志已被清理）时返回全量快照。
+
+游标是日志的自增 id。并发事务的 id 分配顺序与提交顺序不一定一致，为了不漏掉晚提交的小 id，
+游标只推进到 SETTLE 之前写入的日志；更新的日志下次同步会再返回一遍，客户端按 id 覆盖即可。
+活动的 status 取决于当前时间，日志只记录数据变化，客户端需要按 startTime / endTime 等字段自行刷新状态。
+
+日志保留 CHANGELOG_RETENTION_DAYS 天，由后台任务 purge_change_log 清理（总是保留最新一行）。
+"""
+from datetime import datetime, timedelta
+
+from sqlalchemy import event, func, insert, or_
+from sqlalchemy.orm import Session
+
+from models import ChangeLog, Event, EventSignup, RecurringShift, WeeklyRotation, ShiftSignup
+
+# 实体名 -> 模型；报名类记录只同步给所属学生
+ENTITIES = {
+    "event": Event,
+    "shift": RecurringShift,
+    "rotation": WeeklyRotation,
+    "eventSignup": EventSignup,
+    "shiftSignup": ShiftSignup,
+}
+ENTITY_NAMES = {model: name for name, model in ENTITIES.items()}
+STUDENT_ENTITIES = ("eventSignup", "shiftSignup")
+# 响应中每类记录的键名
+COLLECTIONS = {
+    "event": "events",
+    "shift": "shifts",
+    "rotation": "rotations",
+    "eventSignup": "eventSignups",
+    "shiftSignup": "shiftSignups",
+}
+
+SETTLE = timedelta(seconds=5)
+PAGE_SIZE = 500
+
+
+# ==========================================
+# 记录变更
+# ==========================================
+
+def _entry(entity, entity_id, op, student_id=None):
+    return {"entity": entity, "entity_id": entity_id, "op": op, "student_id": student_id}
+
+
+@event.listens_for(Session, "after_flush")
+def _capture_changes(session, flush_context):
+    """flush 后记录本次写入的受跟踪对象（此时新对象已有 id），与业务数据在同一事务中提交"""
+    changed = [(obj, "upsert") for obj in session.new]
+    changed += [(obj, "upsert") for obj in session.dirty if session.is_modified(obj, include_collections=False)]
+    changed += [(obj, "delete") for obj in session.deleted]
+
+    entries = {}
+    for obj, op in changed:
+        name = ENTITY_NAMES.get(type(obj))
+        if name is None:
+            continue
+        entries[(name, obj.id)] = _entry(name, obj.id, op, getattr(obj, "student_id", None))
+        # 活动报名增删后活动的 currentVolunteers / status 随之变化
+        if name == "eventSignup" and ("event", obj.event_id) not in entries:
+            entries[("event", obj.event_id)] = _entry("event", obj.event_id, "upsert")
+
+    if entries:
+        now = datetime.now()
+        rows = [dict(entry, created_at=now) for entry in entries.values()]
+        session.connection(bind_arguments={"mapper": ChangeLog}).execute(insert(ChangeLog), rows)
+
+
+def record(session, model, items, op):
+    """
+    记录绕过 ORM 的批量改动（不提交事务）：items 为 [(id, student_id)]，
+    非报名类记录的 student_id 传 None
+    """
+    now = datetime.now()
+    rows = [dict(_entry(ENTITY_NAMES[model], entity_id, op, student_id), created_at=now)
+            for entity_id, student_id in items]
+    if rows:
+        session.execute(insert(ChangeLog), rows)
+
+
+def purge_before(session, cutoff):
+    """删除 cutoff 之前的日志并保留最新一行（用于判断游标是否过旧），返回删除条数（不提交事务）"""
+    latest = session.query(func.max(ChangeLog.id)).scalar()
+    if latest is None:
+        return 0
+    return session.query(ChangeLog)\
+        .filter(ChangeLog.created_at < cutoff, ChangeLog.id < latest)\
+        .delete(synchronize_session=False)
+
+
+# ==========================================
+# 增量同步
+# ==========================================
+
+def _settled_cursor(session, now):
+    """SETTLE 之前写入的最新日志 id；没有日志时为 0"""
+    return session.query(func.max(ChangeLog.id)).filter(ChangeLog.created_at <= now - SETTLE).scalar() or 0
+
+
+def _cursor_is_valid(session, since):
+    oldest, latest = session.query(func.min(ChangeLog.id), func.max(ChangeLog.id)).one()
+    if latest is None:
+        return since == 0
+    # 游标之后的日志已被清理，或游标来自另一个数据库（重建后 id 重新开始）
+    return oldest - 1 <= since <= latest
+
+
+def _empty_changes():
+    return {key: {"upserted": [], "deleted": []} for key in COLLECTIONS.values()}
+
+
+def snapshot(session, student_id=None):
+    """全量快照：当前所有活动、岗位、轮值，以及 student_id 本人的报名"""
+    from rules import list_events, list_shifts
+    # 先取游标再读数据：读取期间提交的改动下次同步会再返回，不会漏掉
+    cursor = _settled_cursor(session, datetime.now())
+    changes = _empty_changes()
+    changes["events"]["upserted"] = list_events(session)
+    changes["shifts"]["upserted"] = list_shifts(session)
+    changes["rotations"]["upserted"] = [
+        r.to_dict() for r in session.query(WeeklyRotation).order_by(WeeklyRotation.week_start_date)
+    ]
+    if student_id is not None:
+        changes["eventSignups"]["upserted"] = [
+            s.to_dict() for s in session.query(EventSignup).filter_by(student_id=student_id)
+        ]
+        changes["shiftSignups"]["upserted"] = [
+            s.to_dict() for s in session.query(ShiftSignup).filter_by(student_id=student_id)
+        ]
+    return {"cursor": cursor, "reset": True, "hasMore": False, **changes}
+
+
+def changes_since(session, since, student_id=None, page_size=PAGE_SIZE):
+    """游标 since 之后的变更；游标无效时返回全量快照"""
+    if not _cursor_is_valid(session, since):
+        return snapshot(session, student_id)
+
+    now = datetime.now()
+    visible = ChangeLog.student_id.is_(None)
+    if student_id is not None:
+        visible = or_(visible, ChangeLog.student_id == student_id)
+    logs = session.query(ChangeLog).filter(ChangeLog.id > since, visible)\
+        .order_by(ChangeLog.id).limit(page_size + 1).all()
+    has_more = len(logs) > page_size
+    logs = logs[:page_size]
+
+    # 同一条记录多次变更只取最后一次；游标推进到第一条未稳定的日志之前
+    latest_op = {}
+    cursor, settled = since, True
+    for log in logs:
+        latest_op[(log.entity, log.entity_id)] = log.op
+        settled = settled and log.created_at <= now - SETTLE
+        if settled:
+            cursor = log.id
+    if not settled:
+        has_more = False
+    elif not has_more:
+        # 其余日志都属于其他学生，游标可以直接越过
+        cursor = max(cursor, _settled_cursor(session, now))
+
+    changes = _empty_changes()
+    for name, model in ENTITIES.items():
+        upserts = [entity_id for (entity, entity_id), op in latest_op.items() if entity == name and op == "upsert"]
+        deletes = [entity_id for (entity, entity_id), op in latest_op.items() if entity == name and op == "delete"]
+        records = session.query(model).filter(model.id.in_(upserts)).all() if upserts else []
+        if name in STUDENT_ENTITIES:
+            records = [r for r in records if r.student_id == student_id]
+        found = {r.id for r in records}
+        collection = changes[COLLECTIONS[name]]
+        collection["upserted"] = [r.to_dict() for r in records]
+        # 记录在日志之后被删除（或归档）时视为删除
+        collection["deleted"] = deletes + [entity_id for entity_id in upserts if entity_id not in found]
+    return {"cursor": cursor, "reset": False, "hasMore": has_more, **changes}
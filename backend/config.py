@@ -0,0 +1,81 @@
+"""
+运行配置：全部来自环境变量，create_app(config=...) 可以逐项覆盖
+"""
+import os
+
+basedir = os.path.abspath(os.path.dirname(__file__))
+
+
+def _normalize_database_url(url):
+    if url.startswith("postgres://"):
+        url = url.replace("postgres://", "postgresql://", 1)
+    return url
+
+
+def load_config():
+    database_url = os.environ.get('DATABASE_URL')
+    if database_url:
+        database_url = _normalize_database_url(database_url)
+    sqlalchemy_database_uri = database_url or 'sqlite:///' + os.path.join(basedir, 'volunteer.db')
+
+    # 冷数据归档库：默认的 SQLite 部署单独使用一个文件；配置了 DATABASE_URL 时与主库同库不同表
+    archive_url = os.environ.get('ARCHIVE_DATABASE_URL')
+    if archive_url:
+        archive_url = _normalize_database_url(archive_url)
+    elif database_url:
+        archive_url = sqlalchemy_database_uri
+    else:
+        archive_url = 'sqlite:///' + os.path.join(basedir, 'volunteer_archive.db')
+
+    binds = {'archive': archive_url}
+    # 只读副本（见 replica.py）：单独的 bind，使用独立的连接池
+    read_url = os.environ.get('DATABASE_READ_URL')
+    if read_url:
+        binds['replica'] = _normalize_database_url(read_url)
+
+    # 多校区部署（见 tenancy.py）：每所学校一个数据库
+    tenant_url = _normalize_database_url(
+        os.environ.get('TENANT_DATABASE_URL') or 'sqlite:///' + os.path.join(basedir, 'tenants', '{tenant}.db')
+    )
+
+    return {
+        'SQLALCHEMY_DATABASE_URI': sqlalchemy_database_uri,
+        'SQLALCHEMY_BINDS': binds,
+        'SQLALCHEMY_TRACK_MODIFICATIONS': False,
+        'DATABASE_READ_STICKY_SECONDS': int(os.environ.get('DATABASE_READ_STICKY_SECONDS', 5)),
+
+        # 多校区部署：允许的学校、连接串模板、学校的识别方式，以及每所学校的连接池限额与空闲回收
+        'TENANTS': [t.strip() for t in os.environ.get('TENANTS', '').split(',') if t.strip()],
+        'TENANT_DATABASE_URL': tenant_url,
+        'TENANT_HEADER': os.environ.get('TENANT_HEADER', 'X-Tenant'),
+        'TENANT_DOMAIN': os.environ.get('TENANT_DOMAIN'),
+        'TENANT_DEFAULT': os.environ.get('TENANT_DEFAULT'),
+        'TENANT_IDLE_SECONDS': int(os.environ.get('TENANT_IDLE_SECONDS', 600)),
+        'TENANT_POOL_SIZE': int(os.environ.get('TENANT_POOL_SIZE', 5)),
+        'TENANT_MAX_OVERFLOW': int(os.environ.get('TENANT_MAX_OVERFLOW', 5)),
+
+        # 共享缓存：设置 CACHE_URL (redis://...) 后所有 worker 共用，否则为进程内缓存；
+        # 容量变化广播也通过它跨 worker 推送
+        'CACHE_URL': os.environ.get('CACHE_URL'),
+
+        # 报名准入控制：每个 worker 同时处理的报名数、排队上限，以及每个学生的请求频率
+        'SIGNUP_MAX_CONCURRENCY': int(os.environ.get('SIGNUP_MAX_CONCURRENCY', 8)),
+        'SIGNUP_MAX_QUEUE': int(os.environ.get('SIGNUP_MAX_QUEUE', 500)),
+        'SIGNUP_RATE_PER_MINUTE': float(os.environ.get('SIGNUP_RATE_PER_MINUTE', 20)),
+        'SIGNUP_BURST': int(os.environ.get('SIGNUP_BURST', 5)),
+
+        # 幂等键（见 idempotency.py）的响应保存时长
+        'IDEMPOTENCY_TTL_SECONDS': int(os.environ.get('IDEMPOTENCY_TTL_SECONDS', 24 * 3600)),
+
+        # 变更日志（见 changelog.py）保留天数；游标早于保留期的客户端重新下载全量快照
+        'CHANGELOG_RETENTION_DAYS': int(os.environ.get('CHANGELOG_RETENTION_DAYS', 30)),
+
+        # 按需剖析（见 profiling.py）：结果目录、最多保留份数、随机剖析的请求比例（0 为关闭）
+        'PROFILE_DIR': os.environ.get('PROFILE_DIR', os.path.join(basedir, 'profiles')),
+        'PROFILE_MAX_FILES': int(os.environ.get('PROFILE_MAX_FILES', 50)),
+        'PROFILE_SAMPLE_RATE': float(os.environ.get('PROFILE_SAMPLE_RATE', 0)),
+
+        # 日程订阅（见 ical.py）的令牌密钥；未设置时使用 CALENDAR_SECRET_FILE 中首次使用时生成的随机密钥
+        'CALENDAR_SECRET': os.environ.get('CALENDAR_SECRET'),
+        'CALENDAR_SECRET_FILE': os.environ.get('CALENDAR_SECRET_FILE', os.path.join(basedir, 'calendar_secret')),
+    }
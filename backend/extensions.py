@@ -0,0 +1,85 @@
+"""
+扩展实例与共享服务
+
+db 在 create_app() 中通过 db.init_app(app) 绑定。其余服务（缓存、容量广播、报名准入、全文索引）
+由 init_services(app) 按配置登记创建方式，第一次使用时才真正创建：
+例如没有 SSE 连接的进程不会启动 Redis 订阅线程，只跑后台任务的进程也不会建立等候室。
+
+模块级的 cache / broker 等是指向实际对象的代理，业务代码和 asgi.py 可以直接导入使用，不依赖应用上下文。
+多校区部署时每所学校各有一份（按 tenancy.current_tenant() 区分），缓存键、广播频道和排队互不干扰。
+"""
+import threading
+
+from flask_sqlalchemy import SQLAlchemy
+from werkzeug.local import LocalProxy
+
+from replica import RoutingSession
+from tenancy import current_tenant
+
+db = SQLAlchemy(session_options={"class_": RoutingSession})
+
+_factories = {}
+_instances = {}
+_lock = threading.Lock()
+
+
+def service(name):
+    key = (name, current_tenant())
+    instance = _instances.get(key)
+    if instance is None:
+        with _lock:
+            instance = _instances.get(key)
+            if instance is None:
+                if name not in _factories:
+                    raise RuntimeError(f"服务 {name} 尚未初始化，请先调用 create_app()")
+                instance = _instances[key] = _factories[name](key[1])
+    return instance
+
+
+cache = LocalProxy(lambda: service("cache"))
+broker = LocalProxy(lambda: service("broker"))
+signup_room = LocalProxy(lambda: service("signup_room"))
+signup_limiter = LocalProxy(lambda: service("signup_limiter"))
+event_index = LocalProxy(lambda: service("event_index"))
+
+
+def _create_cache(config, tenant):
+    from cache import create_cache
+    if tenant and config['CACHE_URL']:
+        return create_cache(config['CACHE_URL'], prefix=f"volunteer:{tenant}:")
+    return create_cache(config['CACHE_URL'])
+
+
+def _create_broker(config, tenant):
+    from stream import CHANNEL, create_broker
+    return create_broker(config['CACHE_URL'], f"{CHANNEL}:{tenant}" if tenant else CHANNEL)
+
+
+def _create_signup_room(config, tenant):
+    from admission import WaitingRoom
+    return WaitingRoom(max_active=config['SIGNUP_MAX_CONCURRENCY'], max_waiting=config['SIGNUP_MAX_QUEUE'])
+
+
+def _create_signup_limiter(config, tenant):
+    from admission import TokenBucketLimiter
+    return TokenBucketLimiter(rate=config['SIGNUP_RATE_PER_MINUTE'] / 60, burst=config['SIGNUP_BURST'])
+
+
+def _create_event_index(config, tenant):
+    # 活动全文检索：SQLite 使用 FTS5，Postgres 使用 tsvector + GIN
+    from search import create_event_index
+    url = config['TENANT_DATABASE_URL'].format(tenant=tenant) if tenant else config['SQLALCHEMY_DATABASE_URI']
+    return create_event_index(url)
+
+
+def init_services(app):
+    config = app.config
+    with _lock:
+        _instances.clear()
+        _factories.update({
+            "cache": lambda tenant: _create_cache(config, tenant),
+            "broker": lambda tenant: _create_broker(config, tenant),
+            "signup_room": lambda tenant: _create_signup_room(config, tenant),
+            "signup_limiter": lambda tenant: _create_signup_limiter(config, tenant),
+            "event_index": lambda tenant: _create_event_index(config, tenant),
+        })
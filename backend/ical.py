@@ -0,0 +1,158 @@
+"""
+个人日程订阅 (iCalendar)：GET /api/students/<id>/calendar.ics?token=<calendarToken>
+
+手机日历、Outlook 等日历应用订阅该地址后定期拉取，显示学生尚未结束的活动和周常岗位，
+学生不必反复打开应用查看下一次安排。
+  - token 为 HMAC(密钥, 学校 + 学生 id + 当前密码)：登录时返回 calendarToken，修改密码后旧的订阅地址失效
+  - 日历应用无法设置请求头，多校区部署时订阅地址需要带上 ?tenant=
+  - 响应由 web.cached_response 缓存，只带 student:<id> 标签：只有本人的报名变化，
+    或管理员修改 / 删除了本人已报名的岗位（见 api/admin.py）后才重新生成，
+    其他学生报名不会使它失效；日历应用带 If-None-Match 轮询时直接返回 304
+  - 时间片为一小时：已结束的安排最迟一小时后从订阅中消失，恢复备份等全局变化也最迟一小时后反映
+
+密钥：CALENDAR_SECRET；未设置时使用 CALENDAR_SECRET_FILE 中的随机密钥（首次使用时生成）。
+多台服务器部署时需要设置同一个 CALENDAR_SECRET。
+"""
+import hashlib
+import hmac
+import os
+import secrets
+from datetime import datetime, timezone
+
+from flask import current_app
+
+from models import Event, EventSignup, RecurringShift, ShiftSignup
+from tenancy import current_tenant
+
+TOKEN_LENGTH = 32
+REFRESH_INTERVAL = "PT1H"
+
+
+# ==========================================
+# 订阅令牌
+# ==========================================
+
+def _read_or_create_secret(path):
+    try:
+        # O_EXCL：多个 worker 同时首次访问时只有一个能创建成功，其余读取它写入的密钥
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        with open(path, encoding="utf-8") as f:
+            return f.read().strip()
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        secret = secrets.token_hex(32)
+        f.write(secret)
+    return secret
+
+
+def _secret():
+    secret = current_app.extensions.get("calendar_secret")
+    if secret is None:
+        secret = current_app.config["CALENDAR_SECRET"] or _read_or_create_secret(current_app.config["CALENDAR_SECRET_FILE"])
+        current_app.extensions["calendar_secret"] = secret
+    return secret.encode()
+
+
+def feed_token(student):
+    """学生的订阅令牌；密码变化后随之变化"""
+    message = f"{current_tenant() or ''}:{student.id}:{student.password}".encode()
+    return hmac.new(_secret(), message, hashlib.sha256).hexdigest()[:TOKEN_LENGTH]
+
+
+def check_token(student, token):
+    return hmac.compare_digest(feed_token(student), token or "")
+
+
+# ==========================================
+# 日程内容
+# ==========================================
+
+def upcoming_items(session, student_id, now):
+    """学生尚未结束的活动和未取消的周常岗位，按开始时间排序"""
+    items = []
+    events = session.query(Event)\
+        .join(EventSignup, EventSignup.event_id == Event.id)\
+        .filter(EventSignup.student_id == student_id, Event.end_time > now)
+    for e in events:
+        description = "\n".join(filter(None, [
+            e.description,
+            f"负责人：{e.leader_name}" if e.leader_name else None,
+            f"联系方式：{e.leader_contact}" if e.leader_contact else None,
+        ]))
+        items.append({"uid": f"event-{e.id}", "title": e.title, "start": e.start_time, "end": e.end_time,
+                      "location": e.location, "description": description})
+
+    shifts = session.query(ShiftSignup, RecurringShift)\
+        .join(RecurringShift, RecurringShift.id == ShiftSignup.shift_id)\
+        .filter(ShiftSignup.student_id == student_id,
+                ShiftSignup.date >= now.date(),
+                ShiftSignup.status != 'cancelled')
+    for signup, shift in shifts:
+        shift_end = datetime.combine(signup.date, shift.end_time)
+        if shift_end > now:
+            items.append({"uid": f"shift-{signup.id}", "title": shift.name,
+                          "start": datetime.combine(signup.date, shift.start_time), "end": shift_end,
+                          "location": None, "description": shift.description})
+
+    items.sort(key=lambda item: (item["start"], item["end"]))
+    return items
+
+
+def _escape(text):
+    return text.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\n", "\\n")
+
+
+def _fold(line):
+    """RFC 5545：每行不超过 75 字节，续行以空格开头（按 UTF-8 字符边界切分）"""
+    parts, current, size = [], [], 0
+    for ch in line:
+        width = len(ch.encode())
+        if size + width > 75:
+            parts.append("".join(current))
+            current, size = [" "], 1
+        current.append(ch)
+        size += width
+    parts.append("".join(current))
+    return "\r\n".join(parts)
+
+
+def _local_time(value):
+    # 不带时区的"浮动时间"：与数据库一致按学校当地时间显示
+    return value.strftime("%Y%m%dT%H%M%S")
+
+
+def render_calendar(name, items, uid_domain, now_utc=None):
+    stamp = (now_utc or datetime.now(timezone.utc)).strftime("%Y%m%dT%H%M%SZ")
+    lines = [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        "PRODID:-//volunteer//calendar feed//ZH",
+        "CALSCALE:GREGORIAN",
+        "METHOD:PUBLISH",
+        f"X-WR-CALNAME:{_escape(f'志愿日程 - {name}')}",
+        f"REFRESH-INTERVAL;VALUE=DURATION:{REFRESH_INTERVAL}",
+        f"X-PUBLISHED-TTL:{REFRESH_INTERVAL}",
+    ]
+    for item in items:
+        lines += [
+            "BEGIN:VEVENT",
+            f"UID:{item['uid']}@{uid_domain}",
+            f"DTSTAMP:{stamp}",
+            f"DTSTART:{_local_time(item['start'])}",
+            f"DTEND:{_local_time(item['end'])}",
+            f"SUMMARY:{_escape(item['title'])}",
+        ]
+        if item["location"]:
+            lines.append(f"LOCATION:{_escape(item['location'])}")
+        if item["description"]:
+            lines.append(f"DESCRIPTION:{_escape(item['description'])}")
+        lines.append("END:VEVENT")
+    lines.append("END:VCALENDAR")
+    return "".join(_fold(line) + "\r\n" for line in lines)
+
+
+def student_feed(session, student):
+    """学生的订阅内容 (text/calendar)"""
+    items = upcoming_items(session, student.id, datetime.now())
+    uid_domain = f"{current_tenant()}.volunteer" if current_tenant() else "volunteer"
+    return render_calendar(student.name, items, uid_domain)
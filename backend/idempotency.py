@@ -0,0 +1,103 @@
+"""
+写接口的幂等键 (Idempotency-Key)
+
+客户端为每次“操作”生成一个随机键放在 Idempotency-Key 请求头中，超时重试时沿用同一个键：
+  - 第一次请求登记该键（状态 processing）并提交，执行完毕后保存响应（状态 done）
+  - 重复请求按主键查到已保存的响应直接重放，不再执行报名校验，也不会得到误导性的“已报名”
+  - 第一次请求仍在执行时立即返回 409 + Retry-After（Flask 与 asgi.py 相同），客户端稍后重试即可拿到重放结果；
+    重试风暴中每个重复请求只做一次按主键的查询，不在服务端轮询
+  - 同一个键用于不同的请求（方法、路径或请求体不同）返回 422
+  - 5xx 与 429（排队）不保存，重试时重新执行
+记录保存 IDEMPOTENCY_TTL_SECONDS 秒，过期的记录由后台任务 purge_idempotency_keys 清理。
+
+本模块只操作 idempotency_keys 表，函数接收同步 Session 并自行提交；
+Flask 的装饰器见 web.idempotent，asgi.py 通过 run_sync 调用同一组函数。
+"""
+import hashlib
+from datetime import datetime, timedelta
+
+from sqlalchemy.exc import IntegrityError
+
+from models import IdempotencyKey
+
+HEADER = "Idempotency-Key"
+MAX_KEY_LENGTH = 100
+# processing 状态超过该时长视为执行它的进程已崩溃，由下一个重复请求接手
+ABANDONED_AFTER = timedelta(minutes=2)
+
+
+def fingerprint(method, path, body):
+    return hashlib.sha256(f"{method} {path}\n".encode() + (body or b"")).hexdigest()
+
+
+def claim(session, key, request_fingerprint, ttl):
+    """
+    登记幂等键，返回 (状态, 记录)：
+      ("new", None)         首次出现，调用方执行请求后调用 complete() 或 release()
+      ("done", record)      已有保存的响应，直接重放
+      ("processing", None)  同一个键的请求正在执行，稍后再调用 claim() 查看
+      ("mismatch", None)    该键已用于不同的请求
+    """
+    now = datetime.now()
+    record = session.get(IdempotencyKey, key, populate_existing=True)
+    if record is not None and record.expires_at <= now:
+        session.delete(record)
+        session.commit()
+        record = None
+
+    if record is None:
+        session.add(IdempotencyKey(
+            key=key, fingerprint=request_fingerprint, status='processing',
+            created_at=now, expires_at=now + timedelta(seconds=ttl)
+        ))
+        try:
+            session.commit()
+            return "new", None
+        except IntegrityError:
+            # 并发的重复请求抢先登记了同一个键
+            session.rollback()
+            return "processing", None
+
+    if record.fingerprint != request_fingerprint:
+        return "mismatch", None
+    if record.status == 'done':
+        return "done", record
+
+    # 接手已崩溃的请求：只有一个重复请求能更新成功
+    taken = session.query(IdempotencyKey).filter(
+        IdempotencyKey.key == key,
+        IdempotencyKey.status == 'processing',
+        IdempotencyKey.created_at < now - ABANDONED_AFTER
+    ).update({"created_at": now}, synchronize_session=False)
+    session.commit()
+    return ("new", None) if taken else ("processing", None)
+
+
+def complete(session, key, status, body, content_type):
+    """保存响应；之前先回滚请求中未提交的改动，避免被一并提交"""
+    session.rollback()
+    session.query(IdempotencyKey).filter_by(key=key).update({
+        "status": 'done',
+        "response_status": status,
+        "response_body": body,
+        "content_type": content_type
+    }, synchronize_session=False)
+    session.commit()
+
+
+def release(session, key):
+    """请求失败（5xx / 429 / 异常）：删除登记，重试时重新执行"""
+    session.rollback()
+    session.query(IdempotencyKey).filter_by(key=key, status='processing').delete(synchronize_session=False)
+    session.commit()
+
+
+def should_store(status):
+    return status < 500 and status != 429
+
+
+def purge_expired(session):
+    """删除过期的记录，返回删除条数（不提交事务）"""
+    return session.query(IdempotencyKey)\
+        .filter(IdempotencyKey.expires_at < datetime.now())\
+        .delete(synchronize_session=False)
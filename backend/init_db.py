@@ -1,12 +1,38 @@
 # backend/init_db.py
 
-from app import app, db, RecurringShift, Student
+#   python init_db.py                     # 单校部署
+#   python init_db.py --tenant school-a   # 多校区部署：初始化某所学校的数据库（--all-tenants 为全部学校）
+import argparse
 
-def init_data():
-    with app.app_context():
+from app import create_app
+from extensions import db
+from models import HourRollup, RecurringShift, Student
+from rules import backfill_event_grades, rebuild_hour_rollups
+from tenancy import create_all, engine_for, using_tenant
+
+def init_data(tenant=None):
+    with create_app(blueprints=False).app_context(), using_tenant(tenant):
         # 1. 创建所有表
-        db.create_all()
-        print("数据库表结构创建成功。")
+        create_all()
+        print(f"数据库表结构创建成功{f'（{tenant}）' if tenant else ''}。")
+
+        # 旧数据库升级：create_all 不会为已存在的表补建新增的索引
+        for table in db.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(engine_for(), checkfirst=True)
+
+        # 旧数据库升级：为年级表上线前创建的活动补齐年级记录
+        filled = backfill_event_grades(db.session)
+        if filled:
+            db.session.commit()
+            print(f"已为 {filled} 个活动补齐年级记录。")
+
+        # 旧数据库升级：汇总表为空时按已有报名一次性回填
+        if not HourRollup.query.first():
+            rows = rebuild_hour_rollups(db.session)
+            db.session.commit()
+            if rows:
+                print(f"已回填 {rows} 行班级时长汇总。")
 
         # Create Admin Student if not exists
         if not Student.query.filter_by(phone='admin').first():
@@ -132,4 +158,12 @@ def init_data():
         print("  - 所有岗位容量：2人")
 
 if __name__ == "__main__":
-    init_data()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="初始化数据库：建表、默认管理员与周常岗位")
+    parser.add_argument("--tenant", help="多校区部署时要初始化的学校")
+    parser.add_argument("--all-tenants", action="store_true", help="初始化 TENANTS 中的全部学校")
+    args = parser.parse_args()
+    if args.all_tenants:
+        for name in create_app(blueprints=False).config["TENANTS"]:
+            init_data(name)
+    else:
+        init_data(args.tenant)
\ No newline at end of file
@@ -0,0 +1,94 @@
+"""
+志愿时长排行榜索引
+
+在内存中为 全校 / 每个年级 / 每个班级 各维护一个按时长降序的有序数组：
+  - 查名次：二分查找，O(log n)
+  - 取前 N 名：数组切片，与学校规模无关
+  - 单个学生时长变化：删除旧位置 + 插入新位置，无需重新排序
+
+本模块不访问数据库，数据的加载与增量刷新由 api/ranking.py 负责。
+"""
+import bisect
+import threading
+
+
+class RankIndex:
+    """按 (-时长, 学生ID) 排序的数组；名次采用并列排名（1, 2, 2, 4）"""
+
+    def __init__(self):
+        self._keys = []
+        self._hours = {}
+
+    def __len__(self):
+        return len(self._keys)
+
+    def set(self, student_id, hours):
+        old = self._hours.get(student_id)
+        if old is not None:
+            i = bisect.bisect_left(self._keys, (-old, student_id))
+            del self._keys[i]
+        self._hours[student_id] = hours
+        bisect.insort(self._keys, (-hours, student_id))
+
+    def hours(self, student_id):
+        return self._hours.get(student_id)
+
+    def rank(self, student_id):
+        hours = self._hours.get(student_id)
+        if hours is None:
+            return None
+        # 时长严格更高的人数 + 1
+        return bisect.bisect_left(self._keys, (-hours, float('-inf'))) + 1
+
+    def top(self, n):
+        """[(名次, 学生ID, 时长)]"""
+        result = []
+        for i, (neg_hours, student_id) in enumerate(self._keys[:n]):
+            if i > 0 and neg_hours == self._keys[i - 1][0]:
+                rank = result[-1][0]
+            else:
+                rank = i + 1
+            result.append((rank, student_id, -neg_hours))
+        return result
+
+
+class Leaderboard:
+    """全校、年级、班级三级排行索引"""
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.clear()
+
+    def clear(self):
+        self.students = {}  # {student_id: (name, enrollment_year, class_number)}
+        self.indexes = {}  # {("all",) / ("grade", 年份) / ("class", 年份, 班级): RankIndex}
+
+    def scopes(self, student_id):
+        _, year, cls = self.students[student_id]
+        return [("all",), ("grade", year), ("class", year, cls)]
+
+    def add(self, student_id, name, enrollment_year, class_number, hours=0.0):
+        self.students[student_id] = (name, enrollment_year, class_number)
+        self.update(student_id, hours)
+
+    def update(self, student_id, hours):
+        if student_id not in self.students:
+            return
+        for scope in self.scopes(student_id):
+            self.indexes.setdefault(scope, RankIndex()).set(student_id, hours)
+
+    def top(self, scope, n):
+        index = self.indexes.get(scope)
+        return index.top(n) if index else []
+
+    def size(self, scope):
+        index = self.indexes.get(scope)
+        return len(index) if index else 0
+
+    def rank(self, scope, student_id):
+        index = self.indexes.get(scope)
+        return index.rank(student_id) if index else None
+
+    def hours(self, student_id):
+        index = self.indexes.get(("all",))
+        return index.hours(student_id) if index else None
@@ -0,0 +1,481 @@
+"""
+数据模型
+
+本模块只依赖 extensions.db，初始化脚本（init_db.py 等）可以只导入模型而不加载任何接口。
+"""
+from datetime import datetime, date, timedelta
+
+from sqlalchemy import func
+
+from extensions import db, cache
+
+
+def _shift_history_status(status, day):
+    # 已取消的岗位报名不计时长，在历史记录中单独标出
+    if status == 'cancelled':
+        return "已取消"
+    return "已完成" if day < date.today() else "待参加"
+
+# ==========================================
+# 模块一：用户系统 (Student)
+# ==========================================
+
+class Student(db.Model):
+    __tablename__ = 'students'
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(50), nullable=False)
+    phone = db.Column(db.String(20), unique=True, nullable=False)
+    
+    # 入学年份和班级号
+    enrollment_year = db.Column(db.Integer, nullable=False) 
+    class_number = db.Column(db.Integer, nullable=False)
+    
+    qq = db.Column(db.String(50))
+    wechat = db.Column(db.String(50))
+    
+    # 密码字段 (明文存储，方便管理员重置)
+    password = db.Column(db.String(100), nullable=True)
+    
+    # [NEW] 管理员标识
+    is_admin = db.Column(db.Boolean, default=False)
+
+    # 关联关系
+    event_signups = db.relationship('EventSignup', backref='student', lazy='dynamic')
+    shift_signups = db.relationship('ShiftSignup', backref='student', lazy='dynamic')
+
+    @property
+    def total_hours(self):
+        # 结果只在本人报名或岗位时长变更时失效；活动结束时间是动态的，因此设较短的过期时间
+        return cache.get_or_set(
+            f"hours:{self.id}:{date.today().isoformat()}",
+            self._compute_total_hours,
+            tags=(f"student:{self.id}", "shifts"),
+            ttl=60
+        )
+
+    def _compute_total_hours(self):
+        # 1. 普通活动时长 (仅计算已结束的)
+        event_hours = db.session.query(func.sum(Event.hours_value))\
+            .join(EventSignup)\
+            .filter(EventSignup.student_id == self.id)\
+            .filter(Event.end_time < datetime.now())\
+            .scalar() or 0.0
+        
+        # 2. 周常岗位时长 (仅计算日期早于今天且未取消的；归档与班级汇总同样不计已取消的报名)
+        shift_hours = db.session.query(func.sum(RecurringShift.hours_value))\
+            .join(ShiftSignup)\
+            .filter(ShiftSignup.student_id == self.id)\
+            .filter(ShiftSignup.date < date.today())\
+            .filter(ShiftSignup.status != 'cancelled')\
+            .scalar() or 0.0
+
+        # 3. 已归档部分的预汇总时长
+        archived_hours = db.session.query(ArchivedHours.hours)\
+            .filter(ArchivedHours.student_id == self.id)\
+            .scalar() or 0.0
+
+        return round(float(event_hours) + float(shift_hours) + float(archived_hours), 1)
+
+    @property
+    def full_class_name(self):
+        return f"{self.enrollment_year}级{self.class_number}班"
+
+    # 【新增功能】获取该学生的所有活动历史
+    def get_history(self):
+        history_list = []
+        
+        # A. 获取普通活动记录
+        # 我们遍历该学生报名的所有 ordinary events
+        for signup in self.event_signups:
+            event_obj = signup.event
+            history_list.append({
+                "type": "event",                  # 标记类型，前端据此判断跳往哪个详情页
+                "id": event_obj.id,               # 活动ID，用于跳转链接 /event/:id
+                "title": event_obj.title,         # 左侧：显示名称
+                "hours": event_obj.hours_value,   # 右侧：显示时长
+                "date": event_obj.start_time.isoformat(), # 用于排序
+                "status": event_obj.status        # 状态 (已结束/进行中)
+            })
+
+        # B. 获取周常值日记录
+        for signup in self.shift_signups:
+            shift_obj = RecurringShift.query.get(signup.shift_id)
+            history_list.append({
+                "type": "shift",                  # 标记类型
+                "id": shift_obj.id,               # 值日岗ID (虽然值日岗通常没有详情页，但以防万一)
+                "title": f"{shift_obj.name} (周{shift_obj.day_of_week})", # 名称拼接星期
+                "hours": shift_obj.hours_value,
+                "date": signup.date.isoformat(),
+                "status": _shift_history_status(signup.status, signup.date)
+            })
+
+        # C. 已归档的记录（只有归档过的学生才需要查询归档库）
+        if db.session.get(ArchivedHours, self.id):
+            for signup in ArchivedEventSignup.query.filter_by(student_id=self.id):
+                history_list.append({
+                    "type": "event",
+                    "id": signup.event.source_id,
+                    "title": signup.event.title,
+                    "hours": signup.event.hours_value,
+                    "date": signup.event.start_time.isoformat(),
+                    "status": "已结束",
+                    "archived": True
+                })
+            for signup in ArchivedShiftSignup.query.filter_by(student_id=self.id):
+                history_list.append({
+                    "type": "shift",
+                    "id": signup.shift_id,
+                    "title": f"{signup.shift_name} (周{signup.day_of_week})",
+                    "hours": signup.hours_value,
+                    "date": signup.date.isoformat(),
+                    "status": _shift_history_status(signup.status, signup.date),
+                    "archived": True
+                })
+
+        # D. 按日期倒序排列 (最新的在最上面)
+        history_list.sort(key=lambda x: x['date'], reverse=True)
+        return history_list
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "name": self.name,
+            "phone": self.phone,
+            "enrollmentYear": self.enrollment_year,
+            "classNumber": self.class_number,
+            "fullClassName": self.full_class_name,
+            "qq": self.qq,
+            "wechat": self.wechat,
+            "totalHours": self.total_hours,
+            "isAdmin": self.is_admin, # [NEW] 返回管理员状态
+            "history": self.get_history() 
+        }
+
+# ==========================================
+# 模块二：普通活动
+# ==========================================
+
+class Event(db.Model):
+    __tablename__ = 'events'
+    id = db.Column(db.Integer, primary_key=True)
+    title = db.Column(db.String(100), nullable=False)
+    description = db.Column(db.Text)
+    start_time = db.Column(db.DateTime, nullable=False)
+    end_time = db.Column(db.DateTime, nullable=False)
+    registration_deadline = db.Column(db.DateTime, nullable=False)
+    location = db.Column(db.String(100))
+    leader_name = db.Column(db.String(50))
+    leader_contact = db.Column(db.String(50))
+    required_volunteers = db.Column(db.Integer, nullable=False)
+    grade_limit = db.Column(db.String(100), default="ALL") 
+    hours_value = db.Column(db.Float, nullable=False, default=1.0)
+    signups = db.relationship('EventSignup', backref='event', lazy='dynamic')
+    # grade_limit 拆分后的年级表，用于按年级筛选活动（由 rules.set_event_grades 维护）
+    grades = db.relationship('EventGrade', cascade='all, delete-orphan')
+    # 时间冲突检查按 end_time > 开始时间 查找尚未结束的活动；归档和状态刷新也按结束时间筛选
+    # sqlite_autoincrement：归档删除最大 id 的行后 SQLite 不再复用这些 id（活动、报名同理）
+    __table_args__ = (db.Index('ix_events_end_time', 'end_time'), {'sqlite_autoincrement': True})
+
+    @property
+    def current_volunteers_count(self):
+        return self.signups.count()
+
+    @property
+    def status(self):
+        now = datetime.now()
+        if now > self.end_time: return "已结束"
+        if now > self.start_time: return "进行中"
+        if self.signups.count() >= self.required_volunteers: return "已满员"
+        if now > self.registration_deadline: return "报名截止"
+        return "招募中"
+    
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "title": self.title,
+            "description": self.description,
+            "startTime": self.start_time.isoformat(),
+            "endTime": self.end_time.isoformat(),
+            "location": self.location,
+            "requiredVolunteers": self.required_volunteers,
+            "currentVolunteers": self.current_volunteers_count,
+            "status": self.status,
+            "leaderName": self.leader_name,
+            "leaderContact": self.leader_contact,
+            "registrationDeadline": self.registration_deadline.isoformat(),
+            "gradeLimit": self.grade_limit,
+            "hoursValue": self.hours_value
+        }
+
+class EventSignup(db.Model):
+    __tablename__ = 'event_signups'
+    id = db.Column(db.Integer, primary_key=True)
+    student_id = db.Column(db.Integer, db.ForeignKey('students.id'), nullable=False)
+    event_id = db.Column(db.Integer, db.ForeignKey('events.id'), nullable=False)
+    signup_time = db.Column(db.DateTime, default=datetime.now)
+    __table_args__ = (db.UniqueConstraint('student_id', 'event_id'), {'sqlite_autoincrement': True})
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "studentId": self.student_id,
+            "eventId": self.event_id,
+            "signupTime": self.signup_time.isoformat() if self.signup_time else ""
+        }
+
+# 不限年级的活动记为 enrollment_year = 0
+ALL_GRADES = 0
+
+class EventGrade(db.Model):
+    """活动允许报名的入学年份，一个年级一行"""
+    __tablename__ = 'event_grades'
+    event_id = db.Column(db.Integer, db.ForeignKey('events.id'), primary_key=True)
+    enrollment_year = db.Column(db.Integer, primary_key=True)
+    # 主键以 event_id 开头；按年级查活动需要以 enrollment_year 开头的索引
+    __table_args__ = (db.Index('ix_event_grades_year_event', 'enrollment_year', 'event_id'),)
+
+# ==========================================
+# 模块三：周常任务
+# ==========================================
+
+class RecurringShift(db.Model):
+    """周常岗位模板 - 定义每周重复的固定岗位"""
+    __tablename__ = 'recurring_shifts'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(50), nullable=False)  # 岗位名称：食堂志愿/文明礼仪站岗
+    day_of_week = db.Column(db.Integer, nullable=False)  # 1-5 (周一到周五)
+    start_time = db.Column(db.Time, nullable=False)  # 开始时间
+    end_time = db.Column(db.Time, nullable=False)  # 结束时间
+    capacity = db.Column(db.Integer, default=2)  # 容量（每个岗位统一2人）
+    hours_value = db.Column(db.Float, default=0.5)  # 志愿时长（小时）
+    description = db.Column(db.String(200))  # 岗位描述（可选）
+    
+    # 关系
+    signups = db.relationship('ShiftSignup', backref='shift', lazy='dynamic', cascade='all, delete-orphan')
+
+    def to_dict(self):
+        """转换为字典格式，供API返回"""
+        return {
+            "id": self.id,
+            "name": self.name,
+            "dayOfWeek": self.day_of_week,
+            "startTime": self.start_time.strftime("%H:%M") if self.start_time else "",
+            "endTime": self.end_time.strftime("%H:%M") if self.end_time else "",
+            "timeRange": f"{self.start_time.strftime('%H:%M')} - {self.end_time.strftime('%H:%M')}" if self.start_time and self.end_time else "",
+            "capacity": self.capacity,
+            "hoursValue": self.hours_value,
+            "description": self.description or ""
+        }
+
+class WeeklyRotation(db.Model):
+    __tablename__ = 'weekly_rotations'
+    id = db.Column(db.Integer, primary_key=True)
+    week_start_date = db.Column(db.Date, unique=True, nullable=False) 
+    assigned_class_str = db.Column(db.String(50), nullable=False)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "weekStartDate": self.week_start_date.isoformat(),
+            "assignedClass": self.assigned_class_str
+        }
+
+class ShiftSignup(db.Model):
+    """学生周常任务报名记录 - 记录具体日期的报名"""
+    __tablename__ = 'shift_signups'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    student_id = db.Column(db.Integer, db.ForeignKey('students.id'), nullable=False)
+    shift_id = db.Column(db.Integer, db.ForeignKey('recurring_shifts.id'), nullable=False)
+    date = db.Column(db.Date, nullable=False)  # 具体日期
+    status = db.Column(db.String(20), default='pending')  # pending/completed/cancelled
+    created_at = db.Column(db.DateTime, default=datetime.now)  # 报名时间
+    
+    # 唯一约束：同一个岗位同一天同一个学生只能报名一次
+    # 按学生 + 日期的索引用于时间冲突检查与每周限额统计
+    __table_args__ = (
+        db.UniqueConstraint('shift_id', 'date', 'student_id', name='unique_shift_signup'),
+        db.Index('ix_shift_signups_student_date', 'student_id', 'date'),
+        {'sqlite_autoincrement': True},
+    )
+    
+    def to_dict(self):
+        """转换为字典格式"""
+        return {
+            "id": self.id,
+            "studentId": self.student_id,
+            "shiftId": self.shift_id,
+            "date": self.date.isoformat() if self.date else "",
+            "status": self.status,
+            "createdAt": self.created_at.isoformat() if self.created_at else ""
+        }
+
+# ==========================================
+# 模块四：冷数据归档 (见 archive.py)
+# ==========================================
+# 早于归档线的活动、活动报名和岗位报名从热表移入 archive 库，热表只保留近期数据。
+# 归档记录的主键沿用原表 ID，重复执行归档是幂等的；岗位信息在归档时写入快照，
+# 之后修改或删除岗位不影响已归档的时长。
+
+class ArchivedHours(db.Model):
+    """每个学生已归档部分的累计时长（与热表同库，计算总时长时直接相加）"""
+    __tablename__ = 'archived_hours'
+    student_id = db.Column(db.Integer, db.ForeignKey('students.id'), primary_key=True)
+    hours = db.Column(db.Float, nullable=False, default=0.0)
+    event_count = db.Column(db.Integer, nullable=False, default=0)
+    shift_count = db.Column(db.Integer, nullable=False, default=0)
+    archived_through = db.Column(db.Date)  # 最近一次归档线
+
+# 归档表使用自己的主键，source_id 为热表中的原 id：热表的 id 可能被复用（旧库没有 AUTOINCREMENT），
+# 同一个 id 在不同归档线下可以各有一行；(source_id, archived_through) 唯一，中途失败后重新执行不会重复写入
+
+class ArchivedEvent(db.Model):
+    __bind_key__ = 'archive'
+    __tablename__ = 'archived_events'
+    id = db.Column(db.Integer, primary_key=True)
+    source_id = db.Column(db.Integer, nullable=False)
+    archived_through = db.Column(db.Date, nullable=False)
+    title = db.Column(db.String(100), nullable=False)
+    description = db.Column(db.Text)
+    start_time = db.Column(db.DateTime, nullable=False)
+    end_time = db.Column(db.DateTime, nullable=False)
+    location = db.Column(db.String(100))
+    leader_name = db.Column(db.String(50))
+    required_volunteers = db.Column(db.Integer)
+    grade_limit = db.Column(db.String(100))
+    hours_value = db.Column(db.Float, nullable=False)
+    archived_at = db.Column(db.DateTime, default=datetime.now)
+    __table_args__ = (db.UniqueConstraint('source_id', 'archived_through'),)
+
+class ArchivedEventSignup(db.Model):
+    __bind_key__ = 'archive'
+    __tablename__ = 'archived_event_signups'
+    id = db.Column(db.Integer, primary_key=True)
+    source_id = db.Column(db.Integer, nullable=False)
+    archived_through = db.Column(db.Date, nullable=False)
+    student_id = db.Column(db.Integer, nullable=False, index=True)
+    event_id = db.Column(db.Integer, db.ForeignKey('archived_events.id'), nullable=False)  # 归档活动的主键
+    signup_time = db.Column(db.DateTime)
+    event = db.relationship('ArchivedEvent')
+    __table_args__ = (db.UniqueConstraint('source_id', 'archived_through'),)
+
+class ArchivedShiftSignup(db.Model):
+    __bind_key__ = 'archive'
+    __tablename__ = 'archived_shift_signups'
+    id = db.Column(db.Integer, primary_key=True)
+    source_id = db.Column(db.Integer, nullable=False)
+    archived_through = db.Column(db.Date, nullable=False)
+    student_id = db.Column(db.Integer, nullable=False, index=True)
+    shift_id = db.Column(db.Integer, nullable=False)
+    shift_name = db.Column(db.String(50), nullable=False)  # 归档时的岗位快照
+    day_of_week = db.Column(db.Integer, nullable=False)
+    hours_value = db.Column(db.Float, nullable=False)
+    date = db.Column(db.Date, nullable=False)
+    status = db.Column(db.String(20))
+    created_at = db.Column(db.DateTime)
+    __table_args__ = (db.UniqueConstraint('source_id', 'archived_through'),)
+
+# ==========================================
+# 模块五：后台任务队列 (见 worker.py)
+# ==========================================
+# 请求中只调用 enqueue_job() 写入一行后立即返回，由独立的 worker 进程领取执行。
+# 状态：queued -> running -> done / failed；失败后按指数退避重新排队，直到 max_attempts 次。
+
+class Job(db.Model):
+    __tablename__ = 'jobs'
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(50), nullable=False)  # worker.py 中注册的任务名
+    args = db.Column(db.JSON, default=dict)
+    status = db.Column(db.String(20), nullable=False, default='queued')
+    run_at = db.Column(db.DateTime, nullable=False, default=datetime.now)  # 最早执行时间
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    max_attempts = db.Column(db.Integer, nullable=False, default=3)
+    unique_key = db.Column(db.String(100), unique=True)  # 周期任务按 "cron:任务名:时间" 去重
+    locked_by = db.Column(db.String(100))  # 执行该任务的 worker
+    last_error = db.Column(db.Text)
+    result = db.Column(db.JSON)
+    created_at = db.Column(db.DateTime, default=datetime.now)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+    __table_args__ = (db.Index('ix_jobs_status_run_at', 'status', 'run_at'),)
+
+    def to_dict(self, with_result=False):
+        data = {
+            "id": self.id,
+            "name": self.name,
+            "args": self.args,
+            "status": self.status,
+            "runAt": self.run_at.isoformat(),
+            "attempts": self.attempts,
+            "maxAttempts": self.max_attempts,
+            "lastError": self.last_error,
+            "createdAt": self.created_at.isoformat() if self.created_at else None,
+            "startedAt": self.started_at.isoformat() if self.started_at else None,
+            "finishedAt": self.finished_at.isoformat() if self.finished_at else None
+        }
+        if with_result:
+            data["result"] = self.result
+        return data
+
+def enqueue_job(session, name, args=None, delay=0, run_at=None, max_attempts=3, unique_key=None):
+    """加入后台任务（不提交事务，随调用方的事务一起提交）"""
+    job = Job(
+        name=name,
+        args=args or {},
+        run_at=run_at or datetime.now() + timedelta(seconds=delay),
+        max_attempts=max_attempts,
+        unique_key=unique_key
+    )
+    session.add(job)
+    return job
+
+# ==========================================
+# 模块六：班级 / 年级时长汇总 (见 rules.add_to_hour_rollup)
+# ==========================================
+# 按 (入学年份, 班级, 周) 预汇总报名时长，统计看板只读几十行而不必扫描全部报名记录。
+# 报名时在同一事务中增量累加；岗位时长修改或删除后由后台任务 rebuild_hour_rollups 整体重算。
+# 时长按活动开始日期 / 岗位日期所在的周计入，归档不影响汇总。
+
+class HourRollup(db.Model):
+    __tablename__ = 'hour_rollups'
+    enrollment_year = db.Column(db.Integer, primary_key=True)
+    class_number = db.Column(db.Integer, primary_key=True)
+    week_start = db.Column(db.Date, primary_key=True)  # 该周周一
+    event_hours = db.Column(db.Float, nullable=False, default=0.0)
+    shift_hours = db.Column(db.Float, nullable=False, default=0.0)
+    event_signups = db.Column(db.Integer, nullable=False, default=0)
+    shift_signups = db.Column(db.Integer, nullable=False, default=0)
+    # 按周取时间序列时以 week_start 开头
+    __table_args__ = (db.Index('ix_hour_rollups_week', 'week_start'),)
+
+# ==========================================
+# 模块七：幂等键 (见 idempotency.py)
+# ==========================================
+# 客户端在写请求上带 Idempotency-Key，超时重试时直接返回第一次的响应。
+
+class IdempotencyKey(db.Model):
+    __tablename__ = 'idempotency_keys'
+    key = db.Column(db.String(100), primary_key=True)
+    fingerprint = db.Column(db.String(64), nullable=False)  # sha256(方法 + 路径 + 请求体)
+    status = db.Column(db.String(20), nullable=False, default='processing')  # processing / done
+    response_status = db.Column(db.Integer)
+    response_body = db.Column(db.LargeBinary)
+    content_type = db.Column(db.String(100))
+    created_at = db.Column(db.DateTime, default=datetime.now)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+
+# ==========================================
+# 模块八：变更日志 (见 changelog.py)
+# ==========================================
+# 活动、岗位、轮值和报名每次新增 / 修改 / 删除都在同一事务中追加一行，
+# 自增 id 即同步游标，客户端用 GET /api/sync?since=<id> 只取变化的记录。
+
+class ChangeLog(db.Model):
+    __tablename__ = 'change_log'
+    id = db.Column(db.Integer, primary_key=True)
+    entity = db.Column(db.String(20), nullable=False)  # event / shift / rotation / eventSignup / shiftSignup
+    entity_id = db.Column(db.Integer, nullable=False)
+    op = db.Column(db.String(10), nullable=False)  # upsert / delete
+    student_id = db.Column(db.Integer)  # 报名记录所属学生，只同步给本人
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.now, index=True)
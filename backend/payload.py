@@ -0,0 +1,105 @@
+"""
+响应体优化：JSON 序列化与传输压缩
+
+- ORJSONProvider：基于 orjson 的 Flask JSON provider，直接输出 UTF-8 字节，
+  中文不再转义为 \\uXXXX，序列化速度也比标准库快得多（未安装 orjson 时保持 Flask 默认实现）
+- init_compression：按请求头 Accept-Encoding 协商 br / gzip，压缩较大的文本响应
+"""
+import gzip
+
+from flask import request
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # 可选依赖
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # 可选依赖，未安装时只提供 gzip
+    brotli = None
+
+
+class ORJSONProvider(DefaultJSONProvider):
+    """
+    用 orjson 序列化。日期时间仍交给 Flask 默认规则处理（HTTP 日期格式），
+    保证与原有接口输出一致；字典的非字符串键（如岗位 id）会自动转为字符串。
+    """
+
+    option = (orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS) if orjson else 0
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default, option=self.option).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        # 跳过 bytes -> str -> bytes 的来回转换
+        body = orjson.dumps(obj, default=self.default, option=self.option)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+def init_json_provider(app):
+    """安装可用的最快 JSON provider"""
+    if orjson is not None:
+        app.json = ORJSONProvider(app)
+    else:
+        app.json.ensure_ascii = False
+
+
+COMPRESSIBLE_MIMETYPES = {"application/json", "text/html", "text/plain", "text/css", "application/javascript"}
+
+
+def negotiate_encoding(accepted):
+    """根据 Accept-Encoding（werkzeug Accept 对象）选择 br / gzip，都不接受时返回 None"""
+    offered = ["br", "gzip"] if brotli is not None else ["gzip"]
+    # 同等权重时优先 br（压缩率更高）
+    best = max(offered, key=lambda enc: accepted[enc])
+    return best if accepted[best] > 0 else None
+
+
+def compress_body(body, encoding, config):
+    if encoding == "br":
+        return brotli.compress(body, quality=config["COMPRESS_BR_QUALITY"])
+    return gzip.compress(body, compresslevel=config["COMPRESS_LEVEL"])
+
+
+def init_compression(app):
+    """
+    注册 after_request 钩子压缩响应。
+    配置项：COMPRESS_MIN_SIZE（小于该字节数不压缩）、COMPRESS_LEVEL（gzip 级别）、COMPRESS_BR_QUALITY
+    """
+    app.config.setdefault("COMPRESS_MIN_SIZE", 1024)
+    app.config.setdefault("COMPRESS_LEVEL", 6)
+    app.config.setdefault("COMPRESS_BR_QUALITY", 4)
+
+    @app.after_request
+    def compress_response(response):
+        if (
+            response.status_code != 200
+            or response.direct_passthrough
+            or response.is_streamed
+            or "Content-Encoding" in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES
+        ):
+            return response
+
+        response.vary.add("Accept-Encoding")
+        body = response.get_data()
+        if len(body) < app.config["COMPRESS_MIN_SIZE"]:
+            return response
+
+        encoding = negotiate_encoding(request.accept_encodings)
+        if encoding is None:
+            return response
+
+        response.set_data(compress_body(body, encoding, app.config))
+        response.headers["Content-Encoding"] = encoding
+        # 压缩后的字节与原文不同，强 ETag 需降为弱 ETag
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
@@ -0,0 +1,270 @@
+"""
+线上按需剖析：查看慢接口的时间花在哪里（to_dict 序列化、属性里的查询、JSON 编码……）
+
+触发方式（两种都只剖析当前这一个请求）：
+  - 管理员请求带上 X-Profile: 1（同时需要 X-Admin-Token），响应头 X-Profile-Id 为结果编号
+  - PROFILE_SAMPLE_RATE=0.01 时随机剖析 1% 的请求（响应中没有 X-Profile-Id，只能从列表中查看）
+结果保存在 PROFILE_DIR 下，只保留最近 PROFILE_MAX_FILES 份（环形，旧的自动删除），
+通过 GET /api/admin/profiles 列出、GET /api/admin/profiles/<id> 下载（多校区部署时只能看到本校的结果）：
+  - 默认为折叠栈格式（flamegraph.pl、speedscope、Firefox Profiler 都可以直接打开）
+  - ?format=speedscope 为 speedscope 的 JSON 格式
+
+剖析器用 sys.setprofile 记录请求线程上的每次 Python / C 函数调用，按调用栈累计自身耗时（微秒）。
+这是确定性剖析：能看到 list.append 这种很短的调用，但每次调用都有额外开销，
+调用次数多的函数耗时会被放大，比较时看相对比例。只有被剖析的请求才会开启，其他请求没有开销。
+"""
+import itertools
+import json
+import os
+import random
+import re
+import sys
+import time
+from datetime import datetime
+
+from flask import g, request
+
+from tenancy import current_tenant
+
+PROFILE_HEADER = "X-Profile"
+PROFILE_ID_HEADER = "X-Profile-Id"
+_ID_RE = re.compile(r"^[0-9A-Za-z-]+$")
+
+
+# ==========================================
+# 剖析器
+# ==========================================
+
+class _Node:
+    __slots__ = ("parent", "children", "self_ns")
+
+    def __init__(self, parent=None):
+        self.parent = parent
+        self.children = {}
+        self.self_ns = 0
+
+
+class StackProfiler:
+    """按调用树累计自身耗时；start() / stop() 必须在同一线程中调用"""
+
+    def __init__(self, root_label):
+        self.root_label = root_label
+        self.root = _Node()
+        self._node = self.root
+        self._labels = {}
+        self._last = 0
+
+    def _code_label(self, code):
+        label = self._labels.get(code)
+        if label is None:
+            filename = os.path.basename(code.co_filename)
+            label = self._labels[code] = f"{code.co_name} ({filename}:{code.co_firstlineno})"
+        return label
+
+    @staticmethod
+    def _c_label(fn):
+        name = getattr(fn, "__qualname__", None) or repr(fn)
+        module = getattr(fn, "__module__", None)
+        return f"{module}.{name}" if module else name
+
+    def _callback(self, frame, event, arg):
+        now = time.perf_counter_ns()
+        self._node.self_ns += now - self._last
+        if event == "call":
+            label = self._code_label(frame.f_code)
+        elif event == "c_call":
+            label = self._c_label(arg)
+        else:
+            label = None
+        if label is not None:
+            node = self._node.children.get(label)
+            if node is None:
+                node = self._node.children[label] = _Node(self._node)
+            self._node = node
+        elif self._node.parent is not None:
+            # return / c_return / c_exception；开始剖析之前进入的栈帧返回时停留在根节点
+            self._node = self._node.parent
+        # 不把回调本身的耗时计入被剖析的函数
+        self._last = time.perf_counter_ns()
+
+    def start(self):
+        self._last = time.perf_counter_ns()
+        sys.setprofile(self._callback)
+
+    def stop(self):
+        sys.setprofile(None)
+
+    def collapsed(self):
+        """折叠栈：每行 "根;调用者;被调用者 自身耗时(微秒)" """
+        lines = []
+        stack = [(self.root, [self.root_label])]
+        while stack:
+            node, path = stack.pop()
+            micros = node.self_ns // 1000
+            if micros:
+                lines.append(f"{';'.join(path)} {micros}")
+            for label, child in node.children.items():
+                stack.append((child, path + [label.replace(";", ",")]))
+        lines.sort()
+        return "\n".join(lines) + "\n"
+
+
+def collapsed_to_speedscope(name, text):
+    """把折叠栈转换为 speedscope 的 sampled 格式（权重单位为微秒）"""
+    frames, index = [], {}
+    samples, weights = [], []
+    for line in text.splitlines():
+        stack, _, weight = line.rpartition(" ")
+        if not stack:
+            continue
+        sample = []
+        for label in stack.split(";"):
+            if label not in index:
+                index[label] = len(frames)
+                frames.append({"name": label})
+            sample.append(index[label])
+        samples.append(sample)
+        weights.append(int(weight))
+    return {
+        "$schema": "https://www.speedscope.app/file-format-schema.json",
+        "name": name,
+        "exporter": "volunteer-profiling",
+        "shared": {"frames": frames},
+        "profiles": [{
+            "type": "sampled", "name": name, "unit": "microseconds",
+            "startValue": 0, "endValue": sum(weights), "samples": samples, "weights": weights,
+        }],
+    }
+
+
+# ==========================================
+# 结果存储（磁盘上的环形目录）
+# ==========================================
+
+class ProfileStore:
+    """
+    每份结果两个文件：<id>.folded（折叠栈）和 <id>.json（请求信息）。
+    id 以时间开头，按文件名排序即按时间排序；多个 worker 进程共用同一个目录。
+    """
+
+    def __init__(self, directory, max_files):
+        self.directory = directory
+        self.max_files = max_files
+        self._seq = itertools.count()
+
+    def _path(self, profile_id, ext):
+        if not _ID_RE.match(profile_id):
+            return None
+        return os.path.join(self.directory, f"{profile_id}.{ext}")
+
+    @staticmethod
+    def _write(path, data):
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    def save(self, meta, folded):
+        os.makedirs(self.directory, exist_ok=True)
+        profile_id = f"{datetime.now():%Y%m%d-%H%M%S-%f}-{os.getpid()}-{next(self._seq)}"
+        # 先写折叠栈再写信息文件：列表只读信息文件，不会列出写了一半的结果
+        self._write(self._path(profile_id, "folded"), folded)
+        self._write(self._path(profile_id, "json"), json.dumps(dict(meta, id=profile_id), ensure_ascii=False))
+        self._prune()
+        return profile_id
+
+    def _ids(self):
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+        return sorted(name[:-5] for name in names if name.endswith(".json"))
+
+    def _prune(self):
+        for profile_id in self._ids()[:-self.max_files]:
+            for ext in ("json", "folded"):
+                try:
+                    os.remove(self._path(profile_id, ext))
+                except FileNotFoundError:
+                    pass  # 另一个进程已经删除
+
+    def list(self):
+        """最近的结果在前"""
+        profiles = []
+        for profile_id in reversed(self._ids()):
+            try:
+                with open(self._path(profile_id, "json"), encoding="utf-8") as f:
+                    profiles.append(json.load(f))
+            except FileNotFoundError:
+                continue
+        return profiles
+
+    def read(self, profile_id):
+        """返回 (请求信息, 折叠栈文本)；不存在时返回 None"""
+        path = self._path(profile_id, "json")
+        if path is None:
+            return None
+        try:
+            with open(path, encoding="utf-8") as f:
+                meta = json.load(f)
+            with open(self._path(profile_id, "folded"), encoding="utf-8") as f:
+                return meta, f.read()
+        except FileNotFoundError:
+            return None
+
+
+# ==========================================
+# Flask 钩子
+# ==========================================
+
+def init_profiling(app):
+    """
+    应在其他带 after_request 的扩展之前调用：after_request 按注册的逆序执行，
+    这样压缩等后处理也在剖析范围内
+    """
+    store = app.extensions["profiling"] = ProfileStore(app.config["PROFILE_DIR"], app.config["PROFILE_MAX_FILES"])
+    sample_rate = app.config["PROFILE_SAMPLE_RATE"]
+
+    @app.before_request
+    def start_profiling():
+        if request.headers.get(PROFILE_HEADER):
+            from web import current_admin
+            if current_admin() is None:
+                return
+            trigger = "header"
+        elif sample_rate and random.random() < sample_rate:
+            trigger = "sample"
+        else:
+            return
+        g.profiler = StackProfiler(f"{request.method} {request.endpoint or request.path}")
+        g.profile_trigger = trigger
+        g.profile_started = time.perf_counter()
+        g.profiler.start()
+
+    @app.after_request
+    def save_profile(response):
+        profiler = g.pop("profiler", None)
+        if profiler is None:
+            return response
+        profiler.stop()
+        profile_id = store.save({
+            "method": request.method,
+            "path": request.path,  # 不保存查询参数（其中可能有手机号等个人信息）
+            "endpoint": request.endpoint,
+            "status": response.status_code,
+            "durationMs": round((time.perf_counter() - g.profile_started) * 1000, 1),
+            "trigger": g.profile_trigger,
+            "createdAt": datetime.now().isoformat(timespec="seconds"),
+            "tenant": current_tenant(),
+        }, profiler.collapsed())
+        if g.profile_trigger == "header":
+            # 随机剖析的请求不返回编号，普通用户看不出剖析是否开启
+            response.headers[PROFILE_ID_HEADER] = profile_id
+        return response
+
+    @app.teardown_request
+    def stop_profiling(exc):
+        # 视图抛出异常时 after_request 不会执行，这里保证关闭剖析
+        profiler = g.pop("profiler", None)
+        if profiler is not None:
+            profiler.stop()
@@ -10,11 +10,13 @@ if os.path.exists(db_path):
     print(f"已删除旧数据库: {db_path}")
 
 # 导入应用
-from app import app, db, Student, RecurringShift
+from app import create_app
+from extensions import db
+from models import Student, RecurringShift
 from datetime import datetime
 
 # 创建应用上下文
-with app.app_context():
+with create_app(blueprints=False).app_context():
     # 删除所有表
     db.drop_all()
     print("已删除所有旧表")
@@ -0,0 +1,96 @@
+"""
+读写分离：配置 DATABASE_READ_URL 后，只读请求的查询发往只读副本
+
+    DATABASE_READ_URL=postgresql://replica-host/volunteer   # 流复制的备库，使用独立的连接池
+    DATABASE_READ_STICKY_SECONDS=5                          # 写请求之后继续读主库的秒数
+
+路由规则（RoutingSession.get_bind）：
+  - 只有 GET / HEAD 请求中的 SELECT 会发往副本；flush、UPDATE / DELETE、text() 原生 SQL 一律走主库
+  - 同一请求中一旦访问过主库，之后的查询也留在主库，能读到本请求刚写入的数据
+  - 写请求的响应带上 X-Read-Primary: N 响应头（同源部署还会带上 Cookie），客户端之后 N 秒内的读请求
+    带上 X-Read-Primary 请求头（或 Cookie）仍走主库，并且不读响应缓存，避开复制延迟。
+    前端与接口不同源、请求不带 Cookie，因此由 services/api.js 自己记住时限并发送请求头
+  - 报名校验在 POST 请求中执行，始终读主库；归档库等其他 bind 不受影响
+副本上查出的结果写入响应缓存时，缓存时间不超过 N 秒，延迟的数据不会被长期缓存。
+
+本地测试只需要两个 SQLite 文件：
+    python backup.py backup --out /tmp/replica.db            # 复制一份主库当作副本
+    DATABASE_READ_URL=sqlite:////tmp/replica.db flask --app app run
+之后在主库中报名，其他客户端的列表接口读副本，看不到新数据；报名的客户端自己能看到。
+"""
+from flask import current_app, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import Select
+
+from tenancy import routed_engine
+
+REPLICA_BIND = "replica"
+STICKY_COOKIE = "db_primary"
+STICKY_HEADER = "X-Read-Primary"
+READ_METHODS = ("GET", "HEAD")
+
+
+class RoutingSession(Session):
+    """
+    session.info 中的标记（每个请求一个会话，请求结束时清空）：
+      read_replica  本请求允许读副本（由 init_replica 的 before_request 设置）
+      sticky        客户端刚写入过数据，本请求只读主库，也不读响应缓存
+      pinned        本请求已经访问过主库，之后不再读副本
+      used_replica  本请求有查询读自副本
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        engine = super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+        if bind is not None:
+            return engine
+        # 多校区部署：查询发往当前学校的数据库（见 tenancy.py），不再读副本
+        tenant_engine = routed_engine(self._db, engine)
+        if tenant_engine is not None:
+            return tenant_engine
+        if not self.info.get("read_replica") or self.info.get("pinned"):
+            return engine
+        engines = self._db.engines
+        if engine is not engines.get(None):
+            return engine
+        if isinstance(clause, Select) and not self._flushing:
+            self.info["used_replica"] = True
+            return engines[REPLICA_BIND]
+        self.info["pinned"] = True
+        return engine
+
+
+def used_replica(session):
+    return bool(session.info.get("used_replica"))
+
+
+def sticky_to_primary(session):
+    return bool(session.info.get("sticky"))
+
+
+def wants_primary(cookies, headers):
+    """客户端是否处在写后读主库的时限内（Flask 与 asgi.py 共用）"""
+    return bool(cookies.get(STICKY_COOKIE) or headers.get(STICKY_HEADER))
+
+
+def init_replica(app):
+    """未配置 DATABASE_READ_URL 时什么也不做，所有查询走主库"""
+    if REPLICA_BIND not in app.config["SQLALCHEMY_BINDS"]:
+        return
+    sticky_seconds = app.config["DATABASE_READ_STICKY_SECONDS"]
+
+    @app.before_request
+    def route_reads_to_replica():
+        if request.method not in READ_METHODS:
+            return
+        info = current_app.extensions["sqlalchemy"].session.info
+        if wants_primary(request.cookies, request.headers):
+            info["sticky"] = True
+        else:
+            info["read_replica"] = True
+
+    @app.after_request
+    def stick_to_primary_after_write(response):
+        if request.method not in READ_METHODS and request.method != "OPTIONS":
+            response.headers[STICKY_HEADER] = str(sticky_seconds)
+            response.set_cookie(STICKY_COOKIE, "1", max_age=sticky_seconds, httponly=True, samesite="Lax")
+        return response
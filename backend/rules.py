@@ -0,0 +1,567 @@
+"""
+业务规则：Flask 视图、ASGI 异步接口 (asgi.py) 与后台任务 (worker.py) 共用
+
+所有函数只接收一个同步 Session：Flask 中传入 db.session，
+异步接口通过 AsyncSession.run_sync() 调用，保证两条路径的校验规则完全一致。
+"""
+from datetime import datetime, date, timedelta
+
+from sqlalchemy import func, text, tuple_
+
+from extensions import cache, broker, event_index
+from models import (
+    ALL_GRADES, Student, Event, EventSignup, EventGrade, RecurringShift, WeeklyRotation, ShiftSignup,
+    ArchivedHours, ArchivedEvent, ArchivedEventSignup, ArchivedShiftSignup, HourRollup,
+)
+
+class SignupError(Exception):
+    """报名校验未通过：message 直接返回给前端，status 为 HTTP 状态码"""
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+DAY_NAMES = {1: "周一", 2: "周二", 3: "周三", 4: "周四", 5: "周五"}
+
+def list_events(session):
+    """
+    获取活动列表。
+    排序逻辑：
+    1. 招募中 (最优先)
+    2. 已满员
+    3. 报名截止
+    4. 进行中
+    5. 已结束 (最不重要)
+    同级状态下，按开始时间排序。
+    """
+    # 获取所有活动，按开始时间倒序（新的在前面）
+    events = session.query(Event).order_by(Event.start_time.desc()).all()
+    
+    # 转换成字典
+    event_list = [e.to_dict() for e in events]
+    
+    # 再在 Python 层面进行一次精准排序 (因为 status 是动态属性，无法直接 order_by)
+    # 定义状态权重
+    priority_map = {
+        "招募中": 0,
+        "已满员": 1,
+        "报名截止": 2,
+        "进行中": 3,
+        "已结束": 4
+    }
+    event_list.sort(key=lambda x: priority_map.get(x['status'], 5))
+    return event_list
+
+def parse_grade_limit(grade_limit):
+    """
+    解析 grade_limit（如 "2023,2024" 或 "ALL"），返回允许的入学年份列表；
+    空值或 ALL 返回 [ALL_GRADES]
+    """
+    parts = [p.strip() for p in (grade_limit or "").split(',') if p.strip()]
+    if not parts or "ALL" in parts:
+        return [ALL_GRADES]
+    return sorted({int(p) for p in parts if p.isdigit()})
+
+def set_event_grades(event):
+    """按 event.grade_limit 重建活动的年级表，随活动一起提交"""
+    event.grades = [EventGrade(enrollment_year=year) for year in parse_grade_limit(event.grade_limit)]
+
+def backfill_event_grades(session):
+    """为还没有年级记录的活动（年级表上线前创建的）补齐记录，返回补齐的活动数"""
+    has_grades = session.query(EventGrade.event_id).distinct()
+    events = session.query(Event).filter(Event.id.not_in(has_grades)).all()
+    for event in events:
+        set_event_grades(event)
+    return len(events)
+
+def list_eligible_events(session, student):
+    """
+    学生当前可以报名的活动：年级符合、状态为招募中、未满员且本人未报名，
+    全部条件在 SQL 中完成，按开始时间先后排序
+    """
+    now = datetime.now()
+    signup_count = session.query(func.count(EventSignup.id))\
+        .filter(EventSignup.event_id == Event.id).scalar_subquery()
+    joined = session.query(EventSignup.event_id).filter(EventSignup.student_id == student.id)
+    events = session.query(Event)\
+        .join(EventGrade, EventGrade.event_id == Event.id)\
+        .filter(EventGrade.enrollment_year.in_([ALL_GRADES, student.enrollment_year]))\
+        .filter(Event.start_time >= now, Event.registration_deadline >= now)\
+        .filter(signup_count < Event.required_volunteers)\
+        .filter(Event.id.not_in(joined))\
+        .order_by(Event.start_time, Event.id).all()
+    return [e.to_dict() for e in events]
+
+def list_shifts(session):
+    """所有周常岗位（按星期和时间排序）"""
+    shifts = session.query(RecurringShift).order_by(
+        RecurringShift.day_of_week, 
+        RecurringShift.start_time
+    ).all()
+    return [s.to_dict() for s in shifts]
+
+def week_start_of(date_str):
+    """YYYY-MM-DD 所在周的周一；缺省或格式错误时取本周"""
+    target = date.today()
+    if date_str:
+        try:
+            target = datetime.strptime(date_str, "%Y-%m-%d").date()
+        except ValueError:
+            pass
+    return target - timedelta(days=target.weekday())
+
+def week_rotation(session, week_start):
+    """某周（周一日期）的轮值班级信息"""
+    rotation = session.query(WeeklyRotation).filter_by(week_start_date=week_start).first()
+    return {
+        "weekStartDate": week_start.isoformat(),
+        "assignedClass": rotation.assigned_class_str if rotation else None
+    }
+
+def count_shift_signups(session, shift_id, signup_date):
+    """某岗位某天的有效报名人数"""
+    return session.query(ShiftSignup).filter_by(
+        shift_id=shift_id,
+        date=signup_date
+    ).filter(ShiftSignup.status != 'cancelled').count()
+
+def student_commitments(session, student_id, start, end=None):
+    """
+    学生在 [start, end) 内已有的安排（已报名的活动和未取消的周常岗位），按开始时间排序；
+    end 为 None 表示不限结束时间。活动按 end_time 索引、岗位按 (student_id, date) 索引查找，
+    只读取与时间段相交的记录，与学生历史记录的多少无关
+    """
+    items = []
+    # 从尚未结束的活动出发，逐个用 (student_id, event_id) 唯一索引确认是否已报名
+    signed_up = session.query(EventSignup.id).filter(
+        EventSignup.student_id == student_id, EventSignup.event_id == Event.id
+    ).exists()
+    events = session.query(Event).filter(Event.end_time > start, signed_up)
+    if end is not None:
+        events = events.filter(Event.start_time < end)
+    for e in events:
+        items.append({"type": "event", "id": e.id, "title": e.title, "start": e.start_time, "end": e.end_time})
+
+    shifts = session.query(ShiftSignup, RecurringShift)\
+        .join(RecurringShift, RecurringShift.id == ShiftSignup.shift_id)\
+        .filter(ShiftSignup.student_id == student_id,
+                ShiftSignup.date >= start.date(),
+                ShiftSignup.status != 'cancelled')
+    if end is not None:
+        shifts = shifts.filter(ShiftSignup.date <= end.date())
+    for signup, shift in shifts:
+        shift_start = datetime.combine(signup.date, shift.start_time)
+        shift_end = datetime.combine(signup.date, shift.end_time)
+        if shift_end > start and (end is None or shift_start < end):
+            items.append({"type": "shift", "id": shift.id, "title": shift.name,
+                          "start": shift_start, "end": shift_end})
+
+    items.sort(key=lambda item: (item["start"], item["end"]))
+    return items
+
+def check_schedule_conflict(session, student_id, start, end):
+    """新安排 [start, end) 与学生已有安排重叠时抛出 SignupError (409)"""
+    conflicts = student_commitments(session, student_id, start, end)
+    if conflicts:
+        first = conflicts[0]
+        raise SignupError(
+            f"时间冲突：您在 {first['start'].strftime('%m-%d %H:%M')}-{first['end'].strftime('%H:%M')} "
+            f"已有安排「{first['title']}」", 409
+        )
+
+def find_conflicts(commitments):
+    """在按开始时间排序的安排中找出所有相互重叠的两项，返回 [(a, b)]"""
+    pairs = []
+    active = []
+    for item in commitments:
+        active = [a for a in active if a["end"] > item["start"]]
+        pairs.extend((a, item) for a in active)
+        active.append(item)
+    return pairs
+
+def create_event_signup(session, event_id, student_id):
+    """校验并创建活动报名（不提交事务），返回 (signup, event)"""
+    event = session.get(Event, event_id)
+    if not event:
+        raise SignupError("活动不存在", 404)
+    student = session.get(Student, student_id) if student_id is not None else None
+    if not student:
+        raise SignupError("学生不存在", 404)
+
+    # --- 1. 基础状态检查 ---
+    if event.status != "招募中":
+        raise SignupError(f"无法报名，当前状态：{event.status}")
+    
+    # --- 2. 年级限制检查 (关键功能) ---
+    # event.grade_limit 格式如 "2023,2024" 或 "ALL"
+    allowed_years = parse_grade_limit(event.grade_limit)
+    if ALL_GRADES not in allowed_years and student.enrollment_year not in allowed_years:
+        raise SignupError(f"抱歉，该活动仅限 {event.grade_limit} 级学生报名", 403)
+
+    # --- 3. 重复报名检查 ---
+    existing = session.query(EventSignup).filter_by(student_id=student.id, event_id=event.id).first()
+    if existing:
+        raise SignupError("您已经报名过该活动了", 409)
+
+    # --- 4. 时间冲突检查 ---
+    check_schedule_conflict(session, student.id, event.start_time, event.end_time)
+
+    # --- 5. 执行报名 ---
+    signup = EventSignup(student_id=student.id, event_id=event.id)
+    session.add(signup)
+    add_to_hour_rollup(session, student.enrollment_year, student.class_number, event.start_time.date(),
+                       event_hours=event.hours_value or 0.0, event_signups=1)
+    return signup, event
+
+# 一次批量报名最多包含的岗位数（每人每周最多 2 个，批量报名通常只覆盖一两周）
+MAX_BATCH_SLOTS = 10
+
+def shift_signup_counts(session, slots):
+    """多个 (shift_id, date) 的有效报名人数，一次分组查询，返回 {(shift_id, date): count}"""
+    slots = set(slots)
+    if not slots:
+        return {}
+    rows = session.query(ShiftSignup.shift_id, ShiftSignup.date, func.count(ShiftSignup.id))\
+        .filter(tuple_(ShiftSignup.shift_id, ShiftSignup.date).in_(slots),
+                ShiftSignup.status != 'cancelled')\
+        .group_by(ShiftSignup.shift_id, ShiftSignup.date)
+    counts = dict.fromkeys(slots, 0)
+    counts.update({(shift_id, day): count for shift_id, day, count in rows})
+    return counts
+
+def parse_shift_slots(items):
+    """解析请求体中的 [{shiftId, date}]，返回 [(shift_id, date)]；格式错误时抛出 SignupError"""
+    if not isinstance(items, list):
+        raise SignupError("缺少必填信息")
+    try:
+        return [(int(item['shiftId']), datetime.strptime(item['date'], "%Y-%m-%d").date()) for item in items]
+    except (KeyError, TypeError, ValueError):
+        raise SignupError("岗位或日期格式错误，日期应为YYYY-MM-DD")
+
+def create_shift_signup(session, shift_id, student_id, signup_date):
+    """校验并创建周常岗位报名（不提交事务），返回 (signup, shift)"""
+    return create_shift_signups(session, student_id, [(shift_id, signup_date)])[0]
+
+def create_shift_signups(session, student_id, slots):
+    """
+    校验并创建多个周常岗位报名（不提交事务），slots 为 [(shift_id, date)]，返回 [(signup, shift)]。
+    任一岗位校验不通过即抛出 SignupError（信息前注明是哪个岗位），调用方回滚后一个也不报名。
+    岗位、轮值班级、本人已有报名、各岗位人数、已有安排各只查询一次，与岗位个数无关；
+    同一批中前面的岗位计入后面岗位的每周次数和时间冲突检查。
+    """
+    if not slots:
+        raise SignupError("请至少选择一个岗位")
+    if len(slots) > MAX_BATCH_SLOTS:
+        raise SignupError(f"一次最多报名{MAX_BATCH_SLOTS}个岗位")
+    batch = len(slots) > 1
+
+    def fail(shift, signup_date, message, status=400):
+        if batch:
+            message = f"{signup_date.isoformat()}「{shift.name}」：{message}"
+        raise SignupError(message, status)
+
+    # 验证岗位存在
+    shift_ids = {shift_id for shift_id, _ in slots}
+    shifts = {s.id: s for s in session.query(RecurringShift).filter(RecurringShift.id.in_(shift_ids))}
+    missing = shift_ids - shifts.keys()
+    if missing:
+        raise SignupError(f"岗位不存在（{min(missing)}）" if batch else "岗位不存在", 404)
+    
+    # 验证学生存在
+    student = session.get(Student, student_id) if student_id is not None else None
+    if not student:
+        raise SignupError("学生不存在", 404)
+    
+    if len(set(slots)) < len(slots):
+        raise SignupError("同一岗位同一天只能报名一次")
+
+    today = datetime.now().date()
+    for shift_id, signup_date in slots:
+        shift = shifts[shift_id]
+        # 验证日期是未来的日期
+        if signup_date < today:
+            fail(shift, signup_date, "不能报名过去的日期")
+        
+        # 验证日期的星期与岗位匹配（周一=1, 周二=2, ..., 周五=5）
+        # Python的weekday(): 周一=0, 周日=6，所以需要+1转换
+        weekday = signup_date.weekday() + 1
+        if weekday > 5:  # 周六周日
+            fail(shift, signup_date, "周常任务仅限工作日（周一到周五）")
+        
+        if weekday != shift.day_of_week:
+            fail(shift, signup_date,
+                 f"日期错误：该岗位是{DAY_NAMES[shift.day_of_week]}的岗位，您选择的日期是{DAY_NAMES[weekday]}")
+
+    # 涉及各周的周一日期；以下查询覆盖这些周的周一到周五
+    dates = [signup_date for _, signup_date in slots]
+    week_starts = {d - timedelta(days=d.weekday()) for d in dates}
+    first_day, last_day = min(week_starts), max(week_starts) + timedelta(days=4)
+
+    rotations = {
+        r.week_start_date: r for r in
+        session.query(WeeklyRotation).filter(WeeklyRotation.week_start_date.in_(week_starts))
+    }
+    # 本人在这些周的报名（含已取消的，用于重复报名检查；每周次数只计未取消的）
+    own = session.query(ShiftSignup.shift_id, ShiftSignup.date, ShiftSignup.status).filter(
+        ShiftSignup.student_id == student.id,
+        ShiftSignup.date >= first_day,
+        ShiftSignup.date <= last_day
+    ).all()
+    already_signed = {(shift_id, day) for shift_id, day, _ in own}
+    weekly_count = {}
+    for _, day, status in own:
+        if status != 'cancelled':
+            week = day - timedelta(days=day.weekday())
+            weekly_count[week] = weekly_count.get(week, 0) + 1
+    signup_counts = shift_signup_counts(session, slots)
+    commitments = student_commitments(
+        session, student.id,
+        min(datetime.combine(d, shifts[s].start_time) for s, d in slots),
+        max(datetime.combine(d, shifts[s].end_time) for s, d in slots)
+    )
+
+    student_class = f"{student.enrollment_year}-{student.class_number}"
+    created = []
+    for shift_id, signup_date in slots:
+        shift = shifts[shift_id]
+
+        # 检查是否已经报名
+        if (shift_id, signup_date) in already_signed:
+            fail(shift, signup_date, "您已经报名过该岗位了")
+        
+        # 检查容量限制
+        if signup_counts[(shift_id, signup_date)] >= shift.capacity:
+            fail(shift, signup_date, f"该岗位已满员（容量{shift.capacity}人）")
+        
+        # 检查班级轮换限定：只有本周轮值班级的学生才能报名
+        week_start = signup_date - timedelta(days=signup_date.weekday())  # 该周周一
+        rotation = rotations.get(week_start)
+        if not rotation:
+            fail(shift, signup_date, "该周尚未设置轮值班级，请联系管理员")
+        
+        if student_class != rotation.assigned_class_str:
+            fail(shift, signup_date,
+                 f"本周轮值班级为 {rotation.assigned_class_str}，您的班级({student_class})不在轮值范围内", 403)
+        
+        # 检查每周报名次数限制（每人每周最多2个）
+        if weekly_count.get(week_start, 0) >= 2:
+            fail(shift, signup_date, "每人每周最多报名2个周常项目")
+
+        # 检查与已报名的活动、岗位（含本批中前面的岗位）是否时间冲突
+        start = datetime.combine(signup_date, shift.start_time)
+        end = datetime.combine(signup_date, shift.end_time)
+        for item in commitments:
+            if item["start"] < end and item["end"] > start:
+                fail(shift, signup_date,
+                     f"时间冲突：您在 {item['start'].strftime('%m-%d %H:%M')}-{item['end'].strftime('%H:%M')} "
+                     f"已有安排「{item['title']}」", 409)
+        
+        # 创建报名记录
+        signup = ShiftSignup(
+            student_id=student.id,
+            shift_id=shift_id,
+            date=signup_date,
+            status='pending'
+        )
+        session.add(signup)
+        add_to_hour_rollup(session, student.enrollment_year, student.class_number, signup_date,
+                           shift_hours=shift.hours_value or 0.0, shift_signups=1)
+        created.append((signup, shift))
+
+        weekly_count[week_start] = weekly_count.get(week_start, 0) + 1
+        commitments.append({"type": "shift", "id": shift.id, "title": shift.name, "start": start, "end": end})
+    return created
+
+# 报名后的通知分两步：*_notice 在会话中查询最新人数，得到要失效的缓存标签和要广播的消息；
+# send_notice 再访问缓存和广播（配置 CACHE_URL 时是 Redis 往返）。
+# Flask 端由 after_* 依次执行两步；asgi.py 在事件循环中只执行查询，send_notice 放到线程池中执行
+
+def send_notice(tags, messages):
+    """失效缓存标签并广播人数消息"""
+    cache.invalidate(*tags)
+    for message in messages:
+        broker.publish(message)
+
+def event_signup_notice(session, event, student_id):
+    """活动报名提交后：失效活动列表和本人的缓存，广播该活动的最新人数"""
+    message = {
+        "type": "event",
+        "eventId": event.id,
+        "count": session.query(EventSignup).filter_by(event_id=event.id).count(),
+        "capacity": event.required_volunteers
+    }
+    return ("events", f"student:{student_id}"), [message]
+
+def after_event_signup(session, event, student_id):
+    """活动报名提交后：失效相关缓存并广播最新人数"""
+    send_notice(*event_signup_notice(session, event, student_id))
+
+def shift_capacity_message(shift, signup_date, count):
+    """岗位某天最新报名人数的广播消息"""
+    return {
+        "type": "shift",
+        "shiftId": shift.id,
+        "date": signup_date.isoformat(),
+        "count": count,
+        "capacity": shift.capacity
+    }
+
+def publish_shift_capacity(shift, signup_date, count):
+    """广播岗位某天的最新报名人数"""
+    broker.publish(shift_capacity_message(shift, signup_date, count))
+
+def shift_signup_notice(session, shift, signup_date, student_id):
+    """岗位报名提交后：失效本人的缓存，广播该岗位当天的最新人数"""
+    count = count_shift_signups(session, shift.id, signup_date)
+    return (f"student:{student_id}",), [shift_capacity_message(shift, signup_date, count)]
+
+def after_shift_signup(session, shift, signup_date, student_id):
+    """岗位报名提交后：失效相关缓存并广播该岗位当天的最新人数"""
+    send_notice(*shift_signup_notice(session, shift, signup_date, student_id))
+
+def shift_signups_notice(session, created, student_id):
+    """批量报名提交后：失效一次本人的缓存，用一次分组查询得到各岗位当天的最新人数"""
+    counts = shift_signup_counts(session, [(shift.id, signup.date) for signup, shift in created])
+    messages = [shift_capacity_message(shift, signup.date, counts[(shift.id, signup.date)])
+                for signup, shift in created]
+    return (f"student:{student_id}",), messages
+
+def after_shift_signups(session, created, student_id):
+    """批量报名提交后：失效一次缓存，广播各岗位当天的最新人数"""
+    send_notice(*shift_signups_notice(session, created, student_id))
+
+def upcoming_shift_students(session, shift_id):
+    """岗位今天及以后有未取消报名的学生 id：岗位修改或删除后需要失效这些学生的个人缓存（如日程订阅）"""
+    rows = session.query(ShiftSignup.student_id).filter(
+        ShiftSignup.shift_id == shift_id,
+        ShiftSignup.date >= date.today(),
+        ShiftSignup.status != 'cancelled'
+    ).distinct()
+    return {student_id for student_id, in rows}
+
+def index_event(session, event):
+    """写入或更新活动的全文索引（随调用方的事务一起提交；调用方需先执行 event_index.ensure）"""
+    event_index.upsert(session, event.id, event.title, event.description, event.location, event.leader_name)
+
+def hours_by_student(session, student_ids=None):
+    """
+    批量计算累计时长，规则与 Student.total_hours 相同：
+    活动按已结束的计算，周常岗位按日期早于今天且未取消的计算，再加上已归档部分的预汇总时长。
+    分组查询代替逐个学生查询；student_ids 为 None 时计算全部学生。
+    """
+    event_query = session.query(EventSignup.student_id, func.sum(Event.hours_value))\
+        .join(Event, Event.id == EventSignup.event_id)\
+        .filter(Event.end_time < datetime.now())
+    shift_query = session.query(ShiftSignup.student_id, func.sum(RecurringShift.hours_value))\
+        .join(RecurringShift, RecurringShift.id == ShiftSignup.shift_id)\
+        .filter(ShiftSignup.date < date.today(), ShiftSignup.status != 'cancelled')
+    archived_query = session.query(ArchivedHours.student_id, ArchivedHours.hours)
+    if student_ids is not None:
+        event_query = event_query.filter(EventSignup.student_id.in_(student_ids))
+        shift_query = shift_query.filter(ShiftSignup.student_id.in_(student_ids))
+        archived_query = archived_query.filter(ArchivedHours.student_id.in_(student_ids))
+
+    totals = {}
+    for query, column in ((event_query, EventSignup.student_id), (shift_query, ShiftSignup.student_id)):
+        for student_id, hours in query.group_by(column):
+            totals[student_id] = totals.get(student_id, 0.0) + float(hours or 0.0)
+    for student_id, hours in archived_query:
+        totals[student_id] = totals.get(student_id, 0.0) + float(hours or 0.0)
+    return {student_id: round(hours, 1) for student_id, hours in totals.items()}
+
+# ==========================================
+# 班级 / 年级时长汇总 (hour_rollups)
+# ==========================================
+
+ROLLUP_COUNTERS = ("event_hours", "shift_hours", "event_signups", "shift_signups")
+
+def add_to_hour_rollup(session, enrollment_year, class_number, day, **deltas):
+    """
+    在 (年级, 班级, day 所在周) 的汇总行上累加 deltas（键为 ROLLUP_COUNTERS），随调用方的事务提交。
+    使用 INSERT ... ON CONFLICT DO UPDATE 原子累加，并发报名不会丢失计数
+    """
+    if session.get_bind(HourRollup).dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    table = HourRollup.__table__
+    stmt = insert(table).values(
+        enrollment_year=enrollment_year,
+        class_number=class_number,
+        week_start=day - timedelta(days=day.weekday()),
+        **{name: deltas.get(name, 0) for name in ROLLUP_COUNTERS}
+    )
+    session.execute(stmt.on_conflict_do_update(
+        index_elements=[table.c.enrollment_year, table.c.class_number, table.c.week_start],
+        set_={name: table.c[name] + stmt.excluded[name] for name in ROLLUP_COUNTERS}
+    ))
+
+def rebuild_hour_rollups(session):
+    """
+    按全部报名记录（含归档库）重新计算汇总表，返回写入的行数（不提交事务）。
+    主库的报名按 (年级, 班级, 日期) 分组查询，归档库按 (学生, 日期) 分组后再对应到班级。
+    已取消的岗位报名不计入，与 Student.total_hours、hours_by_student 的规则相同。
+    先清空汇总表：SQLite 由此取得写锁，Postgres 显式锁表，
+    重算期间的新报名会等待本事务提交后再累加，不会被覆盖
+    """
+    if session.get_bind(HourRollup).dialect.name == "postgresql":
+        session.execute(text("LOCK TABLE hour_rollups IN EXCLUSIVE MODE"))
+    session.query(HourRollup).delete(synchronize_session=False)
+
+    rows = {}
+    def add(year, cls, day, **deltas):
+        if isinstance(day, str):  # SQLite 的 date() 返回字符串
+            day = date.fromisoformat(day)
+        key = (year, cls, day - timedelta(days=day.weekday()))
+        row = rows.setdefault(key, dict.fromkeys(ROLLUP_COUNTERS, 0))
+        for name, value in deltas.items():
+            row[name] += value or 0
+
+    event_day = func.date(Event.start_time)
+    event_rows = session.query(
+        Student.enrollment_year, Student.class_number, event_day,
+        func.sum(Event.hours_value), func.count(EventSignup.id)
+    ).join(EventSignup, EventSignup.student_id == Student.id)\
+        .join(Event, Event.id == EventSignup.event_id)\
+        .group_by(Student.enrollment_year, Student.class_number, event_day)
+    for year, cls, day, hours, count in event_rows:
+        add(year, cls, day, event_hours=hours, event_signups=count)
+
+    shift_rows = session.query(
+        Student.enrollment_year, Student.class_number, ShiftSignup.date,
+        func.sum(RecurringShift.hours_value), func.count(ShiftSignup.id)
+    ).join(ShiftSignup, ShiftSignup.student_id == Student.id)\
+        .join(RecurringShift, RecurringShift.id == ShiftSignup.shift_id)\
+        .filter(ShiftSignup.status != 'cancelled')\
+        .group_by(Student.enrollment_year, Student.class_number, ShiftSignup.date)
+    for year, cls, day, hours, count in shift_rows:
+        add(year, cls, day, shift_hours=hours, shift_signups=count)
+
+    # 归档库可能是单独的数据库，无法与 students 联表
+    classes = {sid: (year, cls) for sid, year, cls in
+               session.query(Student.id, Student.enrollment_year, Student.class_number)}
+    archived_day = func.date(ArchivedEvent.start_time)
+    archived_events = session.query(
+        ArchivedEventSignup.student_id, archived_day,
+        func.sum(ArchivedEvent.hours_value), func.count(ArchivedEventSignup.id)
+    ).join(ArchivedEvent, ArchivedEvent.id == ArchivedEventSignup.event_id)\
+        .group_by(ArchivedEventSignup.student_id, archived_day)
+    for student_id, day, hours, count in archived_events:
+        if student_id in classes:
+            add(*classes[student_id], day, event_hours=hours, event_signups=count)
+    archived_shifts = session.query(
+        ArchivedShiftSignup.student_id, ArchivedShiftSignup.date,
+        func.sum(ArchivedShiftSignup.hours_value), func.count(ArchivedShiftSignup.id)
+    ).filter(ArchivedShiftSignup.status != 'cancelled')\
+        .group_by(ArchivedShiftSignup.student_id, ArchivedShiftSignup.date)
+    for student_id, day, hours, count in archived_shifts:
+        if student_id in classes:
+            add(*classes[student_id], day, shift_hours=hours, shift_signups=count)
+
+    session.add_all([
+        HourRollup(enrollment_year=year, class_number=cls, week_start=week, **counters)
+        for (year, cls, week), counters in rows.items()
+    ])
+    session.flush()
+    return len(rows)
+
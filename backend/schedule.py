@@ -0,0 +1,76 @@
+"""
+后台任务的调度计算：cron 表达式与失败重试的退避时间
+
+CronSchedule 支持标准 5 段格式 "分 时 日 月 周"，每段可写 *、数字、a-b、a,b 以及 */n、a-b/n；
+周日为 0（也可写 7）。日与周同时受限时按 cron 惯例取并集。
+
+本模块不访问数据库，由 worker.py 调用。
+"""
+import random
+from datetime import timedelta
+
+_FIELDS = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+
+
+def _parse_field(text, low, high):
+    values = set()
+    for part in text.split(','):
+        step = 1
+        if '/' in part:
+            part, step_text = part.split('/')
+            step = int(step_text)
+        if part == '*':
+            start, end = low, high
+        elif '-' in part:
+            start, end = (int(x) for x in part.split('-'))
+        else:
+            start = int(part)
+            end = high if step > 1 else start
+        if not (low <= start <= end <= high) or step < 1:
+            raise ValueError(f"cron 字段超出范围：{text}")
+        values.update(range(start, end + 1, step))
+    return values
+
+
+class CronSchedule:
+    def __init__(self, expr):
+        parts = expr.split()
+        if len(parts) != 5:
+            raise ValueError(f"cron 表达式应为 5 段：{expr}")
+        self.expr = expr
+        self.minutes, self.hours, self.days, self.months, weekdays = (
+            _parse_field(text, low, high) for text, (low, high) in zip(parts, _FIELDS)
+        )
+        self.weekdays = {d % 7 for d in weekdays}
+        self._any_day = parts[2] == '*'
+        self._any_weekday = parts[4] == '*'
+
+    def _day_matches(self, dt):
+        day_ok = dt.day in self.days
+        weekday_ok = (dt.weekday() + 1) % 7 in self.weekdays  # Python 周一为 0，cron 周日为 0
+        if self._any_day or self._any_weekday:
+            return day_ok and weekday_ok
+        return day_ok or weekday_ok
+
+    def next_after(self, dt):
+        """严格晚于 dt 的下一个触发时刻（精确到分钟）"""
+        t = dt.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = t + timedelta(days=366 * 5)
+        while t < limit:
+            if t.month not in self.months:
+                t = (t.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+            elif not self._day_matches(t):
+                t = t.replace(hour=0, minute=0) + timedelta(days=1)
+            elif t.hour not in self.hours:
+                t = t.replace(minute=0) + timedelta(hours=1)
+            elif t.minute not in self.minutes:
+                t += timedelta(minutes=1)
+            else:
+                return t
+        raise ValueError(f"cron 表达式永远不会触发：{self.expr}")
+
+
+def backoff_seconds(attempt, base=10, cap=3600):
+    """第 attempt 次失败后的重试等待：指数增长并加随机抖动，避免大量任务同时重试"""
+    delay = min(cap, base * 2 ** (attempt - 1))
+    return delay * random.uniform(0.5, 1.0)
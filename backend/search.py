@@ -0,0 +1,184 @@
+"""
+活动全文检索
+
+索引活动的 标题 / 描述 / 地点 / 负责人 四个字段：
+  - SQLite：FTS5 虚拟表 event_search（rowid = 活动ID），按 bm25 排序
+  - Postgres：event_search 表中的 tsvector 列 + GIN 索引，按 ts_rank 排序
+
+中文没有空格分词，这里在写入前统一切成二元组 (bigram)：“图书馆整理” 索引为
+“图书 书馆 馆整 整理 理”（末尾单字用于单字前缀查询）；英文与数字按单词小写。
+查询时同样切分，连续的中文按短语匹配（等价于子串匹配），英文单词按前缀匹配。
+
+本模块只执行 SQL，不依赖 models.py 中的模型；写入时机由 rules.index_event() 的调用方负责。
+"""
+import re
+
+from sqlalchemy import text
+
+_TOKEN_RE = re.compile(r'[\u3400-\u9fff\uf900-\ufaff]+|[a-z0-9]+')
+_CJK_RE = re.compile(r'[\u3400-\u9fff\uf900-\ufaff]')
+
+
+def _is_cjk(run):
+    return bool(_CJK_RE.match(run))
+
+
+def tokenize(value):
+    """把一段文本切分为以空格分隔的索引词"""
+    tokens = []
+    for run in _TOKEN_RE.findall((value or "").lower()):
+        if _is_cjk(run):
+            tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+            tokens.append(run[-1])
+        else:
+            tokens.append(run)
+    return " ".join(tokens)
+
+
+def query_terms(q):
+    """
+    把查询串拆成检索条件 [(词列表, 是否前缀)]：
+    连续中文 → 二元组短语；单个汉字或英文单词 → 前缀
+    """
+    terms = []
+    for run in _TOKEN_RE.findall((q or "").lower()):
+        if _is_cjk(run) and len(run) > 1:
+            terms.append(([run[i:i + 2] for i in range(len(run) - 1)], False))
+        else:
+            terms.append(([run], True))
+    return terms
+
+
+class SQLiteEventIndex:
+    """字段权重：标题 10，地点 3，负责人 2，描述 1"""
+
+    def __init__(self):
+        self.ready = False
+
+    def ensure(self, session):
+        """
+        首次使用时建立 FTS5 表；表是新建的则用现有活动填充并提交事务，
+        因此应在本次请求写入任何数据之前调用
+        """
+        if self.ready:
+            return
+        exists = session.execute(text(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'event_search'"
+        )).first()
+        if not exists:
+            session.execute(text(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS event_search "
+                "USING fts5(title, description, location, leader_name, tokenize = 'unicode61')"
+            ))
+            self.rebuild(session)
+            session.commit()
+        self.ready = True
+
+    def rebuild(self, session):
+        session.execute(text("DELETE FROM event_search"))
+        rows = session.execute(text(
+            "SELECT id, title, description, location, leader_name FROM events"
+        )).all()
+        for row in rows:
+            self.upsert(session, row.id, row.title, row.description, row.location, row.leader_name)
+
+    def upsert(self, session, event_id, title, description, location, leader_name):
+        session.execute(text("DELETE FROM event_search WHERE rowid = :id"), {"id": event_id})
+        session.execute(text(
+            "INSERT INTO event_search (rowid, title, description, location, leader_name) "
+            "VALUES (:id, :title, :description, :location, :leader_name)"
+        ), {
+            "id": event_id,
+            "title": tokenize(title),
+            "description": tokenize(description),
+            "location": tokenize(location),
+            "leader_name": tokenize(leader_name)
+        })
+
+    def delete(self, session, event_ids):
+        for event_id in event_ids:
+            session.execute(text("DELETE FROM event_search WHERE rowid = :id"), {"id": event_id})
+
+    @staticmethod
+    def _match(terms):
+        parts = []
+        for words, prefix in terms:
+            phrase = '"' + " ".join(words) + '"'
+            parts.append(phrase + "*" if prefix else phrase)
+        return " AND ".join(parts)
+
+    def search(self, session, q, limit, offset):
+        """返回 (按相关度排序的活动ID, 命中总数)"""
+        terms = query_terms(q)
+        if not terms:
+            return [], 0
+        match = self._match(terms)
+        total = session.execute(
+            text("SELECT count(*) FROM event_search WHERE event_search MATCH :q"), {"q": match}
+        ).scalar()
+        ids = session.execute(text(
+            "SELECT rowid FROM event_search WHERE event_search MATCH :q "
+            "ORDER BY bm25(event_search, 10.0, 1.0, 3.0, 2.0), rowid DESC LIMIT :limit OFFSET :offset"
+        ), {"q": match, "limit": limit, "offset": offset}).scalars().all()
+        return ids, total
+
+
+class PostgresEventIndex(SQLiteEventIndex):
+    WEIGHTS = {"title": "A", "location": "B", "leader_name": "C", "description": "D"}
+
+    def ensure(self, session):
+        if self.ready:
+            return
+        exists = session.execute(text("SELECT to_regclass('event_search')")).scalar()
+        if not exists:
+            session.execute(text(
+                "CREATE TABLE IF NOT EXISTS event_search ("
+                "event_id INTEGER PRIMARY KEY, document TSVECTOR NOT NULL)"
+            ))
+            session.execute(text(
+                "CREATE INDEX IF NOT EXISTS ix_event_search_document ON event_search USING GIN (document)"
+            ))
+            self.rebuild(session)
+            session.commit()
+        self.ready = True
+
+    def upsert(self, session, event_id, title, description, location, leader_name):
+        values = {"title": title, "description": description, "location": location, "leader_name": leader_name}
+        document = " || ".join(
+            f"setweight(to_tsvector('simple', :{name}), '{weight}')" for name, weight in self.WEIGHTS.items()
+        )
+        session.execute(text(
+            f"INSERT INTO event_search (event_id, document) VALUES (:id, {document}) "
+            "ON CONFLICT (event_id) DO UPDATE SET document = EXCLUDED.document"
+        ), {"id": event_id, **{name: tokenize(value) for name, value in values.items()}})
+
+    def delete(self, session, event_ids):
+        if event_ids:
+            session.execute(text("DELETE FROM event_search WHERE event_id = ANY(:ids)"), {"ids": list(event_ids)})
+
+    @staticmethod
+    def _match(terms):
+        parts = []
+        for words, prefix in terms:
+            phrase = " <-> ".join("'" + w + "'" for w in words)
+            parts.append(phrase + ":*" if prefix else f"({phrase})")
+        return " & ".join(parts)
+
+    def search(self, session, q, limit, offset):
+        terms = query_terms(q)
+        if not terms:
+            return [], 0
+        match = self._match(terms)
+        total = session.execute(text(
+            "SELECT count(*) FROM event_search WHERE document @@ to_tsquery('simple', :q)"
+        ), {"q": match}).scalar()
+        ids = session.execute(text(
+            "SELECT event_id FROM event_search WHERE document @@ to_tsquery('simple', :q) "
+            "ORDER BY ts_rank(document, to_tsquery('simple', :q)) DESC, event_id DESC "
+            "LIMIT :limit OFFSET :offset"
+        ), {"q": match, "limit": limit, "offset": offset}).scalars().all()
+        return ids, total
+
+
+def create_event_index(database_url):
+    return PostgresEventIndex() if database_url.startswith('postgresql') else SQLiteEventIndex()
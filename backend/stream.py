@@ -0,0 +1,144 @@
+"""
+容量变化推送（Server-Sent Events）
+
+报名成功后发布一条占用人数变化消息，/api/stream/capacity 的所有订阅者实时收到，
+前端无需反复轮询活动详情和岗位列表。
+
+- LocalBroker：进程内广播，单 worker 部署使用
+- RedisBroker：配置 CACHE_URL 后通过 Redis 发布/订阅跨 worker 广播
+  （Redis / Valkey 或本地的 cache_server.py 均可）；订阅断开后自动重连，
+  并结束本 worker 的所有推送连接，浏览器重连时重新拿到快照，不会漏掉断开期间的变化
+
+每个 SSE 连接只是一个阻塞在队列上的生成器，建议用协程 worker 部署，
+上千个空闲连接只占用少量内存：
+    gunicorn -k gevent -w 2 --worker-connections 2000 app:app
+"""
+import json
+import os
+import queue
+import threading
+import time
+
+CHANNEL = "volunteer:capacity"
+HEARTBEAT_SECONDS = 15
+SUBSCRIBER_QUEUE_SIZE = 256
+RECONNECT_MAX_SECONDS = 30
+
+# 订阅中断期间的消息已经丢失：通知各连接结束，浏览器的 EventSource 重连后重新拿到快照
+RESYNC = {"type": "resync"}
+
+
+class LocalBroker:
+    """把消息分发给本进程内的所有订阅队列"""
+
+    def __init__(self):
+        self._subscribers = set()
+        self._lock = threading.Lock()
+
+    def subscribe(self):
+        q = queue.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        with self._lock:
+            self._subscribers.add(q)
+        return q
+
+    def unsubscribe(self, q):
+        with self._lock:
+            self._subscribers.discard(q)
+
+    def publish(self, message):
+        self._dispatch(message)
+
+    def _dispatch(self, message):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for q in subscribers:
+            try:
+                q.put_nowait(message)
+            except queue.Full:
+                # 客户端读得太慢：丢弃消息，它会在重连时拿到新的快照
+                pass
+
+
+class RedisBroker(LocalBroker):
+    """发布走 Redis 频道；每个 worker 起一个后台线程订阅频道再分发给本地连接"""
+
+    def __init__(self, url, channel=CHANNEL):
+        super().__init__()
+        import redis  # 可选依赖，仅在配置了 CACHE_URL 时需要
+
+        self.client = redis.Redis.from_url(url)
+        self.channel = channel
+        self._listener = None
+
+    def subscribe(self):
+        if self._listener is None:
+            with self._lock:
+                if self._listener is None:
+                    self._listener = threading.Thread(target=self._listen, daemon=True)
+                    self._listener.start()
+        return super().subscribe()
+
+    def publish(self, message):
+        self.client.publish(self.channel, json.dumps(message))
+
+    def _listen(self):
+        """
+        Redis 重启、空闲超时等导致订阅断开时按指数退避重新订阅，线程本身不退出；
+        重新订阅成功后广播 RESYNC，让本 worker 的连接重连并重新获取快照
+        """
+        delay, resubscribing = 1, False
+        while True:
+            pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+            try:
+                pubsub.subscribe(self.channel)
+                if resubscribing:
+                    self._dispatch(RESYNC)
+                delay, resubscribing = 1, True
+                for item in pubsub.listen():
+                    self._dispatch(json.loads(item["data"]))
+            except Exception as e:
+                print(f"容量推送订阅断开，{delay}s 后重连：{e!r}")
+            finally:
+                pubsub.close()
+            resubscribing = True
+            time.sleep(delay)
+            delay = min(delay * 2, RECONNECT_MAX_SECONDS)
+
+
+def create_broker(url=None, channel=CHANNEL):
+    url = url if url is not None else os.environ.get("CACHE_URL")
+    if url:
+        return RedisBroker(url, channel)
+    return LocalBroker()
+
+
+def format_sse(data, event=None):
+    """编码为一条 SSE 消息"""
+    lines = []
+    if event:
+        lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data, ensure_ascii=False)}")
+    return "\n".join(lines) + "\n\n"
+
+
+def event_stream(broker, snapshot, accept):
+    """
+    SSE 生成器：先发送当前快照，再持续转发 accept(message) 为真的变化消息。
+    长时间没有消息时发送注释行作为心跳，防止代理断开空闲连接。
+    """
+    q = broker.subscribe()
+    try:
+        yield "retry: 3000\n\n"
+        yield format_sse(snapshot, event="snapshot")
+        while True:
+            try:
+                message = q.get(timeout=HEARTBEAT_SECONDS)
+            except queue.Empty:
+                yield ": keep-alive\n\n"
+                continue
+            if message == RESYNC:
+                return  # 结束本次响应，客户端按 retry 间隔重连
+            if accept(message):
+                yield format_sse(message, event="capacity")
+    finally:
+        broker.unsubscribe(q)
@@ -0,0 +1,241 @@
+"""
+多校区部署：一个部署同时服务多所学校，每所学校使用独立的数据库
+
+    TENANTS=school-a,school-b                             # 允许的学校标识；未配置时为单校部署，行为与之前相同
+    TENANT_DATABASE_URL=postgresql://db/volunteer_{tenant} # 每所学校的连接串模板（默认 tenants/<学校>.db）
+    TENANT_HEADER=X-Tenant                                # 请求头中的学校标识
+    TENANT_DOMAIN=volunteer.example.com                   # 可选：school-a.volunteer.example.com 识别为 school-a
+    TENANT_DEFAULT=school-a                               # 可选：请求中没有学校标识时使用
+    TENANT_IDLE_SECONDS=600                               # 学校的连接池空闲多久后关闭
+    TENANT_POOL_SIZE=5  TENANT_MAX_OVERFLOW=5             # 每所学校的连接数上限
+
+每个请求先确定学校（请求头优先，其次 ?tenant= 参数、子域名），之后的所有查询都发往该校的数据库：
+RoutingSession.get_bind 把主库和归档库的查询换成该校的引擎（多校区部署不使用只读副本）。
+手机号、轮值周等唯一约束因此只在校内生效，各校的数据量互不影响。
+
+隔离：
+  - 每所学校的引擎（连接池）第一次访问时才创建，空闲超过 TENANT_IDLE_SECONDS 后关闭；
+    连接池各自限额，一所学校的报名高峰占满的是自己的连接
+  - 缓存、容量广播、报名等候室与限流、全文索引按学校分别创建（见 extensions.service），
+    一所学校的排队不会让另一所学校的请求等待，缓存失效也只影响本校
+  - asgi.py 的异步快速通道只连接单库，多校区部署时所有请求交给 Flask 处理
+
+脚本与 worker 通过 --tenant 指定学校（worker 每所学校各启动一组进程）：
+    python init_db.py --tenant school-a
+    python worker.py --tenant school-a
+"""
+import contextlib
+import os
+import re
+import threading
+import time
+from contextvars import ContextVar
+
+from flask import current_app, g, jsonify, request
+from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+
+_current = ContextVar("tenant", default=None)
+_NAME_RE = re.compile(r"^[a-z0-9][a-z0-9-]{0,39}$")
+EVICT_CHECK_SECONDS = 60
+
+
+def current_tenant():
+    """当前请求 / 脚本所属的学校；单校部署时为 None"""
+    return _current.get()
+
+
+class _TenantEngine:
+    __slots__ = ("engine", "active", "last_used")
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.active = 0
+        self.last_used = time.monotonic()
+
+
+class TenantEngines:
+    """每所学校一个引擎：按需创建，没有进行中的请求且空闲超时后关闭连接池"""
+
+    def __init__(self, tenants, url_template, idle_seconds, pool_size, max_overflow, engine_options=None):
+        self.tenants = frozenset(tenants)
+        self.url_template = url_template
+        self.idle_seconds = idle_seconds
+        self.pool_size = pool_size
+        self.max_overflow = max_overflow
+        self.engine_options = dict(engine_options or {})
+        self._engines = {}
+        self._lock = threading.Lock()
+        self._checked_at = time.monotonic()
+
+    def url(self, tenant):
+        return self.url_template.format(tenant=tenant)
+
+    def _create(self, tenant):
+        url = make_url(self.url(tenant))
+        options = dict(self.engine_options)
+        if url.get_backend_name() == "sqlite":
+            if url.database and url.database != ":memory:":
+                os.makedirs(os.path.dirname(os.path.abspath(url.database)), exist_ok=True)
+        else:
+            options.update(pool_size=self.pool_size, max_overflow=self.max_overflow, pool_pre_ping=True)
+        return create_engine(url, **options)
+
+    def engine(self, tenant):
+        entry = self._engines.get(tenant)
+        if entry is None:
+            with self._lock:
+                entry = self._engines.get(tenant)
+                if entry is None:
+                    entry = self._engines[tenant] = _TenantEngine(self._create(tenant))
+        return entry.engine
+
+    def acquire(self, tenant):
+        self.engine(tenant)
+        with self._lock:
+            entry = self._engines[tenant]
+            entry.active += 1
+            entry.last_used = time.monotonic()
+        self._evict_idle()
+
+    def release(self, tenant):
+        with self._lock:
+            entry = self._engines.get(tenant)
+            if entry is not None:
+                entry.active -= 1
+                entry.last_used = time.monotonic()
+
+    def _evict_idle(self):
+        now = time.monotonic()
+        if now - self._checked_at < EVICT_CHECK_SECONDS:
+            return
+        with self._lock:
+            self._checked_at = now
+            idle = [tenant for tenant, entry in self._engines.items()
+                    if entry.active == 0 and now - entry.last_used > self.idle_seconds]
+            evicted = [self._engines.pop(tenant).engine for tenant in idle]
+        for engine in evicted:
+            engine.dispose()
+
+    def loaded(self):
+        """当前已创建引擎的学校及其进行中的请求数"""
+        with self._lock:
+            return {tenant: entry.active for tenant, entry in self._engines.items()}
+
+    def dispose(self):
+        with self._lock:
+            engines = [entry.engine for entry in self._engines.values()]
+            self._engines.clear()
+        for engine in engines:
+            engine.dispose()
+
+
+def _registry():
+    return current_app.extensions.get("tenancy")
+
+
+def routed_engine(db, engine):
+    """RoutingSession.get_bind 调用：当前有学校时，把主库 / 归档库的引擎换成该校的引擎"""
+    tenant = _current.get()
+    if tenant is None:
+        return None
+    engines = db.engines
+    if engine is engines.get(None) or engine is engines.get("archive"):
+        return _registry().engine(tenant)
+    return None
+
+
+def engine_for(bind_key=None):
+    """脚本中直接操作引擎（建索引、备份）时使用：当前学校的引擎，单校部署时为对应 bind 的引擎"""
+    from extensions import db
+    tenant = _current.get()
+    if tenant is None:
+        return db.engines[bind_key]
+    return _registry().engine(tenant)
+
+
+def create_all():
+    """建表；多校区部署时在当前学校的数据库中建立全部表（包括归档表）"""
+    from extensions import db
+    tenant = _current.get()
+    if tenant is None:
+        db.create_all()
+        return
+    engine = _registry().engine(tenant)
+    for metadata in db.metadatas.values():
+        metadata.create_all(engine)
+
+
+@contextlib.contextmanager
+def using_tenant(tenant):
+    """在应用上下文中切换到某所学校（tenant 为 None 时什么也不做）；需要在新的会话中使用，退出时关闭会话"""
+    if tenant is None:
+        yield
+        return
+    from extensions import db
+    registry = _registry()
+    if registry is None:
+        raise ValueError("未配置 TENANTS，不是多校区部署")
+    if tenant not in registry.tenants:
+        raise ValueError(f"未知的学校：{tenant}")
+    registry.acquire(tenant)
+    token = _current.set(tenant)
+    try:
+        yield
+    finally:
+        db.session.remove()  # 在切回之前关闭会话，回滚 / 归还连接仍针对该校的引擎
+        _current.reset(token)
+        registry.release(tenant)
+
+
+def tenant_from_request(config):
+    """请求头优先，其次 ?tenant= 参数（EventSource 无法设置请求头）、子域名，最后 TENANT_DEFAULT"""
+    tenant = request.headers.get(config["TENANT_HEADER"]) or request.args.get("tenant")
+    domain = config["TENANT_DOMAIN"]
+    if not tenant and domain:
+        host = request.host.split(":", 1)[0].lower()
+        if host.endswith("." + domain):
+            tenant = host[:-len(domain) - 1]
+    return (tenant or config["TENANT_DEFAULT"] or "").strip().lower() or None
+
+
+def init_tenancy(app):
+    """
+    未配置 TENANTS 时什么也不做。应在其他注册 before_request 的扩展之前调用，
+    保证它们的查询（如剖析钩子的管理员校验）已经发往该校的数据库
+    """
+    config = app.config
+    if not config["TENANTS"]:
+        return
+    invalid = [t for t in config["TENANTS"] if not _NAME_RE.match(t)]
+    if invalid:
+        raise ValueError(f"学校标识只能包含小写字母、数字和 -：{', '.join(invalid)}")
+    registry = app.extensions["tenancy"] = TenantEngines(
+        config["TENANTS"], config["TENANT_DATABASE_URL"], config["TENANT_IDLE_SECONDS"],
+        config["TENANT_POOL_SIZE"], config["TENANT_MAX_OVERFLOW"], config.get("SQLALCHEMY_ENGINE_OPTIONS"),
+    )
+
+    @app.before_request
+    def enter_tenant():
+        if request.method == "OPTIONS":
+            return None  # CORS 预检不带自定义请求头
+        tenant = tenant_from_request(config)
+        if tenant is None:
+            return jsonify({"message": "缺少学校标识"}), 400
+        if tenant not in registry.tenants:
+            return jsonify({"message": "学校不存在"}), 404
+        registry.acquire(tenant)
+        g.tenant = tenant
+        g.tenant_token = _current.set(tenant)
+        return None
+
+    @app.teardown_request
+    def leave_tenant(exc):
+        token = g.pop("tenant_token", None)
+        if token is not None:
+            # Flask-SQLAlchemy 在应用上下文结束时才关闭会话，那时学校已经切回；这里先关闭，
+            # 保证回滚和归还连接发生在该校的引擎上
+            from extensions import db
+            db.session.remove()
+            _current.reset(token)
+            registry.release(g.pop("tenant"))
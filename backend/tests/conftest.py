@@ -0,0 +1,9 @@
+"""
+后端单元测试：在 backend 目录下运行 python -m pytest -q
+
+后端模块按脚本方式互相导入（from models import ...），这里把 backend 目录加入 sys.path。
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,155 @@
+from datetime import date, datetime, time, timedelta
+
+import pytest
+
+from app import create_app
+from archive import archive_events, archive_shift_signups
+from extensions import db, event_index
+from models import (
+    ArchivedEvent, ArchivedEventSignup, ArchivedHours, ArchivedShiftSignup,
+    Event, EventSignup, HourRollup, RecurringShift, ShiftSignup, Student,
+)
+from rules import hours_by_student, rebuild_hour_rollups, set_event_grades
+
+CUTOFF = date.today()
+PAST = CUTOFF - timedelta(days=10)
+
+
+@pytest.fixture
+def session():
+    app = create_app({
+        "SQLALCHEMY_DATABASE_URI": "sqlite://",
+        "SQLALCHEMY_BINDS": {"archive": "sqlite://"},
+        "TENANTS": [],
+    }, blueprints=False)
+    with app.app_context():
+        db.create_all()
+        event_index.ensure(db.session)
+        yield db.session
+        db.session.remove()
+
+
+@pytest.fixture
+def student(session):
+    student = Student(name="张三", phone="1", password="p", enrollment_year=2024, class_number=3)
+    session.add(student)
+    session.commit()
+    return student
+
+
+@pytest.fixture
+def shift(session):
+    shift = RecurringShift(name="食堂志愿", day_of_week=PAST.isoweekday(), start_time=time(11, 50),
+                           end_time=time(12, 30), hours_value=0.5)
+    session.add(shift)
+    session.commit()
+    return shift
+
+
+def add_event(session, hours=2.0):
+    start = datetime.combine(PAST, time(14, 0))
+    event = Event(title="图书馆整理", start_time=start, end_time=start + timedelta(hours=2),
+                  registration_deadline=start - timedelta(days=1), required_volunteers=3, hours_value=hours)
+    set_event_grades(event)
+    session.add(event)
+    session.commit()
+    return event
+
+
+def add_shift_signup(session, student, shift, status="pending", day=PAST, **kwargs):
+    signup = ShiftSignup(student_id=student.id, shift_id=shift.id, date=day, status=status, **kwargs)
+    session.add(signup)
+    session.commit()
+    return signup
+
+
+def totals(session, student):
+    return student._compute_total_hours(), hours_by_student(session, [student.id]).get(student.id, 0.0)
+
+
+def archive_all(session, cutoff=CUTOFF):
+    archive_events(session, cutoff)
+    archive_shift_signups(session, cutoff)
+
+
+def test_cancelled_shift_signups_never_count(session, student, shift):
+    add_shift_signup(session, student, shift)
+    add_shift_signup(session, student, shift, status="cancelled", day=PAST - timedelta(days=7))
+    assert totals(session, student) == (0.5, 0.5)
+
+    archive_all(session)
+    assert session.query(ShiftSignup).count() == 0
+    assert session.query(ArchivedShiftSignup).count() == 2  # 已取消的报名也保留记录
+    assert totals(session, student) == (0.5, 0.5)
+    assert session.get(ArchivedHours, student.id).shift_count == 1
+    history = {item["status"] for item in student.get_history()}
+    assert history == {"已完成", "已取消"}
+
+
+def test_archiving_keeps_total_hours(session, student, shift):
+    event = add_event(session)
+    session.add(EventSignup(student_id=student.id, event_id=event.id))
+    session.commit()
+    add_shift_signup(session, student, shift)
+    before = totals(session, student)
+    assert before == (2.5, 2.5)
+
+    archive_all(session)
+    assert session.query(Event).count() == 0
+    assert totals(session, student) == before
+
+
+def test_rerun_after_archive_rows_were_written(session, student, shift):
+    # 模拟上次运行在写入归档库之后、删除热数据之前中断
+    event = add_event(session)
+    event_id = event.id
+    event_signup = EventSignup(student_id=student.id, event_id=event.id)
+    session.add(event_signup)
+    shift_signup = add_shift_signup(session, student, shift)
+    archived_event = ArchivedEvent(source_id=event.id, archived_through=CUTOFF, title=event.title,
+                                   start_time=event.start_time, end_time=event.end_time, hours_value=2.0)
+    session.add(archived_event)
+    session.flush()
+    session.add(ArchivedEventSignup(source_id=event_signup.id, archived_through=CUTOFF,
+                                    student_id=student.id, event_id=archived_event.id))
+    session.add(ArchivedShiftSignup(source_id=shift_signup.id, archived_through=CUTOFF, student_id=student.id,
+                                    shift_id=shift.id, shift_name=shift.name, day_of_week=shift.day_of_week,
+                                    hours_value=0.5, date=PAST, status="pending"))
+    session.commit()
+
+    archive_all(session)
+    assert session.query(ArchivedEvent).count() == 1
+    assert session.query(ArchivedEventSignup).one().event_id == archived_event.id
+    assert session.query(ArchivedShiftSignup).count() == 1
+    assert totals(session, student) == (2.5, 2.5)
+    assert [item["id"] for item in student.get_history() if item["type"] == "event"] == [event_id]
+
+
+def test_reused_source_id_under_a_later_cutoff(session, student, shift):
+    # 例如从旧备份恢复后，新的报名拿到了已归档报名的 id
+    signup = add_shift_signup(session, student, shift)
+    reused_id = signup.id
+    archive_all(session, CUTOFF - timedelta(days=5))
+    add_shift_signup(session, student, shift, id=reused_id)
+
+    archive_all(session)
+    rows = session.query(ArchivedShiftSignup).order_by(ArchivedShiftSignup.archived_through).all()
+    assert [(row.source_id, row.archived_through) for row in rows] == [
+        (reused_id, CUTOFF - timedelta(days=5)), (reused_id, CUTOFF)
+    ]
+    assert totals(session, student) == (1.0, 1.0)
+
+
+def test_rollups_agree_with_student_totals(session, student, shift):
+    # 班级统计与排行榜、学生列表使用同一规则：已取消的岗位报名不计时长
+    event = add_event(session)
+    session.add(EventSignup(student_id=student.id, event_id=event.id))
+    add_shift_signup(session, student, shift, day=PAST - timedelta(days=7))
+    add_shift_signup(session, student, shift, status="cancelled", day=PAST - timedelta(days=14))
+    archive_all(session, PAST)
+    add_shift_signup(session, student, shift)
+    add_shift_signup(session, student, shift, status="cancelled", day=PAST + timedelta(days=7))
+
+    rebuild_hour_rollups(session)
+    rollup_hours = session.query(db.func.sum(HourRollup.event_hours + HourRollup.shift_hours)).scalar()
+    assert rollup_hours == hours_by_student(session)[student.id] == 3.0
@@ -0,0 +1,89 @@
+from datetime import date, time
+
+from autofill import Candidate, Slot, assign_week
+
+MON = date(2026, 3, 2)
+TUE = date(2026, 3, 3)
+
+
+def slot(shift_id, day, start, end, seats=1, hours=0.5):
+    return Slot(shift_id, day, time(*start), time(*end), hours, seats)
+
+
+def assigned(assignments):
+    return [(student_id, s.shift_id, s.date) for student_id, s in assignments]
+
+
+def test_fewest_hours_first():
+    slots = [slot(1, MON, (7, 35), (7, 55))]
+    candidates = [Candidate(1, 5.0), Candidate(2, 1.0), Candidate(3, 3.0)]
+    assignments, unfilled = assign_week(slots, candidates)
+    assert assigned(assignments) == [(2, 1, MON)]
+    assert unfilled == []
+
+
+def test_ties_broken_by_week_count_then_student_id():
+    slots = [slot(1, MON, (7, 35), (7, 55), seats=2)]
+    candidates = [Candidate(3, 1.0), Candidate(2, 1.0, week_count=1), Candidate(1, 1.0)]
+    assignments, _ = assign_week(slots, candidates)
+    assert [student_id for student_id, _ in assignments] == [1, 3]
+
+
+def test_assigned_hours_count_towards_later_slots():
+    slots = [slot(1, MON, (7, 35), (7, 55), hours=1.0), slot(2, TUE, (7, 35), (7, 55), hours=1.0)]
+    candidates = [Candidate(1, 0.0), Candidate(2, 0.5)]
+    assignments, _ = assign_week(slots, candidates)
+    # 1 号排第一个岗位后时长变为 1.0，第二个岗位轮到 2 号
+    assert assigned(assignments) == [(1, 1, MON), (2, 2, TUE)]
+
+
+def test_weekly_limit_includes_existing_signups():
+    slots = [slot(1, MON, (7, 35), (7, 55)), slot(2, TUE, (7, 35), (7, 55))]
+    candidates = [Candidate(1, 0.0, week_count=1)]
+    assignments, unfilled = assign_week(slots, candidates, weekly_limit=2)
+    assert assigned(assignments) == [(1, 1, MON)]
+    assert [(s.shift_id, missing) for s, missing in unfilled] == [(2, 1)]
+
+
+def test_candidate_at_limit_is_never_assigned():
+    slots = [slot(1, MON, (7, 35), (7, 55))]
+    assignments, unfilled = assign_week(slots, [Candidate(1, 0.0, week_count=2)], weekly_limit=2)
+    assert assignments == []
+    assert unfilled[0][1] == 1
+
+
+def test_overlapping_slots_go_to_different_students():
+    slots = [slot(1, MON, (11, 40), (12, 0)), slot(2, MON, (11, 50), (12, 10))]
+    candidates = [Candidate(1, 0.0), Candidate(2, 10.0)]
+    assignments, _ = assign_week(slots, candidates)
+    assert assigned(assignments) == [(1, 1, MON), (2, 2, MON)]
+
+
+def test_adjacent_slots_do_not_conflict():
+    slots = [slot(1, MON, (11, 40), (12, 0)), slot(2, MON, (12, 0), (12, 20))]
+    assignments, _ = assign_week(slots, [Candidate(1, 0.0), Candidate(2, 10.0)])
+    assert assigned(assignments) == [(1, 1, MON), (1, 2, MON)]
+
+
+def test_existing_busy_time_and_taken_slot_are_respected():
+    slots = [slot(1, MON, (7, 35), (7, 55)), slot(2, TUE, (11, 40), (12, 0))]
+    busy = Candidate(1, 0.0, busy=[(TUE, time(11, 30), time(12, 30))], taken={(1, MON)})
+    assignments, unfilled = assign_week(slots, [busy])
+    assert assignments == []
+    assert [missing for _, missing in unfilled] == [1, 1]
+
+
+def test_skipped_candidates_stay_available_for_later_slots():
+    slots = [slot(1, MON, (11, 40), (12, 0)), slot(2, MON, (11, 45), (12, 5)), slot(3, TUE, (7, 35), (7, 55))]
+    candidates = [Candidate(1, 0.0), Candidate(2, 1.0)]
+    assignments, unfilled = assign_week(slots, candidates, weekly_limit=2)
+    # 2 号排进岗位 2；岗位 3 时 1 号（时长 0.5）仍排在 2 号（1.5）之前
+    assert assigned(assignments) == [(1, 1, MON), (2, 2, MON), (1, 3, TUE)]
+    assert unfilled == []
+
+
+def test_unfilled_seats_are_reported():
+    slots = [slot(1, MON, (7, 35), (7, 55), seats=3)]
+    assignments, unfilled = assign_week(slots, [Candidate(1, 0.0)])
+    assert len(assignments) == 1
+    assert [(s.shift_id, missing) for s, missing in unfilled] == [(1, 2)]
@@ -0,0 +1,176 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+import changelog
+from app import create_app
+from extensions import db
+from models import ChangeLog, Event, EventSignup, Student
+from rules import set_event_grades
+
+
+@pytest.fixture
+def session():
+    app = create_app({
+        "SQLALCHEMY_DATABASE_URI": "sqlite://",
+        "SQLALCHEMY_BINDS": {"archive": "sqlite://"},
+        "TENANTS": [],
+    }, blueprints=False)
+    with app.app_context():
+        db.create_all()
+        yield db.session
+        db.session.remove()
+
+
+def add_event(session, title="图书馆整理"):
+    start = datetime.now() + timedelta(days=2)
+    event = Event(title=title, start_time=start, end_time=start + timedelta(hours=2),
+                  registration_deadline=start - timedelta(days=1), location="图书馆", required_volunteers=3)
+    set_event_grades(event)
+    session.add(event)
+    session.commit()
+    return event
+
+
+def add_student(session, phone):
+    student = Student(name=phone, phone=phone, password="p", enrollment_year=2024, class_number=1)
+    session.add(student)
+    session.commit()
+    return student
+
+
+def settle(session, through_id=None):
+    """把日志（through_id 及之前的）移到 SETTLE 窗口之外"""
+    old = datetime.now() - changelog.SETTLE - timedelta(seconds=1)
+    query = session.query(ChangeLog)
+    if through_id is not None:
+        query = query.filter(ChangeLog.id <= through_id)
+    query.update({ChangeLog.created_at: old})
+    session.commit()
+
+
+def latest_log_id(session):
+    return session.query(db.func.max(ChangeLog.id)).scalar()
+
+
+def upserted_ids(result, collection="events"):
+    return [record["id"] for record in result[collection]["upserted"]]
+
+
+def test_snapshot_of_empty_database(session):
+    result = changelog.snapshot(session)
+    assert result["cursor"] == 0 and result["reset"] is True and result["hasMore"] is False
+    assert result["events"] == {"upserted": [], "deleted": []}
+
+
+def test_zero_cursor_without_logs_is_valid(session):
+    result = changelog.changes_since(session, 0)
+    assert result["reset"] is False and result["cursor"] == 0
+
+
+def test_unsettled_changes_are_returned_but_cursor_does_not_move(session):
+    event = add_event(session)
+    result = changelog.changes_since(session, 0)
+    assert upserted_ids(result) == [event.id]
+    assert result["cursor"] == 0 and result["hasMore"] is False
+
+
+def test_settled_changes_advance_cursor(session):
+    event = add_event(session)
+    settle(session)
+    result = changelog.changes_since(session, 0)
+    assert upserted_ids(result) == [event.id]
+    assert result["cursor"] == latest_log_id(session)
+
+    again = changelog.changes_since(session, result["cursor"])
+    assert upserted_ids(again) == [] and again["cursor"] == result["cursor"]
+
+
+def test_cursor_stops_before_first_unsettled_log(session):
+    first = add_event(session, "一")
+    first_log = latest_log_id(session)
+    second = add_event(session, "二")
+    settle(session, through_id=first_log)
+
+    result = changelog.changes_since(session, 0)
+    assert sorted(upserted_ids(result)) == [first.id, second.id]
+    assert result["cursor"] == first_log and result["hasMore"] is False
+
+
+def test_snapshot_cursor_only_covers_settled_logs(session):
+    add_event(session, "一")
+    first_log = latest_log_id(session)
+    add_event(session, "二")
+    settle(session, through_id=first_log)
+    result = changelog.snapshot(session)
+    assert result["cursor"] == first_log and len(result["events"]["upserted"]) == 2
+
+
+def test_paging_stops_exactly_at_page_boundary(session):
+    events = [add_event(session, str(i)) for i in range(3)]
+    settle(session)
+    logs = [log.id for log in session.query(ChangeLog).order_by(ChangeLog.id)]
+
+    page = changelog.changes_since(session, 0, page_size=2)
+    assert page["hasMore"] is True and page["cursor"] == logs[1]
+    assert upserted_ids(page) == [events[0].id, events[1].id]
+
+    rest = changelog.changes_since(session, page["cursor"], page_size=2)
+    assert rest["hasMore"] is False and rest["cursor"] == logs[2]
+    assert upserted_ids(rest) == [events[2].id]
+
+
+def test_latest_operation_wins_and_deleted_records_are_reported(session):
+    event = add_event(session)
+    settle(session)
+    cursor = changelog.changes_since(session, 0)["cursor"]
+
+    event.title = "改名"
+    session.commit()
+    session.delete(event)
+    session.commit()
+    result = changelog.changes_since(session, cursor)
+    assert result["events"] == {"upserted": [], "deleted": [event.id]}
+
+
+def test_other_students_signups_are_hidden_but_skipped_by_cursor(session):
+    event = add_event(session)
+    me, other = add_student(session, "1"), add_student(session, "2")
+    settle(session)
+    cursor = changelog.changes_since(session, 0, student_id=me.id)["cursor"]
+
+    signup = EventSignup(student_id=other.id, event_id=event.id)
+    session.add(signup)
+    session.commit()
+    settle(session)
+
+    result = changelog.changes_since(session, cursor, student_id=me.id)
+    assert result["eventSignups"] == {"upserted": [], "deleted": []}
+    assert upserted_ids(result) == [event.id]  # 报名人数变化，活动本身仍会同步
+    assert result["cursor"] == latest_log_id(session)
+
+    theirs = changelog.changes_since(session, cursor, student_id=other.id)
+    assert upserted_ids(theirs, "eventSignups") == [signup.id]
+
+
+def test_cursor_beyond_latest_log_resets(session):
+    add_event(session)
+    settle(session)
+    result = changelog.changes_since(session, latest_log_id(session) + 1)
+    assert result["reset"] is True
+
+
+def test_cursor_older_than_retained_logs_resets(session):
+    for i in range(3):
+        add_event(session, str(i))
+    settle(session)
+    logs = [log.id for log in session.query(ChangeLog).order_by(ChangeLog.id)]
+
+    purged = changelog.purge_before(session, datetime.now())
+    session.commit()
+    assert purged == 2
+    assert [log.id for log in session.query(ChangeLog)] == [logs[-1]]  # 总是保留最新一行
+
+    # 只有紧邻最旧日志之前的游标仍然有效
+    assert changelog.changes_since(session, logs[-1] - 1)["reset"] is False
+    assert changelog.changes_since(session, logs[0])["reset"] is True
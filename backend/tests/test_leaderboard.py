@@ -0,0 +1,83 @@
+from leaderboard import Leaderboard, RankIndex
+
+
+def index_of(hours_by_student):
+    index = RankIndex()
+    for student_id, hours in hours_by_student.items():
+        index.set(student_id, hours)
+    return index
+
+
+def test_ties_share_rank_and_skip_following_ranks():
+    index = index_of({1: 5.0, 2: 3.0, 3: 3.0, 4: 1.0})
+    assert [index.rank(s) for s in (1, 2, 3, 4)] == [1, 2, 2, 4]
+    assert index.top(4) == [(1, 1, 5.0), (2, 2, 3.0), (2, 3, 3.0), (4, 4, 1.0)]
+
+
+def test_all_tied():
+    index = index_of({3: 0.0, 1: 0.0, 2: 0.0})
+    assert [index.rank(s) for s in (1, 2, 3)] == [1, 1, 1]
+    # 并列时按学生 ID 排序
+    assert [student_id for _, student_id, _ in index.top(3)] == [1, 2, 3]
+
+
+def test_top_cut_inside_a_tie_keeps_shared_rank():
+    index = index_of({1: 5.0, 2: 3.0, 3: 3.0, 4: 3.0})
+    assert index.top(3) == [(1, 1, 5.0), (2, 2, 3.0), (2, 3, 3.0)]
+    assert index.top(0) == []
+    assert len(index.top(10)) == 4
+
+
+def test_update_removes_the_old_position():
+    index = index_of({1: 5.0, 2: 3.0, 3: 1.0})
+    index.set(3, 6.0)
+    assert len(index) == 3
+    assert [student_id for _, student_id, _ in index.top(3)] == [3, 1, 2]
+    assert index.rank(3) == 1 and index.rank(1) == 2
+    assert index.hours(3) == 6.0
+
+
+def test_update_out_of_and_into_a_tie():
+    index = index_of({1: 3.0, 2: 3.0, 3: 1.0})
+    index.set(1, 0.5)
+    assert [index.rank(s) for s in (2, 3, 1)] == [1, 2, 3]
+    index.set(3, 3.0)
+    assert [index.rank(s) for s in (2, 3, 1)] == [1, 1, 3]
+    assert len(index) == 3
+
+
+def test_setting_same_hours_twice_does_not_duplicate():
+    index = index_of({1: 2.0})
+    index.set(1, 2.0)
+    assert len(index) == 1
+    assert index.top(5) == [(1, 1, 2.0)]
+
+
+def test_unknown_student():
+    index = index_of({1: 2.0})
+    assert index.rank(99) is None
+    assert index.hours(99) is None
+
+
+def test_leaderboard_scopes():
+    board = Leaderboard()
+    board.add(1, "甲", 2024, 1, 4.0)
+    board.add(2, "乙", 2024, 2, 6.0)
+    board.add(3, "丙", 2023, 1, 5.0)
+    assert board.rank(("all",), 1) == 3
+    assert board.rank(("grade", 2024), 1) == 2
+    assert board.rank(("class", 2024, 1), 1) == 1
+    assert board.size(("grade", 2024)) == 2
+
+    board.update(1, 7.0)
+    assert board.rank(("all",), 1) == 1
+    assert board.top(("grade", 2024), 1) == [(1, 1, 7.0)]
+    assert board.hours(1) == 7.0
+
+
+def test_leaderboard_ignores_unknown_students_and_scopes():
+    board = Leaderboard()
+    board.update(42, 1.0)
+    assert board.size(("all",)) == 0
+    assert board.top(("class", 2024, 9), 10) == []
+    assert board.rank(("grade", 2030), 1) is None
@@ -0,0 +1,50 @@
+import shutil
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import create_app
+from extensions import db
+from models import Event, Student
+from replica import STICKY_HEADER
+from rules import set_event_grades
+
+
+@pytest.fixture
+def client(tmp_path):
+    primary, replica = tmp_path / "primary.db", tmp_path / "replica.db"
+    app = create_app({
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{primary}",
+        "SQLALCHEMY_BINDS": {"archive": "sqlite://", "replica": f"sqlite:///{replica}"},
+        "TENANTS": [],
+    })
+    with app.app_context():
+        db.create_all()
+        start = datetime.now() + timedelta(days=2)
+        event = Event(title="图书馆整理", start_time=start, end_time=start + timedelta(hours=2),
+                      registration_deadline=start - timedelta(days=1), required_volunteers=3)
+        set_event_grades(event)
+        db.session.add_all([event, Student(name="张三", phone="1", password="p",
+                                           enrollment_year=2024, class_number=3)])
+        db.session.commit()
+        db.session.remove()
+    shutil.copy(primary, replica)  # 副本停留在此刻，之后的写入不会复制过去
+    # 前端与接口不同源，请求不带 Cookie
+    return app.test_client(use_cookies=False)
+
+
+def volunteers(response):
+    return response.get_json()[0]["currentVolunteers"]
+
+
+def test_get_after_post_reads_primary(client):
+    response = client.post("/api/events/1/signup", json={"studentId": 1})
+    assert response.status_code == 201
+    seconds = response.headers[STICKY_HEADER]
+    assert int(seconds) > 0 and STICKY_HEADER in response.headers["Access-Control-Expose-Headers"]
+
+    # 其他客户端读副本，它的结果会写入响应缓存
+    assert volunteers(client.get("/api/events")) == 0
+    # 刚报名的客户端带上请求头：读主库，也不读缓存中副本的结果
+    assert volunteers(client.get("/api/events", headers={STICKY_HEADER: "1"})) == 1
+
@@ -0,0 +1,103 @@
+from datetime import datetime
+
+import pytest
+
+from schedule import CronSchedule, backoff_seconds
+
+
+def runs(expr, start, count):
+    schedule = CronSchedule(expr)
+    result, t = [], start
+    for _ in range(count):
+        t = schedule.next_after(t)
+        result.append(t)
+    return result
+
+
+def test_strictly_after_and_truncates_seconds():
+    schedule = CronSchedule("*/15 * * * *")
+    assert schedule.next_after(datetime(2026, 1, 1, 10, 14, 59)) == datetime(2026, 1, 1, 10, 15)
+    assert schedule.next_after(datetime(2026, 1, 1, 10, 15)) == datetime(2026, 1, 1, 10, 30)
+    assert schedule.next_after(datetime(2026, 1, 1, 10, 15, 0, 1)) == datetime(2026, 1, 1, 10, 30)
+
+
+def test_step_from_a_start_value():
+    assert runs("5/20 * * * *", datetime(2026, 1, 1, 10, 46), 3) == [
+        datetime(2026, 1, 1, 11, 5), datetime(2026, 1, 1, 11, 25), datetime(2026, 1, 1, 11, 45),
+    ]
+
+
+def test_ranges_and_lists():
+    schedule = CronSchedule("0,30 8-9 * * 1-5")
+    assert schedule.hours == {8, 9}
+    assert schedule.minutes == {0, 30}
+    # 2026-01-02 为周五，下一次为下周一
+    assert runs("0,30 8-9 * * 1-5", datetime(2026, 1, 2, 9, 30), 2) == [
+        datetime(2026, 1, 5, 8, 0), datetime(2026, 1, 5, 8, 30),
+    ]
+
+
+def test_day_of_month_and_day_of_week_union():
+    # 日与周同时受限：每月 13 日或每周五都触发（2026-01-01 为周四）
+    assert runs("0 9 13 * 5", datetime(2026, 1, 1), 4) == [
+        datetime(2026, 1, 2, 9), datetime(2026, 1, 9, 9), datetime(2026, 1, 13, 9), datetime(2026, 1, 16, 9),
+    ]
+
+
+def test_only_day_of_month_restricted():
+    assert runs("0 9 13 * *", datetime(2026, 1, 1), 2) == [datetime(2026, 1, 13, 9), datetime(2026, 2, 13, 9)]
+
+
+def test_only_day_of_week_restricted():
+    assert runs("0 9 * * 5", datetime(2026, 1, 1), 2) == [datetime(2026, 1, 2, 9), datetime(2026, 1, 9, 9)]
+
+
+def test_sunday_is_0_or_7():
+    assert CronSchedule("0 0 * * 7").weekdays == {0}
+    assert CronSchedule("0 0 * * 0").next_after(datetime(2026, 1, 1)) == datetime(2026, 1, 4)
+    assert CronSchedule("0 0 * * 7").next_after(datetime(2026, 1, 1)) == datetime(2026, 1, 4)
+
+
+def test_month_rollover_skips_short_months():
+    # 2 月没有 31 日，从 1 月 31 日之后直接跳到 3 月 31 日
+    assert CronSchedule("30 2 31 * *").next_after(datetime(2026, 1, 31, 3)) == datetime(2026, 3, 31, 2, 30)
+
+
+def test_restricted_month_rolls_over_from_month_end():
+    assert CronSchedule("0 0 * 3 *").next_after(datetime(2026, 1, 31, 23, 30)) == datetime(2026, 3, 1)
+
+
+def test_year_rollover():
+    assert CronSchedule("0 0 1 1 *").next_after(datetime(2026, 6, 1)) == datetime(2027, 1, 1)
+    assert CronSchedule("59 23 31 12 *").next_after(datetime(2026, 12, 31, 23, 59)) == datetime(2027, 12, 31, 23, 59)
+
+
+def test_leap_day():
+    assert CronSchedule("0 0 29 2 *").next_after(datetime(2026, 3, 1)) == datetime(2028, 2, 29)
+
+
+def test_never_firing_expression_raises():
+    with pytest.raises(ValueError):
+        CronSchedule("0 0 30 2 *").next_after(datetime(2026, 1, 1))
+
+
+@pytest.mark.parametrize("expr", [
+    "* * * *",           # 段数不对
+    "60 * * * *",        # 分钟超出范围
+    "* 24 * * *",
+    "* * 0 * *",
+    "* * * 13 *",
+    "* * * * 8",
+    "5-1 * * * *",       # 区间颠倒
+    "*/0 * * * *",       # 步长为 0
+])
+def test_invalid_expressions(expr):
+    with pytest.raises(ValueError):
+        CronSchedule(expr)
+
+
+def test_backoff_grows_and_is_capped():
+    for attempt, full in [(1, 10), (2, 20), (4, 80)]:
+        delay = backoff_seconds(attempt, base=10, cap=3600)
+        assert full * 0.5 <= delay <= full
+    assert backoff_seconds(20, base=10, cap=3600) <= 3600
@@ -0,0 +1,78 @@
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+from search import SQLiteEventIndex, query_terms, tokenize
+
+
+def test_tokenize_cjk_bigrams_with_trailing_char():
+    assert tokenize("图书馆整理") == "图书 书馆 馆整 整理 理"
+
+
+def test_tokenize_single_cjk_char():
+    assert tokenize("书") == "书"
+
+
+def test_tokenize_mixed_cjk_and_ascii():
+    # 中英文、数字相邻时各自成段，英文统一小写，标点丢弃
+    assert tokenize("Python编程社团2024, 图书馆!") == "python 编程 程社 社团 团 2024 图书 书馆 馆"
+
+
+def test_tokenize_ascii_words_and_digits():
+    assert tokenize("Room 3B-101") == "room 3b 101"
+
+
+@pytest.mark.parametrize("value", [None, "", "，。！ ", "---"])
+def test_tokenize_empty(value):
+    assert tokenize(value) == ""
+
+
+def test_query_terms_phrase_and_prefix():
+    assert query_terms("图书馆 ABC 书") == [
+        (["图书", "书馆"], False),  # 连续中文：二元组短语
+        (["abc"], True),           # 英文单词：前缀
+        (["书"], True),            # 单个汉字：前缀
+    ]
+
+
+def test_query_terms_mixed_run_splits_at_script_boundary():
+    assert query_terms("社团2024") == [(["社团"], False), (["2024"], True)]
+
+
+def test_query_terms_empty():
+    assert query_terms("  ，") == []
+    assert query_terms(None) == []
+
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite://")
+    with Session(engine) as session:
+        session.execute(text(
+            "CREATE TABLE events (id INTEGER PRIMARY KEY, title TEXT, description TEXT, "
+            "location TEXT, leader_name TEXT)"
+        ))
+        session.execute(text("INSERT INTO events VALUES (1, '图书馆整理', '整理书架', '图书馆', '李老师')"))
+        session.execute(text("INSERT INTO events VALUES (2, 'Python编程社团', '社团招新', '机房 301', '王老师')"))
+        session.execute(text("INSERT INTO events VALUES (3, '校园清洁', '打扫图书馆门口', '操场', '张老师')"))
+        session.commit()
+        yield session
+
+
+def test_sqlite_index_substring_and_prefix_search(session):
+    index = SQLiteEventIndex()
+    index.ensure(session)
+    assert index.search(session, "书馆", 10, 0) == ([1, 3], 2)   # 标题命中排在描述命中之前
+    assert index.search(session, "pyth", 10, 0) == ([2], 1)
+    assert index.search(session, "社团 301", 10, 0) == ([2], 1)
+    assert index.search(session, "馆书", 10, 0) == ([], 0)       # 短语按顺序匹配
+    assert index.search(session, "，", 10, 0) == ([], 0)
+
+
+def test_sqlite_index_upsert_and_delete(session):
+    index = SQLiteEventIndex()
+    index.ensure(session)
+    index.upsert(session, 3, "操场清洁", None, "操场", None)
+    assert index.search(session, "图书馆", 10, 0) == ([1], 1)
+    index.delete(session, [1])
+    assert index.search(session, "图书馆", 10, 0) == ([], 0)
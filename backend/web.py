@@ -0,0 +1,205 @@
+"""
+视图公用的 HTTP 工具：响应缓存、报名准入控制、幂等键、管理员鉴权
+"""
+import hashlib
+import math
+import time
+from datetime import datetime
+from functools import wraps
+
+from flask import current_app, jsonify, make_response, request
+
+import idempotency
+from extensions import db, cache, signup_room, signup_limiter
+from models import Student
+from replica import sticky_to_primary, used_replica
+
+# ==========================================
+# HTTP 缓存：公共只读接口的 ETag / Last-Modified
+# ==========================================
+
+# 缓存键带上标签令牌；写操作调用 cache.invalidate(标签) 后，所有 worker 上的旧条目同时失效
+def response_cache_key(path, args, tags, ttl=None):
+    """响应缓存键：路径 + 排序后的查询参数 + 时间片 + 标签令牌（asgi.py 也使用同一规则）"""
+    bucket = int(time.time() // ttl) if ttl else ""
+    query = "&".join(f"{k}={v}" for k, v in sorted(args))
+    key, _ = cache.tagged_key(f"resp:{path}?{query}#{bucket}", tags)
+    return key
+
+def response_etag(key):
+    return hashlib.sha1(key.encode()).hexdigest()
+
+def cached_response(tags=(), ttl=None, private=False):
+    """
+    公共只读接口的响应缓存装饰器。
+    - 缓存键 = 路由路径 + 查询参数 + 各标签的当前令牌
+    - tags: 标签元组，或根据视图参数返回标签的函数
+    - ttl: 结果依赖当前时间的接口（如活动状态）按 ttl 秒切分时间片，时间片变化后重新计算
+    - private: 只属于某个学生的内容（如日程订阅），不允许共享代理缓存
+    - 客户端带 If-None-Match / If-Modified-Since 且未变化时直接返回 304
+    """
+    def decorator(f):
+        @wraps(f)
+        def wrapper(*args, **kwargs):
+            tag_list = tags(**kwargs) if callable(tags) else tags
+            key = response_cache_key(request.path, request.args.items(multi=True), tag_list, ttl)
+
+            # 刚写入过数据的客户端不读缓存：缓存中可能是别的请求从落后的副本读出的结果
+            cached = None if sticky_to_primary(db.session) else cache.get(key)
+            if cached is None:
+                rv = make_response(f(*args, **kwargs))
+                if rv.status_code != 200:
+                    return rv
+                cached = (rv.get_data(), rv.mimetype, datetime.now().replace(microsecond=0))
+                store_ttl = ttl
+                if used_replica(db.session):
+                    # 副本可能落后于主库：缓存时间不超过写后读主库的时长
+                    sticky_seconds = current_app.config["DATABASE_READ_STICKY_SECONDS"]
+                    store_ttl = min(ttl, sticky_seconds) if ttl else sticky_seconds
+                cache.set(key, cached, store_ttl)
+
+            body, mimetype, generated_at = cached
+            response = current_app.response_class(body, mimetype=mimetype)
+            response.set_etag(response_etag(key))
+            response.last_modified = generated_at
+            # 允许缓存但每次使用前必须回源校验（只比较请求头，命中时返回 304）
+            if private:
+                response.cache_control.private = True
+            else:
+                response.cache_control.public = True
+            response.cache_control.no_cache = True
+            return response.make_conditional(request)
+        return wrapper
+    return decorator
+
+# ==========================================
+# 报名准入控制（虚拟等候室 + 按学生限流）
+# ==========================================
+
+def admit_signup(client_key, ticket=None):
+    """
+    报名请求进入业务逻辑前的准入判断（Flask 与 asgi.py 共用）
+    返回 (admission, None)：已放行，处理完毕后必须调用 admission.release()
+    返回 (None, (body, headers))：应立即返回 429
+    """
+    # 持有效排队号的重试不再消耗令牌，否则排队中的客户端会被自己的重试限流
+    client_key = str(client_key)
+    if ticket is None or not signup_room.holds(ticket, client_key):
+        wait = signup_limiter.consume(client_key)
+        if wait:
+            retry_after = math.ceil(wait)
+            return None, (
+                {"message": "操作过于频繁，请稍后再试", "retryAfter": retry_after},
+                {"Retry-After": str(retry_after)}
+            )
+
+    admission = signup_room.try_enter(client_key, ticket)
+    if admission.admitted:
+        return admission, None
+    if admission.ticket is None:
+        message = "当前报名人数过多，请稍后再试"
+    else:
+        message = f"报名人数较多，正在排队（第{admission.position}位）"
+    return None, (
+        {
+            "message": message,
+            "queued": admission.ticket is not None,
+            "ticket": admission.ticket,
+            "position": admission.position,
+            "retryAfter": admission.retry_after
+        },
+        {"Retry-After": str(admission.retry_after)}
+    )
+
+def admission_controlled(f):
+    """报名接口装饰器：排队号通过请求头 X-Queue-Ticket 传回"""
+    @wraps(f)
+    def wrapper(*args, **kwargs):
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            data = {}  # 请求体不合法时由视图返回 400
+        client_key = data.get('studentId') or request.remote_addr
+        ticket = request.headers.get('X-Queue-Ticket')
+        admission, rejection = admit_signup(client_key, ticket)
+        if rejection:
+            body, headers = rejection
+            return jsonify(body), 429, headers
+        try:
+            return f(*args, **kwargs)
+        finally:
+            admission.release()
+    return wrapper
+
+# ==========================================
+# 幂等键 (Idempotency-Key，见 idempotency.py)
+# ==========================================
+
+def idempotent(f):
+    """
+    写接口装饰器：带 Idempotency-Key 请求头的重复请求直接重放第一次的响应（响应头 Idempotent-Replayed: true），
+    第一次请求仍在执行时立即返回 409 + Retry-After，不占用线程和连接等待（asgi.py 相同）。
+    不带该请求头的请求照常执行。
+    放在 admission_controlled 之上，重试不占用排队名额和限流令牌
+    """
+    @wraps(f)
+    def wrapper(*args, **kwargs):
+        key = request.headers.get(idempotency.HEADER)
+        if not key or request.method in ('GET', 'HEAD', 'OPTIONS'):
+            return f(*args, **kwargs)
+        if len(key) > idempotency.MAX_KEY_LENGTH:
+            return jsonify({"message": "Idempotency-Key 过长"}), 400
+
+        request_fingerprint = idempotency.fingerprint(request.method, request.path, request.get_data())
+        ttl = current_app.config['IDEMPOTENCY_TTL_SECONDS']
+        state, record = idempotency.claim(db.session, key, request_fingerprint, ttl)
+
+        if state == "mismatch":
+            return jsonify({"message": "该 Idempotency-Key 已用于其他请求"}), 422
+        if state == "processing":
+            return jsonify({"message": "相同的请求正在处理中，请稍后重试"}), 409, {"Retry-After": "1"}
+        if state == "done":
+            response = current_app.response_class(
+                record.response_body, status=record.response_status, content_type=record.content_type
+            )
+            response.headers['Idempotent-Replayed'] = 'true'
+            return response
+
+        try:
+            response = make_response(f(*args, **kwargs))
+        except Exception:
+            idempotency.release(db.session, key)
+            raise
+        if idempotency.should_store(response.status_code):
+            idempotency.complete(db.session, key, response.status_code, response.get_data(), response.content_type)
+        else:
+            idempotency.release(db.session, key)
+        return response
+    return wrapper
+
+# ==========================================
+# 管理员鉴权
+# ==========================================
+
+def admin_required(f):
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        # 检查请求头中的 X-Admin-Token (即手机号)
+        token = request.headers.get('X-Admin-Token')
+        if not token:
+            return jsonify({"message": "未授权访问"}), 401
+        
+        # 查找该手机号对应的学生，并检查是否为管理员
+        admin_student = Student.query.filter_by(phone=token).first()
+        if not admin_student or not admin_student.is_admin:
+             return jsonify({"message": "无效的管理权限"}), 403
+             
+        return f(*args, **kwargs)
+    return decorated_function
+
+def current_admin():
+    """请求头 X-Admin-Token 对应的管理员；未带令牌或不是管理员时返回 None"""
+    token = request.headers.get('X-Admin-Token')
+    if not token:
+        return None
+    student = Student.query.filter_by(phone=token).first()
+    return student if student and student.is_admin else None
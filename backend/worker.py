@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+后台任务 worker
+
+    python worker.py          # 常驻运行，可以同时启动多个进程
+    python worker.py --once   # 执行完当前到期的任务后退出（适合由系统 cron 调用）
+    python worker.py --tenant school-a   # 多校区部署：处理某所学校的任务（jobs 表在各校的库中）
+
+任务由 models.enqueue_job() 写入 jobs 表，这里按 run_at 先后领取执行：
+  - 领取用带状态条件的 UPDATE 完成，多个 worker 不会重复执行同一任务
+  - 任务抛出异常后按指数退避重新排队，超过 max_attempts 次标记为 failed
+  - running 超过 JOB_TIMEOUT 的任务视为 worker 已崩溃，重新排队
+  - PERIODIC_JOBS 中的周期任务由各 worker 按 unique_key 去重写入下一次执行记录
+
+收到 SIGTERM / Ctrl+C 时执行完当前任务再退出。
+"""
+import argparse
+import os
+import signal
+import socket
+import time
+import traceback
+from datetime import date, datetime, timedelta
+
+from flask import current_app
+from sqlalchemy.exc import IntegrityError
+
+import changelog
+import idempotency
+from app import create_app
+from extensions import db, cache
+from models import Event, EventSignup, Job, ShiftSignup, Student, enqueue_job
+from rules import hours_by_student, rebuild_hour_rollups
+from schedule import CronSchedule, backoff_seconds
+from tenancy import create_all, using_tenant
+
+POLL_SECONDS = 1.0
+JOB_TIMEOUT = timedelta(minutes=10)
+
+TASKS = {}
+
+
+def task(name):
+    """注册任务：函数签名为 fn(session, **args)，返回值（需可 JSON 序列化）存入 Job.result"""
+    def decorator(fn):
+        TASKS[name] = fn
+        return fn
+    return decorator
+
+
+# 周期任务：(任务名, cron 表达式)
+PERIODIC_JOBS = [
+    ("complete_shift_signups", "5 0 * * *"),
+    ("refresh_ended_events", "*/5 * * * *"),
+    ("purge_idempotency_keys", "20 * * * *"),
+    ("purge_change_log", "40 3 * * *"),
+]
+
+
+# ==========================================
+# 任务
+# ==========================================
+
+@task("complete_shift_signups")
+def complete_shift_signups(session):
+    """日期已过的岗位报名由 pending 标记为 completed"""
+    rows = session.query(ShiftSignup.id, ShiftSignup.student_id)\
+        .filter(ShiftSignup.date < date.today(), ShiftSignup.status == 'pending').all()
+    if rows:
+        session.query(ShiftSignup).filter(ShiftSignup.id.in_([signup_id for signup_id, _ in rows]))\
+            .update({"status": "completed"}, synchronize_session=False)
+        changelog.record(session, ShiftSignup, rows, "upsert")
+    session.commit()
+    return {"completed": len(rows)}
+
+
+@task("refresh_ended_events")
+def refresh_ended_events(session, window_minutes=10):
+    """刚结束的活动：立即失效参与学生的时长缓存，不必等缓存过期"""
+    now = datetime.now()
+    student_ids = {sid for (sid,) in session.query(EventSignup.student_id)
+                   .join(Event, Event.id == EventSignup.event_id)
+                   .filter(Event.end_time > now - timedelta(minutes=window_minutes), Event.end_time <= now)}
+    if student_ids:
+        cache.invalidate("events", *(f"student:{sid}" for sid in student_ids))
+    return {"students": len(student_ids)}
+
+
+@task("students_report")
+def students_report(session):
+    """管理员学生统计报表：字段同 /api/admin/students，但不含个人历史，时长批量计算"""
+    hours = hours_by_student(session)
+    rows = [{
+        "id": s.id,
+        "name": s.name,
+        "phone": s.phone,
+        "enrollmentYear": s.enrollment_year,
+        "classNumber": s.class_number,
+        "fullClassName": s.full_class_name,
+        "qq": s.qq,
+        "wechat": s.wechat,
+        "totalHours": hours.get(s.id, 0.0),
+        "isAdmin": s.is_admin
+    } for s in session.query(Student)]
+    rows.sort(key=lambda r: r["totalHours"], reverse=True)
+    return rows
+
+
+@task("purge_idempotency_keys")
+def purge_idempotency_keys(session):
+    """清理过期的幂等键记录"""
+    count = idempotency.purge_expired(session)
+    session.commit()
+    return {"purged": count}
+
+
+@task("purge_change_log")
+def purge_change_log(session):
+    """清理超过保留期的变更日志"""
+    cutoff = datetime.now() - timedelta(days=current_app.config["CHANGELOG_RETENTION_DAYS"])
+    count = changelog.purge_before(session, cutoff)
+    session.commit()
+    return {"purged": count}
+
+
+@task("rebuild_hour_rollups")
+def rebuild_hour_rollups_task(session):
+    """重新计算班级 / 年级时长汇总表（岗位时长修改、岗位删除后由管理员接口触发）"""
+    rows = rebuild_hour_rollups(session)
+    session.commit()
+    return {"rows": rows}
+
+
+# ==========================================
+# 调度与执行
+# ==========================================
+
+SCHEDULES = {name: CronSchedule(expr) for name, expr in PERIODIC_JOBS}
+
+
+def schedule_periodic(session, now):
+    """保证每个周期任务的下一次执行记录已入队"""
+    for name, schedule in SCHEDULES.items():
+        run_at = schedule.next_after(now)
+        key = f"cron:{name}:{run_at:%Y-%m-%dT%H:%M}"
+        if session.query(Job.id).filter_by(unique_key=key).first():
+            continue
+        enqueue_job(session, name, run_at=run_at, max_attempts=1, unique_key=key)
+        try:
+            session.commit()
+        except IntegrityError:
+            session.rollback()  # 其他 worker 已写入
+
+
+def requeue_stale(session):
+    cutoff = datetime.now() - JOB_TIMEOUT
+    stale = session.query(Job).filter(Job.status == 'running', Job.started_at < cutoff)
+    stale.filter(Job.attempts >= Job.max_attempts).update(
+        {"status": "failed", "last_error": "执行超时", "finished_at": datetime.now()}, synchronize_session=False
+    )
+    stale.update({"status": "queued", "locked_by": None}, synchronize_session=False)
+    session.commit()
+
+
+def claim_next(session, worker_id):
+    now = datetime.now()
+    candidates = session.query(Job.id)\
+        .filter(Job.status == 'queued', Job.run_at <= now)\
+        .order_by(Job.run_at, Job.id).limit(5).all()
+    for (job_id,) in candidates:
+        claimed = session.query(Job).filter(Job.id == job_id, Job.status == 'queued').update({
+            "status": "running",
+            "locked_by": worker_id,
+            "started_at": now,
+            "attempts": Job.attempts + 1
+        }, synchronize_session=False)
+        session.commit()
+        if claimed:
+            return session.get(Job, job_id)
+    return None
+
+
+def run_job(session, job):
+    fn = TASKS.get(job.name)
+    job_id, name, args = job.id, job.name, dict(job.args or {})
+    try:
+        if fn is None:
+            raise LookupError(f"未注册的任务：{name}")
+        result = fn(session, **args)
+    except Exception:
+        session.rollback()
+        job = session.get(Job, job_id)
+        job.last_error = traceback.format_exc(limit=5)
+        if fn is not None and job.attempts < job.max_attempts:
+            job.status = 'queued'
+            job.run_at = datetime.now() + timedelta(seconds=backoff_seconds(job.attempts))
+        else:
+            job.status = 'failed'
+            job.finished_at = datetime.now()
+        session.commit()
+        print(f"[{datetime.now():%H:%M:%S}] 任务 {job_id} {name} 失败 ({job.attempts}/{job.max_attempts})")
+        return False
+
+    job = session.get(Job, job_id)
+    job.status = 'done'
+    job.result = result
+    job.finished_at = datetime.now()
+    session.commit()
+    print(f"[{datetime.now():%H:%M:%S}] 任务 {job_id} {name} 完成")
+    return True
+
+
+def work(once=False):
+    worker_id = f"{socket.gethostname()}:{os.getpid()}"
+    stopping = []
+    if not once:
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(sig, lambda *_: stopping.append(True))
+
+    session = db.session
+    last_minute = None
+    while not stopping:
+        now = datetime.now()
+        if now.replace(second=0, microsecond=0) != last_minute:
+            last_minute = now.replace(second=0, microsecond=0)
+            schedule_periodic(session, now)
+            requeue_stale(session)
+        job = claim_next(session, worker_id)
+        if job:
+            run_job(session, job)
+            continue
+        if once:
+            return
+        time.sleep(POLL_SECONDS)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--once", action="store_true", help="执行完当前到期的任务后退出")
+    parser.add_argument("--tenant", help="多校区部署时处理哪所学校的任务（每所学校各启动一组 worker）")
+    args = parser.parse_args()
+    app = create_app(blueprints=False)
+    if app.config["TENANTS"] and not args.tenant:
+        parser.error("多校区部署需要用 --tenant 指定学校")
+    with app.app_context(), using_tenant(args.tenant):
+        create_all()  # 首次部署时创建 jobs 表
+        work(once=args.once)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,8 +7,14 @@ const apiClient = axios.create({
   },
 });
 
+// 多校区部署：构建时用 VITE_TENANT 指定学校（也可以改用子域名区分，无需设置）
+export const TENANT = import.meta.env.VITE_TENANT || '';
+
 // Add a request interceptor
 apiClient.interceptors.request.use(config => {
+  if (TENANT) {
+    config.headers['X-Tenant'] = TENANT;
+  }
   const user = JSON.parse(localStorage.getItem('user'));
   if (user && user.isAdmin) {
     // 使用管理员的手机号作为 Token
@@ -19,4 +25,70 @@ apiClient.interceptors.request.use(config => {
   return Promise.reject(error);
 });
 
+// 写请求带上幂等键：超时或断网后重试沿用同一个键，服务端直接返回第一次的结果，不会重复报名
+const newIdempotencyKey = () => (
+  window.crypto && window.crypto.randomUUID
+    ? window.crypto.randomUUID()
+    : `${Date.now().toString(36)}-${Math.random().toString(36).slice(2)}`
+);
+
+apiClient.interceptors.request.use(config => {
+  if (config.method === 'post' && !config.headers['Idempotency-Key']) {
+    config.headers['Idempotency-Key'] = newIdempotencyKey();
+  }
+  return config;
+});
+
+// 读写分离：写请求的响应带 X-Read-Primary（秒数），这段时间内的读请求带上同名请求头，继续读主库，
+// 报名后立即刷新的列表不会读到落后的副本（跨域请求不带 Cookie，因此由前端自己记住时限）
+let readPrimaryUntil = 0;
+const rememberReadPrimary = response => {
+  const seconds = response && Number(response.headers['x-read-primary']);
+  if (seconds) {
+    readPrimaryUntil = Date.now() + seconds * 1000;
+  }
+};
+
+apiClient.interceptors.request.use(config => {
+  if (config.method === 'get' && Date.now() < readPrimaryUntil) {
+    config.headers['X-Read-Primary'] = '1';
+  }
+  return config;
+});
+
+// 报名排队：服务端返回 429 和排队号时，按建议的等待时间自动带号重试
+apiClient.interceptors.response.use(response => {
+  rememberReadPrimary(response);
+  return response;
+}, async error => {
+  const { config, response } = error;
+  rememberReadPrimary(response);
+  if (response && response.status === 429 && response.data && response.data.ticket) {
+    const delay = (response.data.retryAfter || 1) * 1000;
+    await new Promise(resolve => setTimeout(resolve, delay));
+    config.headers['X-Queue-Ticket'] = response.data.ticket;
+    return apiClient(config);
+  }
+  // 没有收到响应（超时、断网）：带幂等键的请求可以安全地重试
+  if (!response && config && config.headers['Idempotency-Key'] && (config.retryCount || 0) < 2) {
+    config.retryCount = (config.retryCount || 0) + 1;
+    await new Promise(resolve => setTimeout(resolve, 1000 * config.retryCount));
+    return apiClient(config);
+  }
+  // 同一幂等键的第一次请求仍在处理（409 + Retry-After）：稍后重试即可拿到它的结果
+  if (response && response.status === 409 && response.headers['retry-after']
+      && config.headers['Idempotency-Key'] && (config.retryCount || 0) < 5) {
+    config.retryCount = (config.retryCount || 0) + 1;
+    await new Promise(resolve => setTimeout(resolve, Number(response.headers['retry-after']) * 1000));
+    return apiClient(config);
+  }
+  return Promise.reject(error);
+});
+
+// 日程订阅地址（calendarToken 在登录时返回）；日历应用无法设置请求头，学校标识放在查询参数中
+export const calendarFeedUrl = (studentId, token) => {
+  const params = new URLSearchParams(TENANT ? { token, tenant: TENANT } : { token });
+  return `${apiClient.defaults.baseURL}/students/${studentId}/calendar.ics?${params}`;
+};
+
 export default apiClient;
\ No newline at end of file
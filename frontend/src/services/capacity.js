@@ -0,0 +1,15 @@
+import apiClient, { TENANT } from './api';
+
+// 订阅报名人数实时推送（SSE）
+// params: { date: 'YYYY-MM-DD' } 或 { event: 活动ID }
+// 返回关闭连接的函数，组件卸载或订阅条件变化时调用
+export function subscribeCapacity(params, { onSnapshot, onChange }) {
+  // EventSource 无法设置请求头，学校标识放在查询参数中
+  const query = new URLSearchParams(TENANT ? { ...params, tenant: TENANT } : params).toString();
+  const source = new EventSource(`${apiClient.defaults.baseURL}/stream/capacity?${query}`);
+
+  source.addEventListener('snapshot', (e) => onSnapshot && onSnapshot(JSON.parse(e.data)));
+  source.addEventListener('capacity', (e) => onChange && onChange(JSON.parse(e.data)));
+
+  return () => source.close();
+}
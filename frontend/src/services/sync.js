@@ -0,0 +1,68 @@
+import apiClient from './api';
+
+// 增量同步（GET /api/sync）：本地保存活动、岗位、轮值和本人报名的副本，
+// 每次只下载上次游标之后变化的记录，合并后写回 localStorage
+const STORAGE_KEY = 'syncState';
+const COLLECTIONS = ['events', 'shifts', 'rotations', 'eventSignups', 'shiftSignups'];
+
+const emptyState = (studentId) => {
+  const state = { cursor: null, studentId };
+  COLLECTIONS.forEach(name => { state[name] = {}; });
+  return state;
+};
+
+const loadState = (studentId) => {
+  const state = JSON.parse(localStorage.getItem(STORAGE_KEY));
+  // 换了登录学生时本人报名不同，从全量快照重新开始
+  return state && state.studentId === studentId ? state : emptyState(studentId);
+};
+
+const applyChanges = (state, data) => {
+  if (data.reset) {
+    COLLECTIONS.forEach(name => { state[name] = {}; });
+  }
+  COLLECTIONS.forEach(name => {
+    data[name].upserted.forEach(record => { state[name][record.id] = record; });
+    data[name].deleted.forEach(id => { delete state[name][id]; });
+  });
+  state.cursor = data.cursor;
+};
+
+// 返回 { events: [...], shifts: [...], ... }（未排序）
+export async function syncData(studentId = null) {
+  const state = loadState(studentId);
+  let hasMore = true;
+  while (hasMore) {
+    const params = {};
+    if (state.cursor !== null) params.since = state.cursor;
+    if (studentId !== null) params.studentId = studentId;
+    const response = await apiClient.get('/sync', { params });
+    applyChanges(state, response.data);
+    hasMore = response.data.hasMore;
+  }
+  localStorage.setItem(STORAGE_KEY, JSON.stringify(state));
+
+  const result = {};
+  COLLECTIONS.forEach(name => { result[name] = Object.values(state[name]); });
+  return result;
+}
+
+// 活动状态随时间变化，本地副本按当前时间重新计算（与服务端 Event.status 的规则一致）
+export function eventStatus(event, now = new Date()) {
+  if (now > new Date(event.endTime)) return '已结束';
+  if (now > new Date(event.startTime)) return '进行中';
+  if (event.currentVolunteers >= event.requiredVolunteers) return '已满员';
+  if (now > new Date(event.registrationDeadline)) return '报名截止';
+  return '招募中';
+}
+
+const STATUS_PRIORITY = { '招募中': 0, '已满员': 1, '报名截止': 2, '进行中': 3, '已结束': 4 };
+
+// 与 GET /api/events 相同的排序：按状态优先级，同级按开始时间倒序
+export function sortEvents(events) {
+  const now = new Date();
+  return events
+    .map(event => ({ ...event, status: eventStatus(event, now) }))
+    .sort((a, b) => (STATUS_PRIORITY[a.status] - STATUS_PRIORITY[b.status])
+      || (new Date(b.startTime) - new Date(a.startTime)));
+}